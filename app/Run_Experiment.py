@@ -1,9 +1,14 @@
-import time
 import streamlit as st
-import pandas as pd
 import os
-from connection import w3, lightweight_contract, basic_contract
-from utils.ipfs_utils import upload_to_ipfs
+import runner
+from utils.ipfs_utils import IPFSUploader
+from utils.cid_cache import CIDCache
+from utils.common import ALL_CONTRACT_NAMES
+from utils.dataset import read_preview
+from utils.checkpoint import CheckpointTracker
+from utils.profiling import PROFILERS, RunProfiler
+from utils.results_store import ResultsWriter
+from utils.tx_engine import DEFAULT_GAS, DEFAULT_WINDOW
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
@@ -12,8 +17,27 @@ if "run_experiment" not in st.session_state:
     st.session_state.run_experiment = False
 
 
-def run_experiment():
+def run_experiment(
+    tx_window=DEFAULT_WINDOW,
+    batch_sizes=None,
+    use_ipfs=False,
+    receipt_batch_size=0,
+    contract_names=None,
+    profiler=None,
+):
     st.session_state.run_experiment = True
+    st.session_state.profiler = profiler
+    st.session_state.contract_names = contract_names or runner.CONTRACT_NAMES
+    st.session_state.tx_window = tx_window
+    st.session_state.batch_sizes = batch_sizes
+    st.session_state.use_ipfs = use_ipfs
+    st.session_state.receipt_batch_size = receipt_batch_size
+
+
+def parse_batch_sizes(text):
+    """Parse a comma separated list of batch sizes, ignoring invalid entries"""
+    sizes = [size.strip() for size in text.split(",")]
+    return [int(size) for size in sizes if size.isdigit() and int(size) > 0]
 
 
 def reset_experiment():
@@ -32,25 +56,39 @@ def save_uploaded_file(uploaded_file):
         st.error(f"Error saving file: {e}")
 
 
-def save_experiment_results(experiment_data):
-    """Save experiment results to a CSV file in the results directory"""
-    try:
-        # Create results directory if it doesn't exist
-        if not os.path.exists("results"):
-            os.makedirs("results")
-        
-        # Save the data to a fixed CSV file
-        file_path = os.path.join("results", "output.csv")
-        
-        # Save the data to CSV
-        df = pd.DataFrame(experiment_data)
-        df.to_csv(file_path, index=False)
-        
-        st.success(f"Experiment results saved successfully!")
-        return file_path
-    except Exception as e:
-        st.error(f"Error saving experiment results: {e}")
-        return None
+def show_progress(progress_bar, output_placeholder):
+    """Build a runner progress callback that redraws the Streamlit widgets"""
+
+    def callback(done, total, last_row):
+        progress_bar.progress(done / total)
+        output_placeholder.markdown(
+            f"**{last_row['contract_name']}** \n `addRecord Transaction for id: {last_row['index']} - Gas Used: {last_row['add_gas_used']}, Time: {last_row['add_time'] / 1000:.4f} seconds` \n `deleteRecord Transaction for id: {last_row['index']} - Gas Used: {last_row['delete_gas_used']}, Time: {last_row['delete_time'] / 1000:.4f} seconds`"
+        )
+
+    return callback
+
+
+def run_batch_sweep(row_placeholder, output_placeholder):
+    """Run the batch-size sweep and show amortized per-record costs"""
+    batch_sizes = st.session_state.batch_sizes
+    output_placeholder.markdown(
+        f"Sweeping batch sizes: {', '.join(str(size) for size in batch_sizes)}"
+    )
+    sweep_data = runner.run_batch_sweep(
+        st.session_state.file_path,
+        batch_sizes,
+        contract_names=st.session_state.get("contract_names", runner.CONTRACT_NAMES),
+        concurrency=st.session_state.get("tx_window", DEFAULT_WINDOW),
+    )
+    row_placeholder.markdown("Processing complete!")
+    output_placeholder.markdown("")
+
+    file_path = runner.save_results(sweep_data, runner.BATCH_SWEEP_OUTPUT)
+    st.success(f"Batch sweep results saved to {file_path}")
+    st.subheader("Amortized Cost per Record")
+    st.dataframe(
+        runner.summarize_batch_sweep(sweep_data).round(2), use_container_width=True
+    )
 
 
 def main():
@@ -63,17 +101,62 @@ def main():
         uploaded_file = st.file_uploader("", type=["csv"], accept_multiple_files=False)
         if uploaded_file is not None:
             save_uploaded_file(uploaded_file)
-            dataframe = pd.read_csv(uploaded_file)
+            dataframe = read_preview(st.session_state.file_path)
             columns_sub_analyze = st.columns(4)
             with columns_sub_analyze[0]:
                 st.subheader(uploaded_file.name)
+            with columns_sub_analyze[-2]:
+                tx_window = st.number_input(
+                    "Transactions in flight", min_value=1, value=DEFAULT_WINDOW
+                )
+                batch_sizes = st.text_input(
+                    "Batch-size sweep",
+                    placeholder="e.g. 1,10,50",
+                    help="Leave empty to run the per-row experiment",
+                )
+                receipt_batch_size = st.number_input(
+                    "Receipts per RPC batch",
+                    min_value=0,
+                    value=0,
+                    help="Fetch receipts of pending transactions in JSON-RPC "
+                    "batches of this size (0 polls every transaction on its own)",
+                )
+                contract_names = st.multiselect(
+                    "Contracts",
+                    ALL_CONTRACT_NAMES,
+                    default=runner.CONTRACT_NAMES,
+                    help="Variants other than Basic and Lightweight need a "
+                    "deployed address in deployment_config.json",
+                )
+                profiler = st.selectbox(
+                    "Function profiler",
+                    [None] + PROFILERS,
+                    format_func=lambda name: name or "Off",
+                    help="Stage timers are always recorded; see the "
+                    "Performance Dashboard page",
+                )
+                use_ipfs = st.checkbox(
+                    "Upload rows to IPFS",
+                    help="Store real CIDs instead of a placeholder (needs a local IPFS node)",
+                )
             with columns_sub_analyze[-1]:
-                st.button("Run Experiment", type="primary", on_click=run_experiment)
+                st.button(
+                    "Run Experiment",
+                    type="primary",
+                    on_click=run_experiment,
+                    args=(
+                        int(tx_window),
+                        parse_batch_sizes(batch_sizes),
+                        use_ipfs,
+                        int(receipt_batch_size),
+                        contract_names,
+                        profiler,
+                    ),
+                )
+            st.caption(f"Showing the first {len(dataframe)} rows")
             st.write(dataframe)
     else:
         st.button("Reset", type="primary", on_click=reset_experiment)
-        dataframe = pd.read_csv(st.session_state.file_path)
-
         st.write("Processing Dataset...")
         progress_bar = st.progress(0)
         input_data, output_measures = st.columns(2)
@@ -81,72 +164,73 @@ def main():
             row_placeholder = st.empty()
         with output_measures:
             output_placeholder = st.empty()
-        account = w3.eth.accounts[0]
-
-        experiment_data = []
-        for index, row in dataframe.iterrows():
-            progress = (index + 1) / len(dataframe)
-            progress_bar.progress(progress)
-
-            row_output = f"**Row Index:** {index} \n"
-            for col_name, value in row.items():
-                row_output += f"- **{col_name}:** {value}\n"
-            row_placeholder.markdown(row_output)
-
-            for name, contract in zip(
-                ["BasicContract", "LightweightContract"],
-                [basic_contract, lightweight_contract],
-            ):
-                # ipfs_hash = upload_to_ipfs(str(index), row.to_csv())
-                ipfs_hash = "gg"
-                start_time = time.time()
-                if contract is basic_contract:
-                    tx_receipt = contract.functions.addRecord(
-                        index, [str(ele) for ele in row.to_list()]
-                    ).transact({"from": account})
-                else:
-                    tx_receipt = contract.functions.addRecord(
-                        index, [str(ele) for ele in row.to_list()], ipfs_hash
-                    ).transact({"from": account})
-                end_time = time.time()
-                add_time = end_time - start_time
-
-                add_receipt = w3.eth.get_transaction_receipt(tx_receipt)
-
-                start_time = time.time()
-                tx_receipt = contract.functions.deleteRecord(index).transact(
-                    {"from": account}
-                )
-                end_time = time.time()
-                delete_time = end_time - start_time
-
-                delete_receipt = w3.eth.get_transaction_receipt(tx_receipt)
-
-                output_placeholder.markdown(
-                    f"**{name}** \n `addRecord Transaction for id: {index} - Gas Used: {add_receipt['gasUsed']}, Time: {add_time:.4f} seconds` \n `deleteRecord Transaction for id: {index} - Gas Used: {delete_receipt['gasUsed']}, Time: {delete_time:.4f} seconds`"
-                )
-
-                experiment_data.append(
-                    {
-                        "contract_name": name,
-                        "index": index,
-                        "add_gas_used": add_receipt["gasUsed"],
-                        "add_time": add_time * 1000,
-                        "delete_gas_used": delete_receipt["gasUsed"],
-                        "delete_time": delete_time * 1000,
-                    }
-                )
+        row_placeholder.markdown(f"**Dataset:** {st.session_state.file_path}")
+
+        if st.session_state.get("batch_sizes"):
+            run_batch_sweep(row_placeholder, output_placeholder)
+            return
+
+        use_ipfs = st.session_state.get("use_ipfs", False)
+        concurrency = st.session_state.get("tx_window", DEFAULT_WINDOW)
+        receipt_batch_size = st.session_state.get("receipt_batch_size") or None
+        contract_names = st.session_state.get("contract_names", runner.CONTRACT_NAMES)
+        ipfs_uploader = IPFSUploader(cache=CIDCache()) if use_ipfs else None
+        metadata = runner.run_metadata(
+            st.session_state.file_path,
+            contract_names,
+            concurrency,
+            DEFAULT_GAS,
+            ipfs=use_ipfs,
+            receipt_batch_size=receipt_batch_size,
+            profiler=st.session_state.get("profiler"),
+        )
+
+        # Results are streamed to a new run in results/runs as they complete
+        results = ResultsWriter(
+            metadata=metadata,
+            checkpoint=CheckpointTracker(contract_names),
+        )
+        rpc_stats = {}
+        profiler = RunProfiler(st.session_state.get("profiler"))
+        try:
+            runner.run_experiment(
+                st.session_state.file_path,
+                contract_names=contract_names,
+                concurrency=concurrency,
+                progress_callback=show_progress(progress_bar, output_placeholder),
+                ipfs_uploader=ipfs_uploader,
+                results=results,
+                receipt_batch_size=receipt_batch_size,
+                rpc_stats=rpc_stats,
+                profiler=profiler,
+                reserve=results.reserve,
+            )
+        except BaseException:
+            results.abort()
+            raise
+
+        cache_stats = {}
+        if ipfs_uploader is not None:
+            cache_stats = ipfs_uploader.cache.stats()
+            st.info(
+                f"IPFS CID cache: {cache_stats['cache_hits']} hits, "
+                f"{cache_stats['cache_misses']} misses, "
+                f"{cache_stats['cache_entries']} entries"
+            )
+            ipfs_uploader.close()
+        st.info(f"RPC: {runner.describe_rpc_stats(rpc_stats)}")
+        results.close(
+            ipfs_cache=cache_stats, rpc=rpc_stats, profile=profiler.save(results.dir)
+        )
 
         row_placeholder.markdown("Processing complete!")
         output_placeholder.markdown("")
+        st.success(f"Experiment results saved as run {results.run_id}")
 
-        # Save experiment data to CSV file
-        save_experiment_results(experiment_data)
-        
         # Display completion message and link to results page
         st.success("Experiment completed successfully!")
         st.info("View the detailed results in the 'Experiment Results' page.")
-        
+
         # Add a button to navigate to the Results page
         st.markdown("[Go to Experiment Results Page](/Experiment_Result)")
 
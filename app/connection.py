@@ -1,28 +1,127 @@
-import json
-from pathlib import Path
-from web3 import Web3
+import os
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import AsyncWeb3, Web3
+from web3.providers import (
+    AsyncHTTPProvider,
+    AsyncIPCProvider,
+    HTTPProvider,
+    IPCProvider,
+    WebSocketProvider,
+)
+
+from utils.contract_registry import CONTRACT_ARTIFACTS, deployed_addresses, get_abi
+
+# Endpoint and transport settings, overridable from the environment. The scheme
+# of the URI selects the transport: http(s)://, ws(s)://, or an IPC socket path
+# (optionally prefixed with ipc://).
+PROVIDER_URI = os.environ.get('ETH_PROVIDER_URI', 'http://127.0.0.1:8545')
+POOL_SIZE = int(os.environ.get('ETH_POOL_SIZE', '64'))
+REQUEST_TIMEOUT = float(os.environ.get('ETH_REQUEST_TIMEOUT', '30'))
+KEEPALIVE_TIMEOUT = float(os.environ.get('ETH_KEEPALIVE_TIMEOUT', '60'))
+
+
+def get_transport(uri):
+    """Return 'http', 'ws' or 'ipc' for a provider URI"""
+    if uri.startswith(('http://', 'https://')):
+        return 'http'
+    if uri.startswith(('ws://', 'wss://')):
+        return 'ws'
+    return 'ipc'
+
+
+def make_http_session(pool_size=POOL_SIZE):
+    """requests session whose connection pool keeps `pool_size` sockets alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def make_provider(uri=PROVIDER_URI, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+    """Build a synchronous provider for `uri`.
+
+    HTTP requests go through a pooled keep-alive session, so repeated calls
+    reuse TCP connections. WebSocket endpoints are only supported by the async
+    client (`connect_async_w3`).
+    """
+    transport = get_transport(uri)
+    if transport == 'http':
+        return HTTPProvider(
+            uri,
+            request_kwargs={'timeout': timeout},
+            session=make_http_session(pool_size),
+        )
+    if transport == 'ws':
+        raise ValueError(
+            f"WebSocket endpoint {uri} is only supported by connect_async_w3"
+        )
+    return IPCProvider(uri.removeprefix('ipc://'), timeout=timeout)
+
+
+def make_w3(uri=PROVIDER_URI, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+    """Create a synchronous Web3 client for `uri`"""
+    return Web3(make_provider(uri, pool_size, timeout))
+
+
+async def connect_async_w3(uri=PROVIDER_URI, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+    """Create and connect an AsyncWeb3 client for `uri`.
+
+    Must be called inside the event loop that will use the client. HTTP uses an
+    aiohttp session limited to `pool_size` keep-alive connections; WebSocket and
+    IPC keep a single persistent connection. Release it with `close_async_w3`.
+    """
+    transport = get_transport(uri)
+    if transport == 'http':
+        provider = AsyncHTTPProvider(uri)
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=pool_size, keepalive_timeout=KEEPALIVE_TIMEOUT
+            ),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+        await provider.cache_async_session(session)
+        return AsyncWeb3(provider)
+
+    if transport == 'ws':
+        provider = WebSocketProvider(uri, request_timeout=timeout)
+    else:
+        provider = AsyncIPCProvider(uri.removeprefix('ipc://'), request_timeout=timeout)
+    async_w3 = AsyncWeb3(provider)
+    await provider.connect()
+    return async_w3
+
+
+async def close_async_w3(async_w3):
+    await async_w3.provider.disconnect()
+
+
+def chain_metadata(web3=None):
+    """Describe the node and chain a run is measured against"""
+    web3 = web3 or w3
+    return {
+        'provider_uri': PROVIDER_URI,
+        'transport': get_transport(PROVIDER_URI),
+        'client_version': web3.client_version,
+        'chain_id': web3.eth.chain_id,
+        'block_gas_limit': web3.eth.get_block('latest')['gasLimit'],
+    }
+
 
 # Connect to a local Ethereum node
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
-
-def get_contract_abi(name):
-    certification_json_path = Path(f'../build/contracts/{name}.json')
-
-    try:
-        with open(certification_json_path, 'r') as json_file:
-            certification_data = json.load(json_file)
-            return certification_data.get('abi', [])
-    except FileNotFoundError:
-        print(f"Error: {certification_json_path} not found.")
-        return []
-
-deployment_config_fpath = Path("../deployment_config.json")
-with open(deployment_config_fpath, 'r') as json_file:
-    address_data = json.load(json_file)
-    
-basic_contract_address = address_data.get('BasicRecord')
-lightweight_contract_address = address_data.get('LightweightRecord')
-
-# Interact with the smart contract
-basic_contract = w3.eth.contract(address=basic_contract_address, abi=get_contract_abi('BasicRecord'))
-lightweight_contract = w3.eth.contract(address=lightweight_contract_address, abi=get_contract_abi('LightweightRecord'))
+w3 = make_w3()
+
+def get_contracts(web3=None):
+    """Bind the deployed contracts to a Web3 or AsyncWeb3 client, keyed by
+    experiment name. Variants without a configured address are left out."""
+    web3 = web3 or w3
+    return {
+        name: web3.eth.contract(address=address, abi=get_abi(CONTRACT_ARTIFACTS[name]))
+        for name, address in deployed_addresses().items()
+    }
+
+def get_async_contracts(async_w3):
+    return get_contracts(async_w3)
@@ -0,0 +1,93 @@
+"""Deploy the compiled contract variants without `truffle migrate`.
+
+Deploys from the node's unlocked account straight from the Truffle artifacts
+and records the addresses in deployment_config.json:
+
+    python deploy_contracts.py
+
+Contracts whose configured address still holds code are reused, so running it
+at every start only deploys after the node has been reset. With --wait it
+first waits for the node to come up, as the Docker Compose setup does.
+
+Only variants registered in `utils.contract_registry.CONTRACT_ARTIFACTS` are
+deployed; other compiled artifacts are reported and skipped.
+"""
+import argparse
+import time
+
+from connection import make_w3
+from utils.contract_registry import (
+    ARTIFACTS_DIR,
+    CONTRACT_ARTIFACTS,
+    DEPLOYMENT_CONFIG,
+    deploy_contracts,
+    unregistered_artifacts,
+)
+
+
+def wait_for_node(w3, timeout):
+    """Block until the node answers, for at most `timeout` seconds"""
+    deadline = time.monotonic() + timeout
+    while not w3.is_connected():
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"No node answered within {timeout} seconds")
+        time.sleep(1)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Deploy the contract variants and update deployment_config.json"
+    )
+    parser.add_argument(
+        "--contracts",
+        nargs="+",
+        choices=list(CONTRACT_ARTIFACTS),
+        help="Contracts to deploy (default: every compiled one)",
+    )
+    parser.add_argument(
+        "--redeploy",
+        action="store_true",
+        help="Deploy again even if the configured address holds code",
+    )
+    parser.add_argument(
+        "--account-index",
+        type=int,
+        default=0,
+        help="Unlocked node account to deploy from",
+    )
+    parser.add_argument(
+        "--build-dir", default=ARTIFACTS_DIR, help="Truffle build/contracts directory"
+    )
+    parser.add_argument(
+        "--config", default=DEPLOYMENT_CONFIG, help="Deployment config to update"
+    )
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=0,
+        help="Seconds to wait for the node to come up before deploying",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    w3 = make_w3()
+    if args.wait:
+        wait_for_node(w3, args.wait)
+    for name in unregistered_artifacts(args.build_dir):
+        print(f"Skipping {name}: not registered in CONTRACT_ARTIFACTS")
+    addresses = deploy_contracts(
+        w3,
+        contract_names=args.contracts,
+        account=w3.eth.accounts[args.account_index],
+        redeploy=args.redeploy,
+        directory=args.build_dir,
+        config_path=args.config,
+    )
+    for name, address in addresses.items():
+        print(f"{name}: {address}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Storage-based vs log-based recording.
+
+Adds dataset rows to storage contracts (BasicRecord, LightweightRecord) and to
+the event-log variants, indexes the logs into a local SQLite store, then
+compares write gas and the latency of reading the records back:
+
+    python event_log_benchmark.py --dataset datasets/doctors.csv --max-rows 1000
+
+The index is started at the first block written to and synced incrementally
+after the writes, which must fetch exactly the new logs. Storage records are
+read with getRecord calls; logged records both with an `eth_getLogs` filtered
+on the record id and from the local index. The storage
+records are deleted again afterwards, so the next run adds to empty slots
+rather than overwriting.
+"""
+import argparse
+import asyncio
+import os
+import time
+from itertools import islice
+
+import pandas as pd
+
+import runner
+from connection import close_async_w3, connect_async_w3, get_contracts, make_w3
+from read_benchmark import latency_row, time_calls
+from utils.common import RECORD_ID_OFFSET, common_parser
+from utils.contract_registry import EVENT_LOG_CONTRACT_NAMES
+from utils.dataset import DEFAULT_CHUNK_SIZE, iter_rows
+from utils.log_indexer import (
+    DEFAULT_BLOCK_RANGE,
+    DEFAULT_INDEX_PATH,
+    event_topics,
+    lookup_record,
+    open_index,
+    record_topic,
+    sync_logs,
+)
+from utils.tx_engine import DEFAULT_GAS
+
+DEFAULT_CONTRACT_NAMES = runner.CONTRACT_NAMES + EVENT_LOG_CONTRACT_NAMES
+DEFAULT_MAX_ROWS = 1_000
+DEFAULT_CONCURRENCY = 64
+# Event each log-based variant records a row with
+ADDED_EVENTS = {
+    "EventLogContract": "RecordAdded",
+    "EventLogHashContract": "RecordHashAdded",
+}
+EVENT_LOG_OUTPUT = os.path.join("results", "event_log_benchmark.csv")
+
+
+def write_records(dataset_path, contract_names, max_rows, concurrency, gas, chunksize):
+    """Add the first `max_rows` rows to every contract and keep them stored
+    until `delete_records`. Returns the engine result of every addRecord and
+    the wall time."""
+    results = []
+
+    def build(contracts):
+        for index, fields in islice(iter_rows(dataset_path, chunksize), max_rows):
+            record_id = index + RECORD_ID_OFFSET
+            for name, contract in contracts.items():
+                add_fn = runner.add_record_call(name, contract, record_id, fields)
+                yield add_fn, {"contract_name": name, "record_id": record_id}
+
+    started_at = time.perf_counter()
+    asyncio.run(
+        runner.run_jobs(build, contract_names, concurrency, gas, results.append)
+    )
+    return results, time.perf_counter() - started_at
+
+
+def delete_records(results, concurrency, gas):
+    """Delete the records the successful addRecords in `results` stored in
+    the storage contracts. Returns the number of failed deletes."""
+    stored = [
+        (result["contract_name"], result["record_id"])
+        for result in results
+        if result["status"] == 1 and result["contract_name"] not in EVENT_LOG_CONTRACT_NAMES
+    ]
+    failed = 0
+
+    def on_result(result):
+        nonlocal failed
+        failed += result["status"] != 1
+
+    def build(contracts):
+        for name, record_id in stored:
+            yield contracts[name].functions.deleteRecord(record_id), {
+                "contract_name": name,
+                "record_id": record_id,
+            }
+
+    contract_names = sorted({name for name, _ in stored})
+    if stored:
+        asyncio.run(runner.run_jobs(build, contract_names, concurrency, gas, on_result))
+    return failed
+
+
+def write_row(name, results, wall_time):
+    """Gas and latency of one contract's writes. Contracts are written to
+    concurrently, so they share the wall time."""
+    mined = [r for r in results if r["status"] == 1]
+    latencies = [r["latency_ns"] / 1e6 for r in mined]
+    errors = len(results) - len(mined)
+    row = latency_row(name, "addRecord", "write", latencies, errors, wall_time)
+    row["mean_gas_used"] = (
+        sum(result["gas_used"] for result in mined) / len(mined) if mined else None
+    )
+    return row
+
+
+async def time_get_logs(
+    async_w3, contract, event_name, record_ids, from_block, concurrency
+):
+    """Time one `eth_getLogs` per record, filtered on the event and the
+    record's indexed id"""
+    event_topic = {name: topic for topic, name in event_topics(contract).items()}[
+        event_name
+    ]
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def read(record_id):
+        nonlocal errors
+        async with slots:
+            started_at = time.perf_counter_ns()
+            try:
+                logs = await async_w3.eth.get_logs(
+                    {
+                        "address": contract.address,
+                        "fromBlock": from_block,
+                        "toBlock": "latest",
+                        "topics": [event_topic, record_topic(record_id)],
+                    }
+                )
+            except Exception:
+                errors += 1
+                return
+            if not logs:
+                errors += 1
+                return
+            latencies.append((time.perf_counter_ns() - started_at) / 1e6)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(read(record_id) for record_id in record_ids))
+    return latencies, errors, time.perf_counter() - started_at
+
+
+def time_index_lookups(db, address, record_ids):
+    """Time looking every record up in the local index"""
+    latencies = []
+    errors = 0
+    started_at = time.perf_counter()
+    for record_id in record_ids:
+        lookup_started_at = time.perf_counter_ns()
+        if lookup_record(db, address, record_id) is None:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter_ns() - lookup_started_at) / 1e6)
+    return latencies, errors, time.perf_counter() - started_at
+
+
+async def time_reads(contract_names, record_ids, from_block, concurrency, db):
+    async_w3 = await connect_async_w3(pool_size=concurrency)
+    contracts = get_contracts(async_w3)
+    read_data = []
+    try:
+        for name in contract_names:
+            contract = contracts[name]
+            if name in EVENT_LOG_CONTRACT_NAMES:
+                result = await time_get_logs(
+                    async_w3,
+                    contract,
+                    ADDED_EVENTS[name],
+                    record_ids,
+                    from_block,
+                    concurrency,
+                )
+                read_data.append(latency_row(name, "eth_getLogs", "read", *result))
+                result = time_index_lookups(db, contract.address, record_ids)
+                read_data.append(latency_row(name, "index_lookup", "read", *result))
+            else:
+                calls = [contract.functions.getRecord(i) for i in record_ids]
+                result = await time_calls(async_w3, calls, concurrency)
+                read_data.append(latency_row(name, "getRecord", "read", *result))
+    finally:
+        await close_async_w3(async_w3)
+    return read_data
+
+
+def log_contracts(contracts, contract_names):
+    """`{address: (name, contract)}` of the event-log variants among
+    `contract_names`. Variants sharing a deployment are indexed once and share
+    its index entries, so an index lookup returns whichever of them logged
+    last."""
+    deployments = {}
+    for name in contract_names:
+        if name in EVENT_LOG_CONTRACT_NAMES:
+            deployments.setdefault(contracts[name].address, (name, contracts[name]))
+    return deployments
+
+
+def index_and_read(
+    w3, contract_names, results, from_block, concurrency, block_range, db
+):
+    """Index the logs written since the last sync of `db`, then time reading
+    every written record back. Returns one summary row per contract and
+    operation.
+
+    The sync continues from the last indexed block, so it must fetch exactly
+    the logs of the successful writes in `results`; anything else raises.
+    """
+    benchmark_data = []
+    contracts = get_contracts(w3)
+    for address, (name, contract) in log_contracts(contracts, contract_names).items():
+        written = sum(
+            result["status"] == 1
+            for result in results
+            if contracts[result["contract_name"]].address == address
+        )
+        started_at = time.perf_counter()
+        stats = sync_logs(w3, contract, db, block_range)
+        wall_time = time.perf_counter() - started_at
+        if stats["reset"] or stats["logs"] != written:
+            raise RuntimeError(
+                f"Syncing {address} fetched {stats['logs']} logs (reset: "
+                f"{stats['reset']}), expected only the {written} just written"
+            )
+        benchmark_data.append(
+            {
+                "contract_name": name,
+                "function": "sync_logs",
+                "mode": "index",
+                "calls": stats["requests"],
+                "logs": stats["logs"],
+                "blocks": stats["blocks"],
+                "wall_time": wall_time,
+                "logs_per_second": stats["logs"] / wall_time if wall_time else 0.0,
+            }
+        )
+
+    record_ids = sorted({result["record_id"] for result in results})
+    benchmark_data += asyncio.run(
+        time_reads(contract_names, record_ids, from_block, concurrency, db)
+    )
+    return benchmark_data
+
+
+def benchmark_event_logs(
+    dataset_path,
+    contract_names=DEFAULT_CONTRACT_NAMES,
+    max_rows=DEFAULT_MAX_ROWS,
+    concurrency=DEFAULT_CONCURRENCY,
+    gas=DEFAULT_GAS,
+    block_range=DEFAULT_BLOCK_RANGE,
+    index_path=DEFAULT_INDEX_PATH,
+    chunksize=DEFAULT_CHUNK_SIZE,
+):
+    """Write, index and read back `max_rows` rows per contract. Returns one
+    summary row per contract and operation."""
+    w3 = make_w3()
+    from_block = w3.eth.block_number + 1
+    db = open_index(index_path)
+    try:
+        # Start the index at the first block written to, so the sync after
+        # the writes continues from there and fetches only their logs
+        for _, contract in log_contracts(get_contracts(w3), contract_names).values():
+            sync_logs(w3, contract, db, block_range, from_block=from_block)
+        results, wall_time = write_records(
+            dataset_path, contract_names, max_rows, concurrency, gas, chunksize
+        )
+        benchmark_data = []
+        for name in contract_names:
+            contract_results = [r for r in results if r["contract_name"] == name]
+            benchmark_data.append(write_row(name, contract_results, wall_time))
+
+        try:
+            benchmark_data += index_and_read(
+                w3, contract_names, results, from_block, concurrency, block_range, db
+            )
+        finally:
+            failed = delete_records(results, concurrency, gas)
+            if failed:
+                print(f"{failed} records could not be deleted after the benchmark")
+    finally:
+        db.close()
+    return benchmark_data
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare storage-based and log-based recording",
+        parents=[common_parser(DEFAULT_CONTRACT_NAMES)],
+    )
+    parser.add_argument("--dataset", required=True, help="Path to the CSV dataset")
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help="Rows written to and read from every contract",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Transactions and reads kept in flight",
+    )
+    parser.add_argument(
+        "--block-range",
+        type=int,
+        default=DEFAULT_BLOCK_RANGE,
+        help="Blocks per eth_getLogs request while indexing",
+    )
+    parser.add_argument(
+        "--index", default=DEFAULT_INDEX_PATH, help="SQLite file of the log index"
+    )
+    parser.add_argument(
+        "--output", default=EVENT_LOG_OUTPUT, help="CSV file to write the summary to"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    benchmark_data = benchmark_event_logs(
+        args.dataset,
+        contract_names=args.contracts,
+        max_rows=args.max_rows,
+        concurrency=args.concurrency,
+        gas=args.gas,
+        block_range=args.block_range,
+        index_path=args.index,
+        chunksize=args.chunksize,
+    )
+    output_path = runner.save_results(benchmark_data, args.output)
+    print(pd.DataFrame(benchmark_data).round(2).to_string(index=False))
+    print(f"Saved event log benchmark to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
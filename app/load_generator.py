@@ -0,0 +1,223 @@
+"""Multi-process load generator.
+
+Shards the dataset across worker processes. Each worker opens its own provider
+connection, sends from its own unlocked node account (so every worker has an
+independent nonce sequence) and runs the usual add/delete experiment on its
+shard. The timing records of all workers are merged into one run in the
+results store (each worker writes its own part files), or into one CSV file
+with --output:
+
+    python load_generator.py --dataset datasets/doctors.csv --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import runner
+from connection import make_w3
+from utils.common import common_parser
+from utils.dataset import DEFAULT_CHUNK_SIZE
+from utils.results_store import ResultsWriter
+from utils.tx_engine import DEFAULT_GAS, DEFAULT_WINDOW
+
+def run_worker(
+    dataset_path,
+    worker_id,
+    workers,
+    account,
+    contract_names,
+    concurrency,
+    gas,
+    chunksize,
+    run_id=None,
+):
+    """Run the experiment on shard `worker_id` of the dataset from `account`.
+
+    Rows are streamed into run `run_id` of the results store if given, else
+    returned. Returns `(rows or None, row count, wall time)`.
+    """
+    if run_id is not None:
+        results = ResultsWriter(
+            run_id,
+            part_prefix=f"worker{worker_id}",
+            constants={"worker": worker_id},
+        )
+    else:
+        results = []
+    started_at = time.time()
+    try:
+        runner.run_experiment(
+            dataset_path,
+            contract_names=contract_names,
+            concurrency=concurrency,
+            chunksize=chunksize,
+            gas=gas,
+            account=account,
+            shard=(worker_id, workers),
+            results=results,
+        )
+    finally:
+        if run_id is not None:
+            results.close()
+    finished_at = time.time()
+
+    if run_id is not None:
+        return None, results.rows_written, finished_at - started_at
+    for row in results:
+        row["worker"] = worker_id
+    return results, len(results), finished_at - started_at
+
+
+def check_workers(workers, accounts):
+    """Raise unless every one of `workers` workers has its own node account"""
+    if workers < 1:
+        raise ValueError(f"Need at least one worker, got {workers}")
+    if workers > accounts:
+        raise ValueError(
+            f"{workers} workers need {workers} unlocked node accounts, "
+            f"the node has {accounts}"
+        )
+
+
+def run_load_test(
+    dataset_path,
+    workers,
+    accounts,
+    contract_names=runner.CONTRACT_NAMES,
+    concurrency=DEFAULT_WINDOW,
+    gas=DEFAULT_GAS,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    run_id=None,
+):
+    """Run `workers` concurrent writers over the dataset, worker `i` sending
+    from unlocked node account `accounts[i]`.
+
+    Returns the merged result rows (None when streamed into run `run_id`) and
+    a per-worker summary with each worker's wall time and throughput, plus an
+    "all" row for the whole run.
+    """
+    check_workers(workers, len(accounts))
+    started_at = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                run_worker,
+                dataset_path,
+                worker_id,
+                workers,
+                accounts[worker_id],
+                contract_names,
+                concurrency,
+                gas,
+                chunksize,
+                run_id,
+            )
+            for worker_id in range(workers)
+        ]
+        outcomes = [future.result() for future in futures]
+    wall_time = time.time() - started_at
+
+    experiment_data = None if run_id is not None else []
+    summary = []
+    total_rows = 0
+    for worker_id, (worker_data, rows, worker_time) in enumerate(outcomes):
+        if worker_data is not None:
+            experiment_data.extend(worker_data)
+        total_rows += rows
+        summary.append(
+            {
+                "worker": worker_id,
+                "rows": rows,
+                "wall_time": worker_time,
+                # Every row is one addRecord and one deleteRecord transaction.
+                "tx_per_second": 2 * rows / worker_time,
+            }
+        )
+    summary.append(
+        {
+            "worker": "all",
+            "rows": total_rows,
+            "wall_time": wall_time,
+            "tx_per_second": 2 * total_rows / wall_time,
+        }
+    )
+
+    if experiment_data is not None:
+        experiment_data.sort(key=lambda r: (r["index"], r["contract_name"]))
+    return experiment_data, summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the experiment with several concurrent writer processes",
+        parents=[common_parser()],
+    )
+    parser.add_argument("--dataset", required=True, help="Path to the CSV dataset")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes, each bound to its own node account (default: "
+        "one per CPU, at most one per unlocked account)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_WINDOW,
+        help="Number of transactions kept in flight per worker",
+    )
+    parser.add_argument(
+        "--output",
+        help="CSV file to write results to (default: a new run in results/runs)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    accounts = make_w3().eth.accounts
+    if args.workers is None:
+        args.workers = min(os.cpu_count() or 1, len(accounts))
+    check_workers(args.workers, len(accounts))
+    run = None
+    if not args.output:
+        metadata = runner.run_metadata(
+            args.dataset,
+            args.contracts,
+            args.concurrency,
+            args.gas,
+            mode="load_test",
+            workers=args.workers,
+        )
+        run = ResultsWriter(metadata=metadata)
+
+    try:
+        experiment_data, summary = run_load_test(
+            args.dataset,
+            args.workers,
+            accounts,
+            contract_names=args.contracts,
+            concurrency=args.concurrency,
+            gas=args.gas,
+            chunksize=args.chunksize,
+            run_id=run.run_id if run is not None else None,
+        )
+    except BaseException:
+        if run is not None:
+            run.abort()
+        raise
+
+    print(pd.DataFrame(summary).to_string(index=False))
+    if run is not None:
+        total_rows = summary[-1]["rows"]
+        run.close(rows=total_rows, workers_summary=summary)
+        print(f"Saved {total_rows} results to run {run.run_id}")
+    else:
+        output_path = runner.save_results(experiment_data, args.output)
+        print(f"Saved {len(experiment_data)} results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
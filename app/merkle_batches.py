@@ -0,0 +1,326 @@
+"""Merkle batch recording.
+
+Builds a Merkle tree over every batch of dataset rows on worker processes,
+stores only each batch's root in MerkleBatchRecord, checks sample rows against
+it with on-chain proofs and deletes the batches again:
+
+    python merkle_batches.py --dataset datasets/doctors.csv --batch-sizes 10 100
+
+With LightweightContract among `--contracts`, its per-record hashes are stored
+in batches of the same sizes with addRecords for comparison.
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+import pandas as pd
+
+import runner
+from connection import close_async_w3, connect_async_w3, get_async_contracts
+from utils.common import RECORD_ID_OFFSET, common_parser
+from utils.contract_registry import MERKLE_CONTRACT_NAME
+from utils.dataset import DEFAULT_CHUNK_SIZE, iter_batches, iter_rows
+from utils.merkle import build_merkle_batch
+from utils.tx_engine import DEFAULT_GAS, DEFAULT_WINDOW
+
+MERKLE_OUTPUT = os.path.join("results", "merkle_batches.csv")
+DEFAULT_MERKLE_SAMPLES = 1
+# Built Merkle batches stored, verified and deleted together
+DEFAULT_MERKLE_GROUP = 1_000
+
+
+def build_merkle_jobs(batches, contract, operation):
+    """Yield addBatch or deleteBatch calls for built Merkle batches"""
+    for batch in batches:
+        batch_id = batch["batch_id"]
+        if operation == "add":
+            fn = contract.functions.addBatch(batch_id, batch["root"])
+        else:
+            fn = contract.functions.deleteBatch(batch_id)
+        tag = {"contract_name": MERKLE_CONTRACT_NAME, "index": batch_id}
+        yield fn, {**tag, "operation": operation}
+
+
+async def verify_merkle_samples(batches, concurrency, parity_batch_ids=()):
+    """Check every batch's sample rows with verifyRecord calls. Returns
+    `{batch_id: [(latency_ms, verified), ...]}`; a reverted call counts as
+    not verified.
+
+    The parity samples of the batches in `parity_batch_ids` are checked with
+    verifyRecordHash, and a proof the contract rejects raises, since it means
+    `utils.merkle` and MerkleBatchRecord disagree on the tree.
+    """
+    async_w3 = await connect_async_w3(pool_size=concurrency)
+    contract = get_async_contracts(async_w3)[MERKLE_CONTRACT_NAME]
+    slots = asyncio.Semaphore(concurrency)
+    checks = {batch["batch_id"]: [] for batch in batches}
+    mismatches = []
+
+    async def verify(batch_id, record_id, fields, proof):
+        async with slots:
+            started_at = time.perf_counter_ns()
+            try:
+                verified = await contract.functions.verifyRecord(
+                    batch_id, record_id, fields, proof
+                ).call()
+            except Exception:
+                verified = False
+            elapsed = (time.perf_counter_ns() - started_at) / 1e6
+            checks[batch_id].append((elapsed, verified))
+
+    async def check_parity(batch_id, record_id, data_hash, proof):
+        async with slots:
+            verified = await contract.functions.verifyRecordHash(
+                batch_id, record_id, data_hash, proof
+            ).call()
+        if not verified:
+            mismatches.append((batch_id, record_id, len(proof)))
+
+    try:
+        await asyncio.gather(
+            *(
+                verify(batch["batch_id"], *sample)
+                for batch in batches
+                for sample in batch["samples"]
+            ),
+            *(
+                check_parity(batch["batch_id"], *sample)
+                for batch in batches
+                if batch["batch_id"] in parity_batch_ids
+                for sample in batch["parity_samples"]
+            ),
+        )
+    finally:
+        await close_async_w3(async_w3)
+    if mismatches:
+        raise RuntimeError(
+            "MerkleBatchRecord rejected proofs built by utils.merkle "
+            f"(batch, record, proof length): {mismatches}"
+        )
+    return checks
+
+
+def bounded_imap(pool, fn, tasks, in_flight):
+    """`pool.imap(fn, tasks)` with at most `in_flight` results outstanding.
+    `Pool.imap` stops pulling `tasks` while the pipe to the workers is full,
+    but keeps every finished result queued until it is consumed, so a
+    consumer slower than the workers would hold the built batches in memory
+    whole."""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(fn, (task,)))
+        if len(pending) >= in_flight:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def store_merkle_group(batches, batch_size, concurrency, gas, parity_batch_ids):
+    """Add the roots of built `batches`, verify their samples while stored and
+    delete them again. Returns one result row per batch."""
+    results = {}
+
+    def on_result(result):
+        results[(result["operation"], result["index"])] = result
+
+    for operation in ["add", "delete"]:
+        asyncio.run(
+            runner.run_jobs(
+                lambda contracts: build_merkle_jobs(
+                    batches, contracts[MERKLE_CONTRACT_NAME], operation
+                ),
+                [MERKLE_CONTRACT_NAME],
+                concurrency,
+                gas,
+                on_result,
+            )
+        )
+        # Verify while the roots are stored
+        if operation == "add":
+            checks = asyncio.run(
+                verify_merkle_samples(batches, concurrency, parity_batch_ids)
+            )
+
+    rows = []
+    for batch in batches:
+        batch_id = batch["batch_id"]
+        records = batch["records"]
+        batch_checks = checks[batch_id]
+        row = {
+            "contract_name": MERKLE_CONTRACT_NAME,
+            "batch_size": batch_size,
+            "index": batch_id,
+            "records": records,
+            "root": "0x" + batch["root"].hex(),
+            **runner.timing_columns("add", results[("add", batch_id)]),
+            **runner.timing_columns("delete", results[("delete", batch_id)]),
+            "verify_calls": len(batch_checks),
+            "verify_failures": sum(not ok for _, ok in batch_checks),
+            "verify_call_time": sum(t for t, _ in batch_checks),
+            "parity_checks": (
+                len(batch["parity_samples"]) if batch_id in parity_batch_ids else 0
+            ),
+        }
+        for operation in ["add", "delete"]:
+            row[f"{operation}_gas_per_record"] = row[f"{operation}_gas_used"] / records
+        for step in ["hash", "leaf", "tree", "proof", "verify"]:
+            row[f"{step}_time"] = batch[f"{step}_ns"] / 1e6
+        rows.append(row)
+    return rows
+
+
+def run_merkle_batches(
+    dataset_path,
+    batch_sizes,
+    concurrency=DEFAULT_WINDOW,
+    max_rows=None,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    gas=DEFAULT_GAS,
+    samples_per_batch=DEFAULT_MERKLE_SAMPLES,
+    processes=None,
+    group_batches=DEFAULT_MERKLE_GROUP,
+):
+    """Store the dataset as one Merkle root per batch, once per batch size.
+
+    Trees and proofs are built on `processes` worker processes (all cores by
+    default), with a bounded number of batches queued, and handled
+    `group_batches` at a time as they arrive: their roots are added with
+    addBatch, `samples_per_batch` rows per batch are checked with an on-chain
+    verifyRecord, and the batches are deleted again. So only a few groups of
+    rows are in memory at once. The first batch, and any batch of another
+    size (the trailing one), also checks its parity samples with
+    verifyRecordHash. Returns one row per batch with gas, on-chain
+    verification and hashing/proof timings.
+    """
+    merkle_data = []
+    for batch_size in batch_sizes:
+        rows = islice(iter_rows(dataset_path, chunksize), max_rows)
+        tasks = (
+            (
+                batch_id,
+                [(index + RECORD_ID_OFFSET, fields) for index, fields in batch],
+                samples_per_batch,
+            )
+            for batch_id, batch in enumerate(iter_batches(rows, batch_size), 1)
+        )
+        with Pool(processes) as pool:
+            # Every worker has a batch queued behind the one it is building
+            in_flight = 2 * (processes or os.cpu_count() or 1)
+            built = bounded_imap(pool, build_merkle_batch, tasks, in_flight)
+            for group in iter_batches(built, group_batches):
+                # Full batches share one tree shape, so checking the first and
+                # any shorter one covers every shape in the run
+                parity_batch_ids = {
+                    batch["batch_id"]
+                    for batch in group
+                    if batch["batch_id"] == 1 or batch["records"] != batch_size
+                }
+                merkle_data += store_merkle_group(
+                    group, batch_size, concurrency, gas, parity_batch_ids
+                )
+    return merkle_data
+
+
+def summarize_merkle_batches(merkle_data):
+    """Per batch size: amortized gas per record, on-chain verification
+    latency, and the records per second (per core) of hashing fields as the
+    per-record contracts do vs building trees, generating proofs and
+    verifying them"""
+    df = pd.DataFrame(merkle_data)
+    totals = df.groupby(["batch_size", "contract_name"]).sum(numeric_only=True)
+    records = totals["records"]
+    summary = pd.DataFrame(
+        {
+            "add_gas_per_record": totals["add_gas_used"] / records,
+            "delete_gas_per_record": totals["delete_gas_used"] / records,
+            "verify_call_time": totals["verify_call_time"] / totals["verify_calls"],
+            "verify_failures": totals["verify_failures"],
+            "hashes_per_second": records / totals["hash_time"] * 1000,
+            "tree_records_per_second": records
+            / (totals["leaf_time"] + totals["tree_time"])
+            * 1000,
+            "proofs_per_second": records / totals["proof_time"] * 1000,
+            "proof_checks_per_second": records / totals["verify_time"] * 1000,
+        }
+    )
+    return summary.reset_index()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Store the dataset as one Merkle root per batch",
+        parents=[common_parser()],
+    )
+    parser.add_argument("--dataset", required=True, help="Path to the CSV dataset")
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        required=True,
+        help="Rows per Merkle batch to compare",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=DEFAULT_MERKLE_SAMPLES,
+        help="Rows per batch checked with an on-chain verifyRecord",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Worker processes building Merkle trees (default: all cores)",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        help="Rows stored per batch size (default: whole dataset)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_WINDOW,
+        help="Number of transactions kept in flight",
+    )
+    parser.add_argument(
+        "--output", default=MERKLE_OUTPUT, help="CSV file to write the results to"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    merkle_data = run_merkle_batches(
+        args.dataset,
+        args.batch_sizes,
+        concurrency=args.concurrency,
+        max_rows=args.max_rows,
+        chunksize=args.chunksize,
+        gas=args.gas,
+        samples_per_batch=args.samples,
+        processes=args.processes,
+    )
+    output_path = runner.save_results(merkle_data, args.output)
+    summary = summarize_merkle_batches(merkle_data)
+    # Per-record hashes stored in batches of the same sizes, for comparison
+    if "LightweightContract" in args.contracts:
+        sweep_data = runner.run_batch_sweep(
+            args.dataset,
+            args.batch_sizes,
+            contract_names=["LightweightContract"],
+            concurrency=args.concurrency,
+            max_rows=args.max_rows,
+            chunksize=args.chunksize,
+            gas=args.gas,
+        )
+        summary = pd.concat([summary, runner.summarize_batch_sweep(sweep_data)])
+        summary = summary.sort_values(["batch_size", "contract_name"])
+    print(summary.round(2).to_string(index=False))
+    print(f"Saved {len(merkle_data)} Merkle batch results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
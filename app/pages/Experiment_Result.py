@@ -3,101 +3,367 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
+import io
 import os
+import pyarrow.parquet as pq
+from utils.analytics import (
+    CONFIDENCE,
+    METRIC_COLUMNS,
+    STATUS_COLUMNS,
+    aggregate,
+    aggregate_csv,
+    distribution_stats,
+    exclude_warmup,
+    failure_counts,
+    file_fingerprint,
+    grouped_box_stats,
+    improvement,
+    improvement_ci,
+    merge_aggregates,
+    summarize,
+)
+from utils.cost_model import ETH_PRICE, GAS_PRICE_SCENARIOS, cost_table
+from utils.results_store import (
+    export_run_csv,
+    list_runs,
+    load_run,
+    part_files,
+    read_run_rows,
+    run_dir,
+)
 
-def load_experiment_file():
-    """Load experiment data from the output CSV file"""
-    file_path = os.path.join("results", "output.csv")
+# Results written before the results store existed
+LEGACY_RESULTS_FILE = os.path.join("results", "output.csv")
+
+# Raw rows shown per page and the run file they are downloaded from
+RAW_PAGE_SIZE = 1_000
+EXPORT_FILE = "export.csv"
+# Streamlit holds a download in memory, so larger exports are only written
+# to disk
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024
+
+def select_run():
+    """Let the user pick a stored run, or the legacy output.csv file"""
+    runs = {
+        f"{run['run_id']} ({run.get('status', 'unknown')})": run
+        for run in list_runs()
+    }
+    if os.path.exists(LEGACY_RESULTS_FILE):
+        runs["Legacy results/output.csv"] = None
+    if not runs:
+        return None, None
+    label = st.sidebar.selectbox("Experiment run", list(runs))
+    run = runs[label]
+    return (run["run_id"] if run is not None else None), run
+
+def run_fingerprint(run_id):
+    """`(path, mtime, size)` of every file holding the run's results"""
+    paths = [LEGACY_RESULTS_FILE] if run_id is None else part_files(run_id)
+    return tuple((path, *file_fingerprint(path)) for path in paths)
+
+@st.cache_data(show_spinner=False, max_entries=10_000)
+def file_aggregates(path, mtime_ns, size):
+    """Aggregates of one results file, cached by its fingerprint"""
+    if path.endswith(".csv"):
+        return aggregate_csv(path)
+    table = pq.read_table(
+        path, columns=["contract_name"] + METRIC_COLUMNS + STATUS_COLUMNS
+    )
+    return aggregate(table.to_pandas())
+
+def run_summary(fingerprint):
+    """Summary statistics of a run, merged from its per-file aggregates"""
+    aggregates = merge_aggregates(
+        file_aggregates(path, mtime_ns, size) for path, mtime_ns, size in fingerprint
+    )
+    return summarize(aggregates) if not aggregates.empty else aggregates
+
+@st.cache_data(show_spinner="Computing statistics...", max_entries=8)
+def run_statistics(run_id, fingerprint, warmup, confidence, baseline):
+    """Summary, distribution statistics and improvement CIs over `baseline`"""
+    df = load_experiment_file(
+        run_id, ["contract_name", "index"] + METRIC_COLUMNS + STATUS_COLUMNS
+    )
+    if df is None or df.empty:
+        return pd.DataFrame(), pd.DataFrame(), {}
+    df = exclude_warmup(df, warmup)
+    summary = summarize(aggregate(df)) if warmup else run_summary(fingerprint)
+    stats = distribution_stats(df, confidence=confidence)
+    by_contract = dict(tuple(df.groupby("contract_name")))
+    improvement_cis = {}
+    if baseline in by_contract:
+        improvement_cis = {
+            name: improvement_ci(
+                by_contract[baseline], contract_df, confidence=confidence
+            )
+            for name, contract_df in by_contract.items()
+            if name != baseline
+        }
+    return summary, stats, improvement_cis
+
+def load_experiment_file(run_id, columns=None):
+    """Load experiment data for a run, reading only `columns` if given"""
     try:
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            return df
-        else:
-            st.warning("No experiment data found. Please run an experiment first.")
-            return None
+        if run_id is None:
+            # The legacy file has no status columns
+            return pd.read_csv(
+                LEGACY_RESULTS_FILE,
+                usecols=None if columns is None else lambda c: c in columns,
+            )
+        return load_run(run_id, columns=columns)
     except Exception as e:
         st.error(f"Error loading experiment data: {e}")
         return None
 
-def analyze_and_visualize(df):
-    """Analyze and visualize experiment data"""
+def figure_png(fig):
+    """Render a figure to PNG bytes and free it"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def box_plot_png(run_id, metric, title, ylabel, fingerprint, warmup=0):
+    """Box plot PNG of `metric` per contract, or None if there is nothing to plot"""
+    status = f"{metric.split('_', 1)[0]}_status"
+    df = load_experiment_file(run_id, ["contract_name", "index", metric, status])
     if df is None or df.empty:
+        return None
+    boxes = grouped_box_stats(exclude_warmup(df, warmup), metric)
+    if not boxes:
+        return None
+    fig, ax = plt.subplots(figsize=(8, 5))
+    colors = sns.color_palette(n_colors=len(boxes))
+    artists = ax.bxp(boxes, patch_artist=True, flierprops={"markersize": 3})
+    for patch, color in zip(artists["boxes"], colors):
+        patch.set_facecolor(color)
+    ax.set_title(title)
+    ax.set_xlabel("Contract Type")
+    ax.set_ylabel(ylabel)
+    return figure_png(fig)
+
+def show_box_plot(run_id, metric, title, ylabel, fingerprint, warmup):
+    png = box_plot_png(run_id, metric, title, ylabel, fingerprint, warmup)
+    if png is None:
+        st.info(f"No successful operations to plot for {title}")
+    else:
+        st.image(png)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def bar_chart_png(title, ylabel, contract_names, values, improvements):
+    """Add/delete bar chart PNG annotated with improvements over the baseline"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bar_width = 0.8 / len(contract_names)
+    x = np.arange(2)
+    colors = sns.color_palette(n_colors=len(contract_names))
+
+    for i, (name, contract_values, gains) in enumerate(
+        zip(contract_names, values, improvements)
+    ):
+        offset = (i - (len(contract_names) - 1) / 2) * bar_width
+        ax.bar(x + offset, contract_values, bar_width, label=name, color=colors[i])
+        if gains is None:
+            continue
+        # Add improvement annotations
+        for j in range(2):
+            ax.annotate(
+                f"{gains[j]:.1f}%",
+                xy=(x[j] + offset, contract_values[j] / 2),
+                ha="center",
+                va="center",
+                fontsize=8,
+                bbox=dict(boxstyle="round", fc="yellow", alpha=0.6),
+            )
+
+    # Add labels and annotations
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.set_xticks(x)
+    ax.set_xticklabels(["Add Operation", "Delete Operation"])
+    ax.legend()
+    return figure_png(fig)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def raw_export_path(run_id, fingerprint):
+    """CSV file with all of a run's rows, rewritten when its results change"""
+    if run_id is None:
+        return LEGACY_RESULTS_FILE
+    return export_run_csv(run_id, os.path.join(run_dir(run_id), EXPORT_FILE))
+
+def read_raw_page(run_id, offset, limit):
+    if run_id is None:
+        return pd.read_csv(
+            LEGACY_RESULTS_FILE, skiprows=range(1, offset + 1), nrows=limit
+        )
+    return read_run_rows(run_id, offset, limit)
+
+def show_raw_data(run_id, summary, fingerprint):
+    """Show the raw rows a page at a time and offer the full file for download"""
+    total_rows = int(summary.xs("count", axis=1, level=1).max(axis=1).sum())
+    page_count = max(1, -(-total_rows // RAW_PAGE_SIZE))
+    page = st.number_input(
+        f"Page (of {page_count}, {RAW_PAGE_SIZE} rows each)",
+        min_value=1,
+        max_value=page_count,
+        value=1,
+    )
+    offset = (page - 1) * RAW_PAGE_SIZE
+    st.dataframe(read_raw_page(run_id, offset, RAW_PAGE_SIZE), use_container_width=True)
+
+    # The export is only written on request, then served from disk
+    if st.button("Prepare Raw Data Download"):
+        st.session_state.raw_export = (fingerprint, raw_export_path(run_id, fingerprint))
+    export_fingerprint, export_path = st.session_state.get("raw_export", (None, None))
+    if export_fingerprint != fingerprint or not os.path.exists(export_path):
+        return
+    size = os.path.getsize(export_path)
+    if size > MAX_DOWNLOAD_BYTES:
+        st.info(
+            f"The export is {size / 1e6:.0f} MB, too large to download through "
+            f"the browser. It was saved to {os.path.abspath(export_path)}."
+        )
+    else:
+        with open(export_path, "rb") as f:
+            st.download_button(
+                label="Download Raw Experiment Data",
+                data=f,
+                file_name="blockchain_experiment_raw_data.csv",
+                mime="text/csv",
+            )
+
+def show_distribution(stats, confidence):
+    """Per contract and operation spread, tail percentiles and mean interval"""
+    st.subheader("Distribution Statistics")
+    level = f"{confidence:.0%}"
+    table = stats.rename(
+        columns={
+            "count": "Rows",
+            "mean": "Mean",
+            "ci_low": f"Mean {level} CI Low",
+            "ci_high": f"Mean {level} CI High",
+            "std": "Std Dev",
+            "p50": "p50",
+            "p90": "p90",
+            "p99": "p99",
+            "max": "Max",
+        }
+    )
+    st.dataframe(table.round(2), use_container_width=True)
+    st.download_button(
+        label="Download Distribution Statistics",
+        data=table.to_csv(),
+        file_name="blockchain_performance_distribution.csv",
+        mime="text/csv",
+    )
+
+def show_cost_projection(means):
+    """Project the measured mean gas per record to fiat costs"""
+    with st.expander("Cost projection"):
+        col1, col2 = st.columns(2)
+        records = col1.number_input("Records", min_value=1, value=1_000_000)
+        eth_price = col2.number_input("ETH price", min_value=0.0, value=ETH_PRICE)
+        gas_per_record = {
+            name: {"add": row["add_gas_used"], "delete": row["delete_gas_used"]}
+            for name, row in means.iterrows()
+        }
+        costs = cost_table(gas_per_record, records, GAS_PRICE_SCENARIOS, eth_price)
+        st.dataframe(
+            costs[
+                [
+                    "contract_name",
+                    "scenario",
+                    "gas_price_gwei",
+                    "total_gas",
+                    "total_cost_eth",
+                    "total_cost_fiat",
+                    "cost_per_record_fiat",
+                ]
+            ].round(6),
+            use_container_width=True,
+        )
+
+def comparison_values(means, gains, baseline, metrics):
+    """`(contract_names, values, improvements)` for `bar_chart_png`"""
+    contract_names = [baseline] + [name for name in means.index if name != baseline]
+    values = tuple(
+        tuple(means.loc[name, m] for m in metrics) for name in contract_names
+    )
+    improvements = tuple(
+        None if name == baseline else tuple(gains[name][m] for m in metrics)
+        for name in contract_names
+    )
+    return tuple(contract_names), values, improvements
+
+def analyze_and_visualize(
+    summary,
+    stats,
+    improvement_cis,
+    baseline,
+    run_id=None,
+    fingerprint=None,
+    warmup=0,
+    confidence=CONFIDENCE,
+):
+    """Analyze and visualize experiment data"""
+    if summary.empty:
         st.warning("No data to analyze")
         return
-    
-    # Split data for each contract type
-    basic_data = df[df["contract_name"] == "BasicContract"]
-    light_data = df[df["contract_name"] == "LightweightContract"]
-    
-    if basic_data.empty or light_data.empty:
-        st.warning("Missing data for one or both contract types")
+
+    if len(summary.index) < 2 or baseline not in summary.index:
+        st.warning("Need data for the baseline and at least one other contract type")
         return
 
-    # Calculate summary statistics
-    basic_add_gas_avg = basic_data["add_gas_used"].mean()
-    light_add_gas_avg = light_data["add_gas_used"].mean()
-    add_gas_improvement = (
-        (basic_add_gas_avg - light_add_gas_avg) / basic_add_gas_avg
-    ) * 100
-
-    basic_del_gas_avg = basic_data["delete_gas_used"].mean()
-    light_del_gas_avg = light_data["delete_gas_used"].mean()
-    del_gas_improvement = (
-        (basic_del_gas_avg - light_del_gas_avg) / basic_del_gas_avg
-    ) * 100
-
-    # Time Statistics
-    basic_add_time_avg = basic_data["add_time"].mean()
-    light_add_time_avg = light_data["add_time"].mean()
-    add_time_improvement = (
-        (basic_add_time_avg - light_add_time_avg) / basic_add_time_avg
-    ) * 100
-
-    basic_del_time_avg = basic_data["delete_time"].mean()
-    light_del_time_avg = light_data["delete_time"].mean()
-    del_time_improvement = (
-        (basic_del_time_avg - light_del_time_avg) / basic_del_time_avg
-    ) * 100
-
-    # Create summary data
-    summary_data = {
-        "Operation": [
-            "Add Gas Used",
-            "Delete Gas Used",
-            "Add Time (ms)",
-            "Delete Time (ms)",
-        ],
-        "BasicContract": [
-            basic_add_gas_avg,
-            basic_del_gas_avg,
-            basic_add_time_avg,
-            basic_del_time_avg,
-        ],
-        "LightweightContract": [
-            light_add_gas_avg,
-            light_del_gas_avg,
-            light_add_time_avg,
-            light_del_time_avg,
-        ],
-        "Improvement (%)": [
-            add_gas_improvement,
-            del_gas_improvement,
-            add_time_improvement,
-            del_time_improvement,
-        ],
+    # Summary statistics, computed once per results file
+    means = summary.xs("mean", axis=1, level=1)
+    gains = {
+        name: improvement(means.loc[baseline], means.loc[name])
+        for name in means.index
+        if name != baseline
     }
 
-    summary_df = pd.DataFrame(summary_data)
+    operations = {
+        "Add Gas Used": "add_gas_used",
+        "Delete Gas Used": "delete_gas_used",
+        "Add Time (ms)": "add_time",
+        "Delete Time (ms)": "delete_time",
+    }
+    summary_df = pd.DataFrame({"Operation": list(operations)})
+    for name in means.index:
+        summary_df[name] = [means.loc[name, m] for m in operations.values()]
+    level = f"{confidence:.0%}"
+    for name, contract_gains in gains.items():
+        summary_df[f"{name} Improvement (%)"] = [
+            contract_gains[m] for m in operations.values()
+        ]
+        if name in improvement_cis:
+            cis = improvement_cis[name]
+            summary_df[f"{name} Improvement {level} CI Low"] = [
+                cis.loc[m, "ci_low"] for m in operations.values()
+            ]
+            summary_df[f"{name} Improvement {level} CI High"] = [
+                cis.loc[m, "ci_high"] for m in operations.values()
+            ]
 
     # Create tabs for different views
-    tab1, tab2, tab3, tab4 = st.tabs(
-        ["Tabular View", "Box Plots", "Bar Charts", "Raw Data"]
+    tab1, tab_distribution, tab2, tab3, tab4 = st.tabs(
+        ["Tabular View", "Distribution", "Box Plots", "Bar Charts", "Raw Data"]
     )
 
     with tab1:
         st.subheader("Performance Summary Table")
         st.dataframe(summary_df.round(2), use_container_width=True)
 
+        # Failed operations are left out of every statistic
+        failures = failure_counts(summary)
+        if not failures.empty and failures.to_numpy().any():
+            st.warning("Some operations failed and are excluded from the statistics")
+            st.dataframe(
+                failures.rename(
+                    columns={"add_failed": "Failed Adds", "delete_failed": "Failed Deletes"}
+                ),
+                use_container_width=True,
+            )
+
         # Add download button for the summary
         csv = summary_df.to_csv(index=False)
         st.download_button(
@@ -107,161 +373,127 @@ def analyze_and_visualize(df):
             mime="text/csv",
         )
 
+        show_cost_projection(means)
+
+    with tab_distribution:
+        show_distribution(stats, confidence)
+
     with tab2:
         st.subheader("Performance Box Plots")
 
         col1, col2 = st.columns(2)
 
         with col1:
-            # 1. Gas Usage Comparison - Add Operation
-            fig, ax = plt.subplots(figsize=(8, 5))
-            sns.boxplot(data=df, x="contract_name", y="add_gas_used", ax=ax)
-            ax.set_title("Add Operation: Gas Usage")
-            ax.set_xlabel("Contract Type")
-            ax.set_ylabel("Gas Used")
-            st.pyplot(fig)
-
-            # 3. Execution Time Comparison - Add Operation
-            fig, ax = plt.subplots(figsize=(8, 5))
-            sns.boxplot(data=df, x="contract_name", y="add_time", ax=ax)
-            ax.set_title("Add Operation: Execution Time")
-            ax.set_xlabel("Contract Type")
-            ax.set_ylabel("Execution Time (ms)")
-            st.pyplot(fig)
+            show_box_plot(
+                run_id,
+                "add_gas_used",
+                "Add Operation: Gas Usage",
+                "Gas Used",
+                fingerprint,
+                warmup,
+            )
+            show_box_plot(
+                run_id,
+                "add_time",
+                "Add Operation: Execution Time",
+                "Execution Time (ms)",
+                fingerprint,
+                warmup,
+            )
 
         with col2:
-            # 2. Gas Usage Comparison - Delete Operation
-            fig, ax = plt.subplots(figsize=(8, 5))
-            sns.boxplot(data=df, x="contract_name", y="delete_gas_used", ax=ax)
-            ax.set_title("Delete Operation: Gas Usage")
-            ax.set_xlabel("Contract Type")
-            ax.set_ylabel("Gas Used")
-            st.pyplot(fig)
-
-            # 4. Execution Time Comparison - Delete Operation
-            fig, ax = plt.subplots(figsize=(8, 5))
-            sns.boxplot(data=df, x="contract_name", y="delete_time", ax=ax)
-            ax.set_title("Delete Operation: Execution Time")
-            ax.set_xlabel("Contract Type")
-            ax.set_ylabel("Execution Time (ms)")
-            st.pyplot(fig)
+            show_box_plot(
+                run_id,
+                "delete_gas_used",
+                "Delete Operation: Gas Usage",
+                "Gas Used",
+                fingerprint,
+                warmup,
+            )
+            show_box_plot(
+                run_id,
+                "delete_time",
+                "Delete Operation: Execution Time",
+                "Execution Time (ms)",
+                fingerprint,
+                warmup,
+            )
 
     with tab3:
         st.subheader("Performance Bar Charts")
-
-        # Gas comparison bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bar_width = 0.35
-        x = np.arange(2)
-
-        # Plot gas usage bars
-        ax.bar(
-            x - bar_width / 2,
-            [basic_add_gas_avg, basic_del_gas_avg],
-            bar_width,
-            label="BasicContract",
-            color="royalblue",
+        st.caption(f"Bars are annotated with their improvement over {baseline}")
+        st.image(
+            bar_chart_png(
+                "Gas Usage Comparison",
+                "Gas Used",
+                *comparison_values(
+                    means, gains, baseline, ["add_gas_used", "delete_gas_used"]
+                ),
+            )
         )
-        ax.bar(
-            x + bar_width / 2,
-            [light_add_gas_avg, light_del_gas_avg],
-            bar_width,
-            label="LightweightContract",
-            color="lightgreen",
+        st.image(
+            bar_chart_png(
+                "Execution Time Comparison",
+                "Execution Time (ms)",
+                *comparison_values(means, gains, baseline, ["add_time", "delete_time"]),
+            )
         )
 
-        # Add labels and annotations
-        ax.set_ylabel("Gas Used")
-        ax.set_title("Gas Usage Comparison")
-        ax.set_xticks(x)
-        ax.set_xticklabels(["Add Operation", "Delete Operation"])
-        ax.legend()
-
-        # Add improvement annotations
-        ax.annotate(
-            f"{add_gas_improvement:.1f}% improvement",
-            xy=(x[0], min(basic_add_gas_avg, light_add_gas_avg) / 2),
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle="round", fc="yellow", alpha=0.6),
-        )
-        ax.annotate(
-            f"{del_gas_improvement:.1f}% improvement",
-            xy=(x[1], min(basic_del_gas_avg, light_del_gas_avg) / 2),
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle="round", fc="yellow", alpha=0.6),
-        )
-
-        st.pyplot(fig)
-
-        # Time comparison bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
+    with tab4:
+        st.subheader("Raw Experiment Data")
+        show_raw_data(run_id, summary, fingerprint)
 
-        # Plot time usage bars
-        ax.bar(
-            x - bar_width / 2,
-            [basic_add_time_avg, basic_del_time_avg],
-            bar_width,
-            label="BasicContract",
-            color="royalblue",
-        )
-        ax.bar(
-            x + bar_width / 2,
-            [light_add_time_avg, light_del_time_avg],
-            bar_width,
-            label="LightweightContract",
-            color="lightgreen",
-        )
+def main():    
+    run_id, run = select_run()
+    if run is None and run_id is None and not os.path.exists(LEGACY_RESULTS_FILE):
+        st.warning("No experiment data found. Please run an experiment first.")
+        return
 
-        # Add labels and annotations
-        ax.set_ylabel("Execution Time (ms)")
-        ax.set_title("Execution Time Comparison")
-        ax.set_xticks(x)
-        ax.set_xticklabels(["Add Operation", "Delete Operation"])
-        ax.legend()
+    if run is not None:
+        with st.expander("Run details"):
+            st.json(run)
 
-        # Add improvement annotations
-        ax.annotate(
-            f"{add_time_improvement:.1f}% improvement",
-            xy=(x[0], min(basic_add_time_avg, light_add_time_avg) / 2),
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle="round", fc="yellow", alpha=0.6),
-        )
-        ax.annotate(
-            f"{del_time_improvement:.1f}% improvement",
-            xy=(x[1], min(basic_del_time_avg, light_del_time_avg) / 2),
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle="round", fc="yellow", alpha=0.6),
-        )
+    # Summaries and plots are cached per results fingerprint. The summary is
+    # merged from per-part aggregates; distribution statistics and box plots
+    # load their columns of every row once per fingerprint and setting
+    fingerprint = run_fingerprint(run_id)
 
-        st.pyplot(fig)
+    # The first rows of a run include warmup effects (cold caches, connection
+    # setup) that skew means and tails
+    warmup = st.sidebar.number_input(
+        "Warmup rows excluded per contract", min_value=0, value=0, step=10
+    )
+    confidence = st.sidebar.selectbox(
+        "Confidence level", [0.90, 0.95, 0.99], index=1, format_func="{:.0%}".format
+    )
 
-    with tab4:
-        st.subheader("Raw Experiment Data")
-        st.dataframe(df, use_container_width=True)
+    # Every contract in the run is compared against the chosen baseline
+    contract_names = list(run_summary(fingerprint).index)
+    baseline = st.sidebar.selectbox(
+        "Baseline contract",
+        contract_names,
+        index=contract_names.index("BasicContract")
+        if "BasicContract" in contract_names
+        else 0,
+    )
 
-        # Add download button for the raw data
-        raw_csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download Raw Experiment Data",
-            data=raw_csv,
-            file_name="blockchain_experiment_raw_data.csv",
-            mime="text/csv",
-        )
+    # Display the performance comparison header
+    st.subheader(f"Contract Performance Comparison against {baseline}")
 
-def main():    
-    # Load and display the experiment results
-    df = load_experiment_file()
-    
-    if df is not None:
-        # Display the performance comparison header
-        st.subheader("BasicContract vs LightweightContract Performance Comparison")
-        
-        # Analyze and visualize the data
-        analyze_and_visualize(df)
+    # Analyze and visualize the data
+    summary, stats, improvement_cis = run_statistics(
+        run_id, fingerprint, warmup, confidence, baseline
+    )
+    analyze_and_visualize(
+        summary,
+        stats,
+        improvement_cis,
+        baseline,
+        run_id,
+        fingerprint,
+        warmup,
+        confidence,
+    )
     
 if __name__ == "__main__":
     st.set_page_config(
@@ -0,0 +1,148 @@
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+import os
+from utils.analytics import file_fingerprint
+from utils.profiling import PROFILE_FILE, load_profile
+from utils.results_store import list_runs, run_dir
+
+# Stages whose time is spent in this process rather than waiting on the node
+HARNESS_STAGES = ["read_rows", "tx_encode", "record_results", "progress"]
+
+@st.cache_data(show_spinner=False, max_entries=1_000)
+def cached_profile(directory, mtime_ns, size):
+    """Profile saved in `directory`. Keyed on the file's modification time
+    and size, so reruns only read profiles written since."""
+    return load_profile(directory)
+
+def profiled_runs():
+    """`{run_id: (run metadata, profile)}` of every run saved with a profile"""
+    runs = {}
+    for run in list_runs():
+        directory = run_dir(run["run_id"])
+        path = os.path.join(directory, PROFILE_FILE)
+        if os.path.exists(path):
+            runs[run["run_id"]] = (run, cached_profile(directory, *file_fingerprint(path)))
+    return runs
+
+def stage_table(profile):
+    stages = pd.DataFrame.from_dict(profile["stages"], orient="index")
+    stages.index.name = "stage"
+    return stages.sort_values("total_ms", ascending=False)
+
+def show_overview(profile, history):
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Wall time (s)", f"{profile['wall_time']:.1f}")
+    col2.metric("Rows", profile["rows"])
+    # Compared with the median of the runs before this one
+    earlier = history["rows_per_second"].iloc[:-1]
+    delta = None
+    if len(earlier):
+        delta = f"{profile['rows_per_second'] - earlier.median():.1f} vs median"
+    col3.metric("Rows per second", f"{profile['rows_per_second']:.1f}", delta)
+    col4.metric("Function profiler", profile["profiler"] or "Off")
+
+def show_stages(profile):
+    st.subheader("Per-stage Breakdown")
+    st.caption(
+        "Times are summed over every occurrence. Transaction phases overlap "
+        "across the in-flight window, so their totals can exceed the wall time; "
+        "tx_receipt is mostly the node mining, tx_send the RPC round-trip."
+    )
+    stages = stage_table(profile)
+    fig, ax = plt.subplots(figsize=(10, 4))
+    colors = [
+        "darkorange" if stage in HARNESS_STAGES else "steelblue"
+        for stage in stages.index
+    ]
+    ax.barh(stages.index, stages["total_ms"] / 1000, color=colors)
+    ax.invert_yaxis()
+    ax.set_xlabel("Total time (s)")
+    ax.set_title("Time per stage (orange: spent in the harness)")
+    st.pyplot(fig)
+    plt.close(fig)
+    st.dataframe(stages.round(3), use_container_width=True)
+
+    if profile["rpc"]:
+        st.subheader("RPC Requests")
+        st.dataframe(pd.DataFrame([profile["rpc"]]), use_container_width=True)
+
+def show_throughput(profile):
+    st.subheader("Throughput over Time")
+    timeline = pd.DataFrame(profile["timeline"])
+    if timeline.empty:
+        st.info("No rows were completed in this run")
+        return
+    st.line_chart(timeline.set_index("elapsed")["rows_per_second"])
+
+def show_functions(profile):
+    if not profile["top_functions"]:
+        return
+    st.subheader("Top Functions")
+    st.caption(
+        "cProfile times in ms"
+        if profile["profiler"] == "cprofile"
+        else "Share of stack samples in which a function was running (self) or "
+        "on the stack (total)"
+    )
+    st.dataframe(pd.DataFrame(profile["top_functions"]), use_container_width=True)
+
+def run_history(runs):
+    """Throughput and harness stage means of every profiled run, oldest first"""
+    rows = []
+    for run_id, (run, profile) in runs.items():
+        row = {
+            "run_id": run_id,
+            "created_at": run.get("created_at"),
+            "rows": profile["rows"],
+            "rows_per_second": profile["rows_per_second"],
+        }
+        for stage in HARNESS_STAGES:
+            row[f"{stage}_mean_ms"] = profile["stages"].get(stage, {}).get("mean_ms")
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("created_at").reset_index(drop=True)
+
+def show_history(history):
+    st.subheader("Harness Performance across Runs")
+    fig, ax = plt.subplots(figsize=(10, 4))
+    sns.lineplot(data=history, x="run_id", y="rows_per_second", marker="o", ax=ax)
+    ax.set_xlabel("Run")
+    ax.set_ylabel("Rows per second")
+    ax.tick_params(axis="x", rotation=45)
+    st.pyplot(fig)
+    plt.close(fig)
+    st.dataframe(history.round(3), use_container_width=True)
+
+def main():
+    st.header("Performance Dashboard")
+    runs = profiled_runs()
+    if not runs:
+        st.warning(
+            "No profiled runs found. Runs started from the Run Experiment page "
+            "or `python runner.py` are profiled automatically."
+        )
+        return
+
+    history = run_history(runs)
+    run_id = st.sidebar.selectbox(
+        "Experiment run", list(history["run_id"])[::-1]
+    )
+    run, profile = runs[run_id]
+    with st.expander("Run details"):
+        st.json(run)
+
+    show_overview(profile, history[: history.index[history["run_id"] == run_id][0] + 1])
+    show_stages(profile)
+    show_throughput(profile)
+    show_functions(profile)
+    show_history(history)
+
+if __name__ == "__main__":
+    st.set_page_config(
+        layout="wide",
+        page_title="Performance Dashboard",
+        page_icon="⏱️",
+        initial_sidebar_state="expanded",
+    )
+    main()
@@ -2,6 +2,133 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+from utils.workload import SCALING_SWEEP_OUTPUT, summarize_scaling_sweep
+
+CONTRACT_COLORS = {"BasicContract": "#3366cc", "LightweightContract": "#cc6633"}
+
+
+def plot_scaling(ax, points, x, y, title, xlabel, ylabel, theory):
+    """Plot measured `y` against `x` per contract, with the growth each
+    contract's theoretical complexity predicts from its first point dashed"""
+    for name, contract_points in points.groupby("contract_name"):
+        contract_points = contract_points.sort_values(x)
+        color = CONTRACT_COLORS.get(name)
+        ax.plot(
+            contract_points[x], contract_points[y], "o-", color=color, label=name
+        )
+        first = contract_points.iloc[0]
+        expected = first[y] * theory(name, contract_points[x] / first[x])
+        ax.plot(
+            contract_points[x],
+            expected,
+            "--",
+            color=color,
+            alpha=0.6,
+            label=f"{name} (theory)",
+        )
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(linestyle="--", alpha=0.7)
+    ax.legend(fontsize="small")
+
+
+def per_field_theory(name, ratio):
+    # O(m) per record for Basic, independent of the record width for Lightweight
+    return ratio if name == "BasicContract" else ratio**0
+
+
+def per_record_theory(name, ratio):
+    # O(n) in the number of records for both contracts
+    return ratio
+
+
+def empirical_scaling_section():
+    st.subheader("Empirical Scaling")
+    if not os.path.exists(SCALING_SWEEP_OUTPUT):
+        st.info(
+            "Run a scaling sweep to compare these claims with measurements, e.g. "
+            "`python runner.py --scaling-fields 1 2 4 8 16 "
+            "--scaling-field-lengths 16 64 --scaling-records 10 100`"
+        )
+        return
+
+    summary = summarize_scaling_sweep(pd.read_csv(SCALING_SWEEP_OUTPUT))
+    col1, col2, col3 = st.columns(3)
+    field_length = col1.selectbox(
+        "Field length", sorted(summary["field_length"].unique())
+    )
+    field_count = col2.selectbox(
+        "Number of fields", sorted(summary["field_count"].unique())
+    )
+    record_counts = sorted(summary["record_count"].unique())
+    record_count = col3.selectbox(
+        "Record count", record_counts, index=len(record_counts) - 1
+    )
+
+    at_count = summary[summary["record_count"] == record_count]
+    by_fields = at_count[at_count["field_length"] == field_length]
+    by_length = at_count[at_count["field_count"] == field_count]
+    by_records = summary[
+        (summary["field_count"] == field_count)
+        & (summary["field_length"] == field_length)
+    ]
+
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    plot_scaling(
+        axes[0, 0],
+        by_fields,
+        "field_count",
+        "add_gas_per_record",
+        f"Add gas vs. number of fields ({field_length} chars each)",
+        "Fields per record (m)",
+        "Gas per record",
+        per_field_theory,
+    )
+    plot_scaling(
+        axes[0, 1],
+        by_length,
+        "field_length",
+        "add_gas_per_record",
+        f"Add gas vs. field length ({field_count} fields)",
+        "Characters per field",
+        "Gas per record",
+        per_field_theory,
+    )
+    plot_scaling(
+        axes[1, 0],
+        by_fields,
+        "field_count",
+        "storage_slots_per_record",
+        "Estimated storage vs. number of fields",
+        "Fields per record (m)",
+        "Storage slots per record",
+        per_field_theory,
+    )
+    plot_scaling(
+        axes[1, 1],
+        by_records,
+        "record_count",
+        "total_add_gas",
+        "Total add gas vs. record count",
+        "Records (n)",
+        "Total gas",
+        per_record_theory,
+    )
+    plt.tight_layout()
+    st.pyplot(fig)
+
+    st.caption(
+        "Dashed lines extrapolate each contract's first measurement with its "
+        "theoretical complexity: O(n×m) storage for Basic, O(n) for Lightweight. "
+        "Storage is estimated from each contract's record layout."
+    )
+    latency = by_fields.pivot(
+        index="field_count", columns="contract_name", values="add_time_p50"
+    )
+    st.markdown("**Median add latency (ms) by number of fields**")
+    st.dataframe(latency.round(2), use_container_width=True)
 
 
 def theoretical_analysis_page():
@@ -165,6 +292,8 @@ def theoretical_analysis_page():
     table_df = pd.DataFrame(comparison_data)
     st.table(table_df)
 
+    empirical_scaling_section()
+
     # Conclusion Section
     st.subheader("Conclusion")
 
@@ -0,0 +1,295 @@
+"""Read-path benchmark for the contracts' view functions.
+
+Stores dataset rows (with `--populate`), then issues concurrent `eth_call`s to
+every view function of every contract, optionally grouped into JSON-RPC batch
+requests, and reports throughput and latency percentiles:
+
+    python read_benchmark.py --dataset datasets/doctors.csv --populate --ipfs
+
+With `--ipfs` the rows are stored with real CIDs, and the end-to-end
+Lightweight read (getRecordIPFSHash, then the content from IPFS) is measured
+as well.
+"""
+import argparse
+import asyncio
+import os
+import time
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+import runner
+from connection import close_async_w3, connect_async_w3, get_async_contracts
+from utils.common import RECORD_ID_OFFSET, common_parser
+from utils.contract_registry import deployed_addresses
+from utils.dataset import DEFAULT_CHUNK_SIZE, iter_batches, iter_rows
+from utils.hashing import record_hash
+from utils.ipfs_utils import IPFSUploader, fetch_from_ipfs, make_ipfs_session
+from utils.record_encoding import digest_to_cid
+from verify_records import populate_records
+
+READ_FUNCTIONS = {
+    "BasicContract": ["getRecord"],
+    "LightweightContract": ["getRecord", "getRecordIPFSHash", "verifyRecord"],
+    "PrehashedContract": ["getRecord", "getRecordIPFSHash", "verifyRecord"],
+    "PackedContract": ["getRecord", "getField"],
+    "CompactLightweightContract": ["getRecord", "getRecordIPFSHash", "verifyRecord"],
+    # EventLogContract has no view functions, its records are read from logs
+}
+# Contracts whose records carry a CID for the end-to-end read
+IPFS_CONTRACT_NAMES = [
+    "LightweightContract",
+    "PrehashedContract",
+    "CompactLightweightContract",
+]
+END_TO_END = "getRecordIPFSHash+ipfs_cat"
+DEFAULT_MAX_ROWS = 1_000
+DEFAULT_CONCURRENCY = 64
+READ_OUTPUT = os.path.join("results", "read_benchmark.csv")
+
+
+def read_call(name, contract, function_name, record_id, fields):
+    """Bind a view function with the arguments each contract expects"""
+    if function_name == "verifyRecord":
+        if name == "PrehashedContract":
+            return contract.functions.verifyRecord(record_id, record_hash(fields))
+        return contract.functions.verifyRecord(record_id, fields)
+    if function_name == "getField":
+        return contract.functions.getField(record_id, 0)
+    return getattr(contract.functions, function_name)(record_id)
+
+
+async def time_calls(async_w3, calls, concurrency, batch_size=None):
+    """Issue `calls` with up to `concurrency` requests in flight, one call per
+    request or `batch_size` calls per JSON-RPC batch.
+
+    Returns the latency of every successful call in milliseconds (a batched
+    call takes as long as its whole batch), the number of failed calls and
+    the wall time in seconds.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def single(call):
+        nonlocal errors
+        async with slots:
+            started_at = time.perf_counter_ns()
+            try:
+                await call.call()
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter_ns() - started_at) / 1e6)
+
+    async def batched(batch_calls):
+        nonlocal errors
+        async with slots:
+            started_at = time.perf_counter_ns()
+            try:
+                async with async_w3.batch_requests() as batch:
+                    for call in batch_calls:
+                        batch.add(call)
+                    await batch.async_execute()
+            except Exception:
+                errors += len(batch_calls)
+                return
+            elapsed = (time.perf_counter_ns() - started_at) / 1e6
+            latencies.extend([elapsed] * len(batch_calls))
+
+    started_at = time.perf_counter()
+    if batch_size:
+        requests = (batched(batch) for batch in iter_batches(calls, batch_size))
+    else:
+        requests = (single(call) for call in calls)
+    await asyncio.gather(*requests)
+    return latencies, errors, time.perf_counter() - started_at
+
+
+async def time_end_to_end(contract, record_ids, concurrency, ipfs_session):
+    """Time reading each record's CID on-chain and then its content from IPFS"""
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def read(record_id):
+        nonlocal errors
+        async with slots:
+            started_at = time.perf_counter_ns()
+            try:
+                record = await contract.functions.getRecordIPFSHash(record_id).call()
+                # The compact variant returns the bare digest of the CID
+                if isinstance(record, bytes):
+                    cid = digest_to_cid(record)
+                else:
+                    cid = record[2]
+                await asyncio.to_thread(fetch_from_ipfs, cid, ipfs_session)
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter_ns() - started_at) / 1e6)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(read(record_id) for record_id in record_ids))
+    return latencies, errors, time.perf_counter() - started_at
+
+
+def latency_row(contract_name, function_name, mode, latencies, errors, wall_time):
+    calls = len(latencies)
+    row = {
+        "contract_name": contract_name,
+        "function": function_name,
+        "mode": mode,
+        "calls": calls,
+        "errors": errors,
+        "wall_time": wall_time,
+        "calls_per_second": calls / wall_time if wall_time else 0.0,
+    }
+    if calls:
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        row.update(
+            {
+                "mean_ms": float(np.mean(latencies)),
+                "p50_ms": p50,
+                "p90_ms": p90,
+                "p99_ms": p99,
+                "max_ms": max(latencies),
+            }
+        )
+    return row
+
+
+async def benchmark_reads(
+    dataset_path,
+    contract_names=runner.CONTRACT_NAMES,
+    max_rows=DEFAULT_MAX_ROWS,
+    concurrency=DEFAULT_CONCURRENCY,
+    batch_size=None,
+    end_to_end=False,
+    chunksize=DEFAULT_CHUNK_SIZE,
+):
+    """Benchmark every view function of `contract_names` over the first
+    `max_rows` stored rows. Returns one summary row per contract and
+    function."""
+    rows = [
+        (index + RECORD_ID_OFFSET, fields)
+        for index, fields in islice(iter_rows(dataset_path, chunksize), max_rows)
+    ]
+    mode = f"batch{batch_size}" if batch_size else "call"
+    async_w3 = await connect_async_w3(pool_size=concurrency)
+    contracts = get_async_contracts(async_w3)
+    ipfs_session = make_ipfs_session(concurrency) if end_to_end else None
+    benchmark_data = []
+    try:
+        for name in contract_names:
+            contract = contracts[name]
+            for function_name in READ_FUNCTIONS.get(name, []):
+                calls = [
+                    read_call(name, contract, function_name, index, fields)
+                    for index, fields in rows
+                ]
+                result = await time_calls(async_w3, calls, concurrency, batch_size)
+                benchmark_data.append(latency_row(name, function_name, mode, *result))
+            if end_to_end and name in IPFS_CONTRACT_NAMES:
+                result = await time_end_to_end(
+                    contract, [index for index, _ in rows], concurrency, ipfs_session
+                )
+                benchmark_data.append(latency_row(name, END_TO_END, "call", *result))
+    finally:
+        await close_async_w3(async_w3)
+        if ipfs_session is not None:
+            ipfs_session.close()
+    return benchmark_data
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the contracts' view functions",
+        parents=[common_parser()],
+    )
+    parser.add_argument("--dataset", required=True, help="Path to the CSV dataset")
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help="Stored rows read per view function",
+    )
+    parser.add_argument(
+        "--populate",
+        action="store_true",
+        help="Store the rows in every contract before reading them",
+    )
+    parser.add_argument(
+        "--ipfs",
+        action="store_true",
+        help="Store rows with real CIDs and measure the end-to-end IPFS read",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Requests kept in flight",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="Calls per JSON-RPC batch request to compare (0 sends every call "
+        "on its own)",
+    )
+    parser.add_argument(
+        "--output", default=READ_OUTPUT, help="CSV file to write the summary to"
+    )
+    args = parser.parse_args(argv)
+    deployed = deployed_addresses()
+    missing = [name for name in args.contracts if name not in deployed]
+    if missing:
+        parser.error(
+            f"Contracts not deployed: {', '.join(missing)} "
+            f"(deployed: {', '.join(deployed) or 'none'})"
+        )
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.populate:
+        for name in args.contracts:
+            uploader = None
+            if args.ipfs and name in IPFS_CONTRACT_NAMES:
+                uploader = IPFSUploader()
+            stored, failed = populate_records(
+                args.dataset,
+                name,
+                gas=args.gas,
+                chunksize=args.chunksize,
+                max_rows=args.max_rows,
+                ipfs_uploader=uploader,
+            )
+            if uploader is not None:
+                uploader.close()
+            print(f"Stored {stored} rows in {name} ({failed} failed transactions)")
+
+    benchmark_data = []
+    for batch_size in args.batch_sizes:
+        benchmark_data += asyncio.run(
+            benchmark_reads(
+                args.dataset,
+                contract_names=args.contracts,
+                max_rows=args.max_rows,
+                concurrency=args.concurrency,
+                batch_size=batch_size,
+                # The end-to-end read does not depend on the batch size
+                end_to_end=args.ipfs and batch_size == args.batch_sizes[0],
+                chunksize=args.chunksize,
+            )
+        )
+    output_path = runner.save_results(benchmark_data, args.output)
+    print(pd.DataFrame(benchmark_data).round(2).to_string(index=False))
+    print(f"Saved read benchmark to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
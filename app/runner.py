@@ -0,0 +1,1161 @@
+"""Headless experiment runner.
+
+Runs the addRecord/deleteRecord experiment without Streamlit, either from the
+command line:
+
+    python runner.py --dataset datasets/doctors.csv --output results/output.csv
+
+or as a library from the Streamlit pages via `run_experiment`. An interrupted
+run continues from its checkpoint with `python runner.py --resume <run_id>`.
+"""
+import argparse
+import asyncio
+import os
+import time
+from itertools import islice, tee
+
+import numpy as np
+import pandas as pd
+
+from connection import (
+    chain_metadata,
+    close_async_w3,
+    connect_async_w3,
+    get_async_contracts,
+)
+from utils.dataset import (
+    DEFAULT_CHUNK_SIZE,
+    count_rows,
+    iter_batches,
+    iter_rows,
+    row_to_csv,
+)
+from utils.cid_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, CIDCache
+from utils.hashing import hash_rows, record_hash
+from utils.profiling import PROFILERS, RunProfiler
+from utils.ipfs_utils import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, IPFSUploader
+from utils.checkpoint import CheckpointTracker, load_checkpoint
+from utils.common import CONTRACT_NAMES, RECORD_ID_OFFSET, common_parser
+from utils.contract_registry import EVENT_LOG_CONTRACT_NAMES
+from utils.cost_model import (
+    ETH_PRICE,
+    GAS_PRICE_SCENARIOS,
+    cost_table,
+    parse_gas_prices,
+)
+from utils.record_encoding import cid_digest, pack_fields
+from utils.results_store import ResultsWriter, read_metadata, run_dir
+from utils.tx_engine import PipelinedTxEngine, DEFAULT_GAS, DEFAULT_WINDOW
+from utils.workload import (
+    PLACEHOLDER_IPFS_HASH,
+    SCALING_SWEEP_OUTPUT,
+    check_record_shape,
+    summarize_scaling_sweep,
+    synthetic_rows,
+)
+
+DEFAULT_OUTPUT = os.path.join("results", "output.csv")
+BATCH_SWEEP_OUTPUT = os.path.join("results", "batch_sweep.csv")
+ESTIMATE_OUTPUT = os.path.join("results", "gas_estimates.csv")
+DEFAULT_CALIBRATION_ROWS = 20
+DEFAULT_ESTIMATE_CONCURRENCY = 64
+TIMING_PHASES = ["encode", "queue", "send", "receipt"]
+
+
+def timing_columns(operation, result):
+    """Flatten an engine result into `<operation>_*` result columns, with times
+    in milliseconds"""
+    columns = {
+        f"{operation}_gas_used": result["gas_used"],
+        f"{operation}_time": result["latency_ns"] / 1e6,
+        f"{operation}_status": result["status"],
+        f"{operation}_block_number": result["block_number"],
+        f"{operation}_confirmation_blocks": result["confirmation_blocks"],
+    }
+    for phase in TIMING_PHASES:
+        columns[f"{operation}_{phase}_time"] = result[f"{phase}_ns"] / 1e6
+    return columns
+
+
+def add_record_call(
+    name, contract, index, fields, ipfs_hash=PLACEHOLDER_IPFS_HASH
+):
+    """Bind addRecord with the arguments each contract expects"""
+    if name == "BasicContract":
+        return contract.functions.addRecord(index, fields)
+    if name == "PrehashedContract":
+        return contract.functions.addRecord(index, record_hash(fields), ipfs_hash)
+    if name == "PackedContract":
+        return contract.functions.addRecord(index, pack_fields(fields))
+    if name == "CompactLightweightContract":
+        return contract.functions.addRecord(index, fields, cid_digest(ipfs_hash))
+    if name == "EventLogHashContract":
+        return contract.functions.addRecordHash(index, record_hash(fields), ipfs_hash)
+    return contract.functions.addRecord(index, fields, ipfs_hash)
+
+
+def add_records_call(name, contract, record_ids, fields):
+    """Bind addRecords with the arguments each contract expects"""
+    ipfs_hashes = [PLACEHOLDER_IPFS_HASH] * len(record_ids)
+    if name == "BasicContract":
+        return contract.functions.addRecords(record_ids, fields)
+    if name == "PrehashedContract":
+        return contract.functions.addRecords(
+            record_ids, hash_rows(fields), ipfs_hashes
+        )
+    if name == "PackedContract":
+        return contract.functions.addRecords(
+            record_ids, [pack_fields(row_fields) for row_fields in fields]
+        )
+    if name == "CompactLightweightContract":
+        return contract.functions.addRecords(
+            record_ids, fields, [cid_digest(cid) for cid in ipfs_hashes]
+        )
+    if name == "EventLogHashContract":
+        return contract.functions.addRecordHashes(
+            record_ids, hash_rows(fields), ipfs_hashes
+        )
+    return contract.functions.addRecords(record_ids, fields, ipfs_hashes)
+
+
+async def record_exists(name, contract, record_id):
+    """Whether `record_id` is stored, read through the getRecord each contract
+    offers. Event-log variants store nothing, so this is never true for them.
+    """
+    if name in EVENT_LOG_CONTRACT_NAMES:
+        return False
+    record = await contract.functions.getRecord(record_id).call()
+    if name == "PackedContract":
+        # The packed fields; a stored record is never empty
+        return len(record) != 0
+    if name == "CompactLightweightContract":
+        # (data_hash, cid_digest); the id is only the mapping key
+        return record[0] != bytes(32)
+    # The Record struct starts with its id, which is 0 for a missing record
+    return record[0] != 0
+
+
+def attach_cids(rows, uploader):
+    """Yield `(index, fields, cid)`, uploading each row to IPFS as a CSV line.
+    The uploader runs ahead of the consumer by a bounded number of batches."""
+    rows, upload_rows = tee(rows)
+    cids = uploader.upload_all(
+        (str(index), row_to_csv(fields)) for index, fields in upload_rows
+    )
+    for (index, fields), cid in zip(rows, cids):
+        yield index, fields, cid
+
+
+async def chunks_in_thread(rows, chunk_rows, on_wait=None):
+    """Yield lists of up to `chunk_rows` rows, read from `rows` on a worker
+    thread while the previous chunk is consumed.
+
+    For row sources that block, such as rows waiting for their IPFS upload:
+    the event loop keeps polling receipts while a chunk is read.
+    `on_wait(ns)` is called with the time spent waiting for each chunk.
+    """
+    rows = iter(rows)
+
+    def take():
+        return list(islice(rows, chunk_rows))
+
+    pending = asyncio.ensure_future(asyncio.to_thread(take))
+    while True:
+        started_at = time.perf_counter_ns()
+        chunk = await pending
+        if on_wait is not None:
+            on_wait(time.perf_counter_ns() - started_at)
+        if not chunk:
+            return
+        pending = asyncio.ensure_future(asyncio.to_thread(take))
+        yield chunk
+
+
+def reserved_rows(rows, reserve):
+    """Yield `rows`, calling `reserve(index)` before handing each one out"""
+    for row in rows:
+        reserve(row[0])
+        yield row
+
+
+def build_jobs(rows, contracts, skip=None):
+    """Yield addRecord/deleteRecord calls for every `(index, fields, ipfs_hash)`
+    row and contract, in order, leaving out pairs for which
+    `skip(contract_name, index)` is true"""
+    for index, fields, ipfs_hash in rows:
+        record_id = index + RECORD_ID_OFFSET
+        for name, contract in contracts.items():
+            if skip is not None and skip(name, index):
+                continue
+            add_fn = add_record_call(name, contract, record_id, fields, ipfs_hash)
+            tag = {"contract_name": name, "index": index}
+            yield add_fn, {**tag, "operation": "add"}
+            yield contract.functions.deleteRecord(record_id), {
+                **tag,
+                "operation": "delete",
+            }
+
+
+def build_batch_jobs(rows, contracts, batch_size):
+    """Yield addRecords/deleteRecords calls covering `rows` in batches"""
+    for batch in iter_batches(rows, batch_size):
+        record_ids = [index + RECORD_ID_OFFSET for index, _ in batch]
+        fields = [row_fields for _, row_fields in batch]
+        for name, contract in contracts.items():
+            add_fn = add_records_call(name, contract, record_ids, fields)
+            tag = {
+                "contract_name": name,
+                "index": batch[0][0],
+                "batch_size": batch_size,
+                "records": len(batch),
+            }
+            yield add_fn, {**tag, "operation": "add"}
+            yield contract.functions.deleteRecords(record_ids), {
+                **tag,
+                "operation": "delete",
+            }
+
+
+def pair_operations(on_pair):
+    """Wrap `on_pair(add_result, delete_result)` into an engine callback that
+    fires once both transactions for the same contract and index are mined"""
+    pending = {}
+
+    def on_result(result):
+        key = (result["contract_name"], result["index"])
+        operations = pending.setdefault(key, {})
+        operations[result["operation"]] = result
+        if len(operations) < 2:
+            return
+        del pending[key]
+        on_pair(operations["add"], operations["delete"])
+
+    return on_result
+
+
+async def run_jobs(
+    build,
+    contract_names,
+    concurrency,
+    gas,
+    on_result,
+    account=None,
+    receipt_batch_size=None,
+):
+    """Run the jobs produced by `build(contracts)` through the pipelined engine,
+    calling `on_result` with the result of every job, failed ones included
+    (status 0). Returns the engine's RPC request counts.
+
+    Transactions are sent from the unlocked node account `account` (the
+    node's first by default).
+    With `receipt_batch_size`, receipts are fetched in JSON-RPC batches.
+    """
+    async_w3 = await connect_async_w3()
+    contracts = {
+        name: contract
+        for name, contract in get_async_contracts(async_w3).items()
+        if name in contract_names
+    }
+    missing = [name for name in contract_names if name not in contracts]
+    if missing:
+        await close_async_w3(async_w3)
+        raise ValueError(f"Contracts not deployed: {', '.join(missing)}")
+
+    if account is None:
+        account = (await async_w3.eth.accounts)[0]
+    engine = PipelinedTxEngine(
+        async_w3,
+        account,
+        window=concurrency,
+        gas=gas,
+        receipt_batch_size=receipt_batch_size,
+    )
+    try:
+        await engine.run(build(contracts), on_result)
+    finally:
+        await close_async_w3(async_w3)
+    return engine.rpc_stats
+
+
+def run_experiment(
+    dataset_path,
+    contract_names=CONTRACT_NAMES,
+    concurrency=DEFAULT_WINDOW,
+    progress_callback=None,
+    progress_interval=0.5,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    gas=DEFAULT_GAS,
+    account=None,
+    shard=None,
+    ipfs_uploader=None,
+    results=None,
+    skip=None,
+    receipt_batch_size=None,
+    rpc_stats=None,
+    profiler=None,
+    reserve=None,
+    skipped=0,
+):
+    """Run the experiment over a CSV dataset and return the result rows.
+
+    Rows are appended to `results` as they complete; pass a `ResultsWriter`
+    to stream them to disk instead of collecting them in a list. Rows for
+    which `skip(contract_name, index)` is true are not sent, and
+    `reserve(index)` (e.g. `ResultsWriter.reserve`) is called with every row
+    before its transactions are built.
+
+    The dataset is streamed in chunks of `chunksize` rows rather than loaded
+    whole. `shard=(worker_id, workers)` restricts the run to every `workers`-th
+    row, as used by the multi-process load generator. With an `ipfs_uploader`,
+    every row is uploaded to IPFS and its real CID is stored by the contracts.
+    Rows wait for their CIDs off the event loop (the `ipfs_wait` stage), so
+    upload time never shows up in the transaction timings.
+
+    `progress_callback(done, total, last_row)` is called at most once every
+    `progress_interval` seconds, and once more when the run finishes, so
+    callers that redraw a UI stay off the hot path. `total` leaves out the
+    `skipped` rows, those measured before a resume.
+
+    With `receipt_batch_size`, receipts are fetched that many per JSON-RPC
+    batch request. The number of RPC requests sent is added to `rpc_stats`
+    if a dict is given.
+
+    Stage times, throughput over time and RPC counts are collected in
+    `profiler`, a `RunProfiler` the caller saves with the run.
+    """
+    profiler = profiler or RunProfiler()
+    dataset_rows = count_rows(dataset_path)
+    if shard is not None:
+        dataset_rows = -(-dataset_rows // shard[1])
+    total = dataset_rows * len(contract_names) - skipped
+    results = [] if results is None else results
+    done = 0
+    last_row = None
+    last_progress = 0.0
+
+    def on_pair(add_result, delete_result):
+        nonlocal done, last_row, last_progress
+        row = {
+            "contract_name": add_result["contract_name"],
+            "index": add_result["index"],
+            **timing_columns("add", add_result),
+            **timing_columns("delete", delete_result),
+        }
+        with profiler.stages.stage("record_results"):
+            results.append(row)
+        profiler.throughput.mark()
+        done += 1
+        last_row = row
+        now = time.monotonic()
+        if progress_callback is not None and now - last_progress >= progress_interval:
+            last_progress = now
+            with profiler.stages.stage("progress"):
+                progress_callback(done, total, row)
+
+    paired = pair_operations(on_pair)
+
+    def on_result(result):
+        profiler.add_transaction(result)
+        paired(result)
+
+    def row_jobs(rows, contracts):
+        if reserve is not None:
+            rows = reserved_rows(rows, reserve)
+        rows = profiler.stages.timed_iter(rows, "read_rows")
+        return build_jobs(rows, contracts, skip)
+
+    rows = iter_rows(dataset_path, chunksize, shard)
+    if ipfs_uploader is None:
+        rows = ((index, fields, PLACEHOLDER_IPFS_HASH) for index, fields in rows)
+
+        def build(contracts):
+            return row_jobs(rows, contracts)
+
+    else:
+        rows = attach_cids(rows, ipfs_uploader)
+
+        # Waiting for a CID would stall the event loop, and with it the
+        # receipts of every transaction in flight, so rows are read on a
+        # thread and only enter the window once their CIDs are known
+        async def build(contracts):
+            chunks = chunks_in_thread(
+                rows,
+                ipfs_uploader.batch_size * ipfs_uploader.workers,
+                lambda ns: profiler.stages.add("ipfs_wait", ns),
+            )
+            async for chunk in chunks:
+                for job in row_jobs(iter(chunk), contracts):
+                    yield job
+
+    with profiler.profile():
+        stats = asyncio.run(
+            run_jobs(
+                build,
+                contract_names,
+                concurrency,
+                gas,
+                on_result,
+                account,
+                receipt_batch_size,
+            )
+        )
+    profiler.rpc.update(stats)
+    if rpc_stats is not None:
+        rpc_stats.update(stats)
+    if progress_callback is not None and last_row is not None:
+        progress_callback(done, total, last_row)
+    return results
+
+
+def run_metadata(dataset_path, contract_names, concurrency, gas, **extra):
+    """Metadata stored with a run: dataset, contracts, runner and chain config"""
+    return {
+        "dataset": dataset_path,
+        "dataset_rows": count_rows(dataset_path),
+        "contracts": list(contract_names),
+        "concurrency": concurrency,
+        "gas": gas,
+        "chain": chain_metadata(),
+        **extra,
+    }
+
+
+async def reconcile_records(tracker, contract_names, window, gas):
+    """Remove records left on-chain by rows that were in flight when a run
+    stopped.
+
+    A row past a contract's checkpoint watermark that is not marked done may
+    have had its addRecord mined without the matching deleteRecord. Such rows
+    (up to the checkpoint's submitted mark, beyond which nothing was sent)
+    are looked up with `record_exists`, `window` at a time, and any record
+    still stored is deleted, so the row is measured again from a clean state.
+    Returns recordCount before and after, and the deleted ids, per contract.
+    Event-log variants keep no records and are skipped.
+    """
+    async_w3 = await connect_async_w3()
+    contracts = get_async_contracts(async_w3)
+    account = (await async_w3.eth.accounts)[0]
+    engine = PipelinedTxEngine(async_w3, account, window=window, gas=gas)
+    slots = asyncio.Semaphore(window)
+    report = {}
+
+    async def is_leftover(name, contract, index):
+        async with slots:
+            return await record_exists(name, contract, index + RECORD_ID_OFFSET)
+
+    try:
+        for name in contract_names:
+            if name in EVENT_LOG_CONTRACT_NAMES:
+                continue
+            contract = contracts[name]
+            step = tracker.step
+            candidates = [
+                index
+                for index in range(
+                    tracker.watermark[name] + step, tracker.submitted + 1, step
+                )
+                if not tracker.is_done(name, index)
+            ]
+            found = await asyncio.gather(
+                *(is_leftover(name, contract, index) for index in candidates)
+            )
+            leftover = [index for index, left in zip(candidates, found) if left]
+
+            record_count = await contract.functions.recordCount().call()
+            jobs = (
+                (
+                    contract.functions.deleteRecord(index + RECORD_ID_OFFSET),
+                    {"index": index},
+                )
+                for index in leftover
+            )
+            await engine.run(jobs, lambda result: None)
+            report[name] = {
+                "record_count": record_count,
+                "deleted": leftover,
+                "record_count_after": await contract.functions.recordCount().call(),
+            }
+    finally:
+        await close_async_w3(async_w3)
+    return report
+
+
+def resume_experiment(
+    run_id,
+    progress_callback=None,
+    progress_interval=0.5,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    ipfs_uploader=None,
+    profiler=None,
+):
+    """Continue an interrupted run from its checkpoint.
+
+    The dataset, contracts and settings are read from the run's metadata. Rows
+    already stored are skipped, on-chain leftovers of in-flight rows are
+    cleaned up first, and new rows are appended to the same run. The run's
+    profile is replaced by that of the resumed part. Runs that stored real
+    CIDs need an `ipfs_uploader`, other runs must not be given one.
+    """
+    profiler = profiler or RunProfiler()
+    metadata = read_metadata(run_id)
+    if metadata.get("mode") == "load_test":
+        raise ValueError(
+            f"Run {run_id} is a load test; its workers keep no checkpoint to resume from"
+        )
+    if metadata.get("ipfs") and ipfs_uploader is None:
+        raise ValueError(
+            f"Run {run_id} stored real CIDs; resume it with an IPFS uploader"
+        )
+    if not metadata.get("ipfs") and ipfs_uploader is not None:
+        raise ValueError(
+            f"Run {run_id} stored placeholder CIDs; resume it without an IPFS uploader"
+        )
+    contract_names = metadata["contracts"]
+    concurrency = metadata["concurrency"]
+    gas = metadata["gas"]
+    tracker = load_checkpoint(run_dir(run_id), contract_names)
+    reconciliation = asyncio.run(
+        reconcile_records(tracker, contract_names, concurrency, gas)
+    )
+
+    results = ResultsWriter(run_id, checkpoint=tracker, resume=True)
+    rpc_stats = {}
+    try:
+        run_experiment(
+            metadata["dataset"],
+            contract_names=contract_names,
+            concurrency=concurrency,
+            progress_callback=progress_callback,
+            progress_interval=progress_interval,
+            chunksize=chunksize,
+            gas=gas,
+            ipfs_uploader=ipfs_uploader,
+            results=results,
+            skip=tracker.is_done,
+            receipt_batch_size=metadata.get("receipt_batch_size"),
+            rpc_stats=rpc_stats,
+            profiler=profiler,
+            reserve=results.reserve,
+            skipped=results.rows_written,
+        )
+    except BaseException:
+        results.abort()
+        raise
+    results.close(
+        reconciliation=reconciliation,
+        rpc=rpc_stats,
+        profile=profiler.save(results.dir),
+    )
+    return results
+
+
+def run_batch_sweep(
+    dataset_path,
+    batch_sizes,
+    contract_names=CONTRACT_NAMES,
+    concurrency=DEFAULT_WINDOW,
+    max_rows=None,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    gas=DEFAULT_GAS,
+):
+    """Add and delete the dataset through addRecords/deleteRecords once per batch
+    size, returning one row per batch and contract with gas and latency both
+    for the whole batch and amortized per record.
+
+    `max_rows` limits how much of the dataset each sweep step sends.
+    """
+    sweep_data = []
+
+    def on_pair(add_result, delete_result):
+        records = add_result["records"]
+        row = {
+            "contract_name": add_result["contract_name"],
+            "batch_size": add_result["batch_size"],
+            "index": add_result["index"],
+            "records": records,
+            **timing_columns("add", add_result),
+            **timing_columns("delete", delete_result),
+        }
+        for operation in ["add", "delete"]:
+            row[f"{operation}_gas_per_record"] = row[f"{operation}_gas_used"] / records
+            row[f"{operation}_time_per_record"] = row[f"{operation}_time"] / records
+        sweep_data.append(row)
+
+    for batch_size in batch_sizes:
+        rows = islice(iter_rows(dataset_path, chunksize), max_rows)
+        asyncio.run(
+            run_jobs(
+                lambda contracts: build_batch_jobs(rows, contracts, batch_size),
+                contract_names,
+                concurrency,
+                gas,
+                pair_operations(on_pair),
+            )
+        )
+
+    sweep_data.sort(key=lambda r: (r["batch_size"], r["index"], r["contract_name"]))
+    return sweep_data
+
+
+def summarize_batch_sweep(sweep_data):
+    """Weighted per-record gas and latency for each batch size and contract"""
+    df = pd.DataFrame(sweep_data)
+    totals = df.groupby(["batch_size", "contract_name"])[
+        ["records", "add_gas_used", "add_time", "delete_gas_used", "delete_time"]
+    ].sum()
+    summary = pd.DataFrame(
+        {
+            "add_gas_per_record": totals["add_gas_used"] / totals["records"],
+            "add_time_per_record": totals["add_time"] / totals["records"],
+            "delete_gas_per_record": totals["delete_gas_used"] / totals["records"],
+            "delete_time_per_record": totals["delete_time"] / totals["records"],
+        }
+    )
+    return summary.reset_index()
+
+
+def run_scaling_sweep(
+    field_counts,
+    field_lengths,
+    record_counts,
+    contract_names=CONTRACT_NAMES,
+    concurrency=DEFAULT_WINDOW,
+    gas=DEFAULT_GAS,
+    seed=0,
+):
+    """Add and delete synthetic records of every `field_counts` x
+    `field_lengths` shape, returning one row per record and contract.
+
+    Each shape is run once with the largest record count; smaller record
+    counts are prefixes of that run (see `summarize_scaling_sweep`).
+    """
+    # Check every shape up front rather than fail partway through the sweep
+    for field_count in field_counts:
+        for field_length in field_lengths:
+            check_record_shape(field_count, field_length)
+    if min(record_counts) < 1:
+        raise ValueError(f"Record counts must be positive, got {record_counts}")
+    sweep_data = []
+    for field_count in field_counts:
+        for field_length in field_lengths:
+
+            def on_pair(add_result, delete_result):
+                sweep_data.append(
+                    {
+                        "contract_name": add_result["contract_name"],
+                        "field_count": field_count,
+                        "field_length": field_length,
+                        "index": add_result["index"],
+                        **timing_columns("add", add_result),
+                        **timing_columns("delete", delete_result),
+                    }
+                )
+
+            rows = (
+                (index, fields, PLACEHOLDER_IPFS_HASH)
+                for index, fields in synthetic_rows(
+                    max(record_counts), field_count, field_length, seed
+                )
+            )
+            asyncio.run(
+                run_jobs(
+                    lambda contracts: build_jobs(rows, contracts),
+                    contract_names,
+                    concurrency,
+                    gas,
+                    pair_operations(on_pair),
+                )
+            )
+
+    sweep_data.sort(
+        key=lambda r: (r["field_count"], r["field_length"], r["index"], r["contract_name"])
+    )
+    return sweep_data
+
+
+def calibrate_delete_gas(
+    dataset_path,
+    contract_names=CONTRACT_NAMES,
+    rows=DEFAULT_CALIBRATION_ROWS,
+    concurrency=DEFAULT_WINDOW,
+    gas=DEFAULT_GAS,
+    chunksize=DEFAULT_CHUNK_SIZE,
+):
+    """Mine add/delete pairs for the first `rows` rows and fit delete gas as a
+    linear function of add gas, per contract.
+
+    deleteRecord cannot be estimated for a record that is not stored, and its
+    refund depends on how much the add wrote, so the fit carries that over to
+    rows that are only estimated. Returns `{contract: (slope, intercept)}`.
+    """
+    pairs = {name: [] for name in contract_names}
+
+    def on_pair(add_result, delete_result):
+        pairs[add_result["contract_name"]].append(
+            (add_result["gas_used"], delete_result["gas_used"])
+        )
+
+    sample = (
+        (index, fields, PLACEHOLDER_IPFS_HASH)
+        for index, fields in islice(iter_rows(dataset_path, chunksize), rows)
+    )
+    asyncio.run(
+        run_jobs(
+            lambda contracts: build_jobs(sample, contracts),
+            contract_names,
+            concurrency,
+            gas,
+            pair_operations(on_pair),
+        )
+    )
+    fits = {}
+    for name, measured in pairs.items():
+        add_gas, delete_gas = np.array(measured, dtype="float64").T
+        if np.ptp(add_gas) == 0:
+            fits[name] = (0.0, float(delete_gas.mean()))
+        else:
+            slope, intercept = np.polyfit(add_gas, delete_gas, 1)
+            fits[name] = (float(slope), float(intercept))
+    return fits
+
+
+async def estimate_add_gas(rows, contract_names, concurrency, on_estimate):
+    """Call eth_estimateGas for addRecord of every `(index, fields)` row and
+    contract with up to `concurrency` requests in flight. Nothing is mined."""
+    async_w3 = await connect_async_w3(pool_size=concurrency)
+    contracts = get_async_contracts(async_w3)
+    missing = [name for name in contract_names if name not in contracts]
+    if missing:
+        await close_async_w3(async_w3)
+        raise ValueError(f"Contracts not deployed: {', '.join(missing)}")
+
+    account = (await async_w3.eth.accounts)[0]
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    errors = []
+
+    async def estimate(name, index, fields):
+        try:
+            add_fn = add_record_call(
+                name, contracts[name], index + RECORD_ID_OFFSET, fields
+            )
+            on_estimate(name, index, await add_fn.estimate_gas({"from": account}))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            slots.release()
+
+    try:
+        for index, fields in rows:
+            for name in contract_names:
+                if errors:
+                    break
+                await slots.acquire()
+                task = asyncio.create_task(estimate(name, index, fields))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if errors:
+                break
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        await close_async_w3(async_w3)
+    if errors:
+        raise errors[0]
+
+
+def estimate_experiment(
+    dataset_path,
+    contract_names=CONTRACT_NAMES,
+    concurrency=DEFAULT_ESTIMATE_CONCURRENCY,
+    calibration_rows=DEFAULT_CALIBRATION_ROWS,
+    max_rows=None,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    gas=DEFAULT_GAS,
+):
+    """Estimate add and delete gas for every row without mining it.
+
+    Add gas comes from eth_estimateGas, which is an upper bound of the gas an
+    add would use; delete gas is derived from it with the fit measured on
+    `calibration_rows` mined rows (see `calibrate_delete_gas`).
+    """
+    fits = calibrate_delete_gas(
+        dataset_path, contract_names, calibration_rows, gas=gas, chunksize=chunksize
+    )
+    estimates = []
+
+    def on_estimate(name, index, add_gas):
+        slope, intercept = fits[name]
+        estimates.append(
+            {
+                "contract_name": name,
+                "index": index,
+                "add_gas_estimate": add_gas,
+                "delete_gas_estimate": round(slope * add_gas + intercept),
+            }
+        )
+
+    rows = islice(iter_rows(dataset_path, chunksize), max_rows)
+    asyncio.run(estimate_add_gas(rows, contract_names, concurrency, on_estimate))
+    estimates.sort(key=lambda r: (r["index"], r["contract_name"]))
+    return estimates
+
+
+def estimated_gas_per_record(estimates):
+    """Mean estimated add and delete gas per record, per contract"""
+    means = (
+        pd.DataFrame(estimates)
+        .groupby("contract_name")[["add_gas_estimate", "delete_gas_estimate"]]
+        .mean()
+    )
+    return {
+        name: {"add": row["add_gas_estimate"], "delete": row["delete_gas_estimate"]}
+        for name, row in means.iterrows()
+    }
+
+
+def save_results(experiment_data, output_path=DEFAULT_OUTPUT):
+    """Write experiment result rows to a CSV file"""
+    directory = os.path.dirname(output_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    pd.DataFrame(experiment_data).to_csv(output_path, index=False)
+    return output_path
+
+
+def describe_rpc_stats(rpc_stats):
+    """One-line summary of the RPC requests a run sent"""
+    per_request = rpc_stats["receipts"] / max(rpc_stats["receipt_requests"], 1)
+    return (
+        f"{rpc_stats['send_requests']} send requests, "
+        f"{rpc_stats['receipt_requests']} receipt requests for "
+        f"{rpc_stats['receipts']} receipts ({per_request:.1f} per request), "
+        f"{rpc_stats.get('failed', 0)} failed transactions"
+    )
+
+
+def describe_stages(profiler):
+    """One line per profiled stage, slowest first. Transaction phases overlap
+    across the window, so their totals can exceed the wall time."""
+    stages = sorted(
+        profiler.stages.summary().items(), key=lambda item: -item[1]["total_ms"]
+    )
+    lines = [f"Wall time {profiler.wall_time:.1f} s"]
+    for stage, stats in stages:
+        lines.append(
+            f"  {stage}: {stats['total_ms']:.1f} ms total, {stats['calls']} calls, "
+            f"{stats['mean_ms']:.3f} ms mean"
+        )
+    return "\n".join(lines)
+
+
+def print_progress(done, total, last_row):
+    print(
+        f"[{done}/{total}] {last_row['contract_name']} id {last_row['index']}: "
+        f"add {last_row['add_gas_used']} gas / {last_row['add_time']:.1f} ms, "
+        f"delete {last_row['delete_gas_used']} gas / {last_row['delete_time']:.1f} ms"
+    )
+
+
+def make_ipfs_uploader(args):
+    """IPFS uploader configured by the --ipfs-* arguments"""
+    cache = None
+    if args.ipfs_cache:
+        cache = CIDCache(args.ipfs_cache, args.ipfs_cache_size)
+    return IPFSUploader(
+        workers=args.ipfs_workers, batch_size=args.ipfs_batch_size, cache=cache
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the Basic vs Lightweight contract experiment headlessly",
+        parents=[common_parser()],
+    )
+    parser.add_argument("--dataset", help="Path to the CSV dataset")
+    # Each mode replaces the per-row experiment, so at most one can be given
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Continue an interrupted run from its checkpoint, reusing its "
+        "dataset and settings",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_WINDOW,
+        help="Number of transactions kept in flight",
+    )
+    parser.add_argument(
+        "--receipt-batch-size",
+        type=int,
+        help="Fetch receipts of pending transactions this many per JSON-RPC "
+        "batch request instead of polling each transaction",
+    )
+    modes.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        help="Run a batch-size sweep with addRecords/deleteRecords instead of "
+        "the per-row experiment",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        help="Rows sent per batch-size sweep step, or estimated in "
+        "estimate mode (default: whole dataset)",
+    )
+    modes.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Estimate gas for every row with eth_estimateGas instead of mining "
+        "it, and project costs",
+    )
+    parser.add_argument(
+        "--calibration-rows",
+        type=int,
+        default=DEFAULT_CALIBRATION_ROWS,
+        help="Rows mined in estimate mode to calibrate deleteRecord gas",
+    )
+    parser.add_argument(
+        "--gas-prices",
+        nargs="+",
+        metavar="NAME=GWEI",
+        help="Gas price scenarios for the cost projection "
+        "(default: low=1 typical=10 high=50)",
+    )
+    parser.add_argument(
+        "--eth-price",
+        type=float,
+        default=ETH_PRICE,
+        help="Fiat price of one ETH for the cost projection",
+    )
+    parser.add_argument(
+        "--project-records",
+        type=int,
+        help="Project costs for this many records (default: the dataset size)",
+    )
+    modes.add_argument(
+        "--scaling-fields",
+        type=int,
+        nargs="+",
+        help="Run a scaling sweep over synthetic records with these numbers of "
+        "fields instead of the dataset experiment",
+    )
+    parser.add_argument(
+        "--scaling-field-lengths",
+        type=int,
+        nargs="+",
+        default=[16],
+        help="Field lengths (characters) swept by the scaling sweep",
+    )
+    parser.add_argument(
+        "--scaling-records",
+        type=int,
+        nargs="+",
+        default=[10, 100],
+        help="Record counts reported by the scaling sweep; each shape is run "
+        "with the largest",
+    )
+    parser.add_argument(
+        "--ipfs",
+        action="store_true",
+        help="Upload every row to IPFS and store its real CID",
+    )
+    parser.add_argument(
+        "--ipfs-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Concurrent IPFS upload requests",
+    )
+    parser.add_argument(
+        "--ipfs-batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Rows added per IPFS request",
+    )
+    parser.add_argument(
+        "--ipfs-cache",
+        default=DEFAULT_CACHE_PATH,
+        help="SQLite file caching CIDs by row content ('' to disable)",
+    )
+    parser.add_argument(
+        "--ipfs-cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum cached CIDs before least recently used ones are evicted",
+    )
+    parser.add_argument(
+        "--output",
+        help="CSV file to write results to (default: a new run in results/runs)",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=PROFILERS,
+        help="Also profile functions, deterministically (cprofile) or by "
+        "sampling the stack (sample); saved as profile.json in the run",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between progress lines",
+    )
+    args = parser.parse_args(argv)
+    if not args.dataset and not args.resume and not args.scaling_fields:
+        parser.error(
+            "--dataset is required unless --resume or --scaling-fields is given"
+        )
+    if args.resume:
+        restored = [
+            flag
+            for flag, value in [
+                ("--dataset", args.dataset),
+                ("--ipfs", args.ipfs),
+                ("--receipt-batch-size", args.receipt_batch_size),
+            ]
+            if value
+        ]
+        if restored:
+            parser.error(
+                f"{', '.join(restored)} cannot be combined with --resume, the "
+                "resumed run's settings are used"
+            )
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.scaling_fields:
+        sweep_data = run_scaling_sweep(
+            args.scaling_fields,
+            args.scaling_field_lengths,
+            args.scaling_records,
+            contract_names=args.contracts,
+            concurrency=args.concurrency,
+            gas=args.gas,
+        )
+        output_path = save_results(sweep_data, args.output or SCALING_SWEEP_OUTPUT)
+        summary = summarize_scaling_sweep(sweep_data, args.scaling_records)
+        print(summary.to_string(index=False))
+        print(f"Saved {len(sweep_data)} scaling results to {output_path}")
+        return
+
+    if args.estimate:
+        estimates = estimate_experiment(
+            args.dataset,
+            contract_names=args.contracts,
+            calibration_rows=args.calibration_rows,
+            max_rows=args.max_rows,
+            chunksize=args.chunksize,
+            gas=args.gas,
+        )
+        output_path = save_results(estimates, args.output or ESTIMATE_OUTPUT)
+        print(f"Saved {len(estimates)} gas estimates to {output_path}")
+        scenarios = (
+            parse_gas_prices(args.gas_prices) if args.gas_prices else GAS_PRICE_SCENARIOS
+        )
+        records = args.project_records or len(estimates) // len(args.contracts)
+        costs = cost_table(
+            estimated_gas_per_record(estimates), records, scenarios, args.eth_price
+        )
+        print(costs.round(6).to_string(index=False))
+        return
+
+    if args.batch_sizes:
+        sweep_data = run_batch_sweep(
+            args.dataset,
+            args.batch_sizes,
+            contract_names=args.contracts,
+            concurrency=args.concurrency,
+            max_rows=args.max_rows,
+            chunksize=args.chunksize,
+            gas=args.gas,
+        )
+        output_path = save_results(sweep_data, args.output or BATCH_SWEEP_OUTPUT)
+        print(summarize_batch_sweep(sweep_data).to_string(index=False))
+        print(f"Saved {len(sweep_data)} batch results to {output_path}")
+        return
+
+    profiler = RunProfiler(args.profiler)
+    if args.resume:
+        ipfs_uploader = None
+        if read_metadata(args.resume).get("ipfs"):
+            ipfs_uploader = make_ipfs_uploader(args)
+        results = resume_experiment(
+            args.resume,
+            progress_callback=print_progress,
+            progress_interval=args.progress_interval,
+            chunksize=args.chunksize,
+            ipfs_uploader=ipfs_uploader,
+            profiler=profiler,
+        )
+        print(describe_stages(profiler))
+        if ipfs_uploader is not None:
+            ipfs_uploader.close()
+        print(f"Run {results.run_id} now holds {results.rows_written} results")
+        return
+
+    ipfs_uploader = make_ipfs_uploader(args) if args.ipfs else None
+
+    if args.output:
+        results = []
+    else:
+        metadata = run_metadata(
+            args.dataset,
+            args.contracts,
+            args.concurrency,
+            args.gas,
+            ipfs=args.ipfs,
+            receipt_batch_size=args.receipt_batch_size,
+            profiler=args.profiler,
+        )
+        results = ResultsWriter(
+            metadata=metadata, checkpoint=CheckpointTracker(args.contracts)
+        )
+
+    rpc_stats = {}
+    try:
+        run_experiment(
+            args.dataset,
+            contract_names=args.contracts,
+            concurrency=args.concurrency,
+            progress_callback=print_progress,
+            progress_interval=args.progress_interval,
+            chunksize=args.chunksize,
+            gas=args.gas,
+            ipfs_uploader=ipfs_uploader,
+            results=results,
+            receipt_batch_size=args.receipt_batch_size,
+            rpc_stats=rpc_stats,
+            profiler=profiler,
+            reserve=None if args.output else results.reserve,
+        )
+    except BaseException:
+        if not args.output:
+            results.abort()
+        raise
+
+    print(f"RPC: {describe_rpc_stats(rpc_stats)}")
+    print(describe_stages(profiler))
+    cache_stats = {}
+    if ipfs_uploader is not None:
+        if ipfs_uploader.cache is not None:
+            cache_stats = ipfs_uploader.cache.stats()
+            print(f"IPFS CID cache: {cache_stats}")
+        ipfs_uploader.close()
+
+    if args.output:
+        results.sort(key=lambda r: (r["index"], r["contract_name"]))
+        output_path = save_results(results, args.output)
+        print(f"Saved {len(results)} results to {output_path}")
+    else:
+        results.close(
+            ipfs_cache=cache_stats, rpc=rpc_stats, profile=profiler.save(results.dir)
+        )
+        print(f"Saved {results.rows_written} results to run {results.run_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""On-chain storage footprint of each contract variant.
+
+Adds and deletes dataset rows one transaction at a time, and inspects every
+transaction with `debug_traceTransaction` and `eth_getStorageAt`:
+
+    python storage_footprint.py --dataset datasets/doctors.csv --max-rows 100
+
+Reports SSTOREs, storage slots allocated by each add, slots cleared and the
+gas refunded by each delete, and slots left behind. With `--chain-db` pointing
+at the node's database directory (e.g. ganache-cli started with `--db`), the
+growth of the chain database is measured per contract as well.
+"""
+import argparse
+import asyncio
+import os
+from itertools import islice
+
+import pandas as pd
+
+import runner
+from connection import close_async_w3, connect_async_w3, get_async_contracts
+from utils.common import RECORD_ID_OFFSET, common_parser
+from utils.dataset import DEFAULT_CHUNK_SIZE, iter_rows
+from utils.storage_trace import (
+    MAX_REFUND_QUOTIENT,
+    SSTORE_CLEAR_REFUND,
+    directory_size,
+    storage_effect,
+)
+from utils.tx_engine import DEFAULT_GAS, PipelinedTxEngine
+
+DEFAULT_MAX_ROWS = 100
+STORAGE_OUTPUT = os.path.join("results", "storage_footprint.csv")
+
+
+async def measure_storage(
+    dataset_path,
+    contract_names=runner.CONTRACT_NAMES,
+    max_rows=DEFAULT_MAX_ROWS,
+    gas=DEFAULT_GAS,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    chain_db=None,
+    clear_refund=SSTORE_CLEAR_REFUND,
+    refund_quotient=MAX_REFUND_QUOTIENT,
+):
+    """Return one row per dataset row and contract with the storage effects of
+    its add and delete, plus the chain database growth per contract (bytes,
+    or None without `chain_db`).
+
+    Contracts are measured one after the other, so database growth can be
+    attributed to each of them.
+    """
+    async_w3 = await connect_async_w3()
+    contracts = get_async_contracts(async_w3)
+    missing = [name for name in contract_names if name not in contracts]
+    if missing:
+        await close_async_w3(async_w3)
+        raise ValueError(f"Contracts not deployed: {', '.join(missing)}")
+
+    account = (await async_w3.eth.accounts)[0]
+    # One transaction at a time, so every transaction has a block to itself
+    engine = PipelinedTxEngine(async_w3, account, window=1, gas=gas)
+    storage_data = []
+    db_growth = {}
+    try:
+        for name in contract_names:
+            contract = contracts[name]
+            db_size = directory_size(chain_db) if chain_db else None
+            for index, fields in islice(iter_rows(dataset_path, chunksize), max_rows):
+                record_id = index + RECORD_ID_OFFSET
+                tag = {"contract_name": name, "index": index}
+                add_fn = runner.add_record_call(name, contract, record_id, fields)
+                add = await engine.submit(add_fn, tag)
+                delete = await engine.submit(
+                    contract.functions.deleteRecord(record_id), tag
+                )
+                row = {**tag, "fields": len(fields)}
+                for operation, result in [("add", add), ("delete", delete)]:
+                    effect = await storage_effect(
+                        async_w3, contract.address, result, clear_refund, refund_quotient
+                    )
+                    row[f"{operation}_gas_used"] = result["gas_used"]
+                    row[f"{operation}_status"] = result["status"]
+                    for key, value in effect.items():
+                        row[f"{operation}_{key}"] = value
+                storage_data.append(row)
+            db_growth[name] = (
+                directory_size(chain_db) - db_size if chain_db else None
+            )
+    finally:
+        await close_async_w3(async_w3)
+    return storage_data, db_growth
+
+
+def summarize_storage(storage_data, db_growth):
+    """Per-contract totals and per-record means of the storage measurements"""
+    df = pd.DataFrame(storage_data)
+    grouped = df.groupby("contract_name")
+    summary = pd.DataFrame(
+        {
+            "records": grouped["index"].count(),
+            "add_sstores_per_record": grouped["add_sstores"].mean(),
+            "slots_allocated_per_record": grouped["add_slots_allocated"].mean(),
+            "storage_bytes_per_record": grouped["add_slots_allocated"].mean() * 32,
+            "delete_sstores_per_record": grouped["delete_sstores"].mean(),
+            "slots_cleared_per_record": grouped["delete_slots_cleared"].mean(),
+            "refund_per_record": grouped["delete_refund_estimate"].mean(),
+            "slots_left_after_delete": grouped["delete_slots_nonzero"].sum(),
+        }
+    )
+    summary["chain_db_growth_bytes"] = pd.Series(db_growth)
+    return summary.reset_index()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure the on-chain storage footprint of each contract",
+        parents=[common_parser()],
+    )
+    parser.add_argument("--dataset", required=True, help="Path to the CSV dataset")
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help="Dataset rows added and deleted per contract",
+    )
+    parser.add_argument(
+        "--chain-db",
+        help="Node database directory whose growth is measured",
+    )
+    parser.add_argument(
+        "--clear-refund",
+        type=int,
+        default=SSTORE_CLEAR_REFUND,
+        help="Gas refunded per cleared slot (15000 before London)",
+    )
+    parser.add_argument(
+        "--refund-quotient",
+        type=int,
+        default=MAX_REFUND_QUOTIENT,
+        help="Refund cap divisor of the gas used (2 before London)",
+    )
+    parser.add_argument(
+        "--output",
+        default=STORAGE_OUTPUT,
+        help="CSV file to write per-record measurements to",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    storage_data, db_growth = asyncio.run(
+        measure_storage(
+            args.dataset,
+            contract_names=args.contracts,
+            max_rows=args.max_rows,
+            gas=args.gas,
+            chunksize=args.chunksize,
+            chain_db=args.chain_db,
+            clear_refund=args.clear_refund,
+            refund_quotient=args.refund_quotient,
+        )
+    )
+    output_path = runner.save_results(storage_data, args.output)
+    print(summarize_storage(storage_data, db_growth).to_string(index=False))
+    print(f"Saved {len(storage_data)} storage measurements to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Local stand-in for the Kubo `/api/v0/add` endpoint.
+
+Answers a multipart `add` request with one newline-delimited JSON object
+(`{"Name", "Hash", "Size"}`) per file part, like Kubo does. The CID is derived
+from the part's content, so the same content always gets the same CID.
+`fail_first` makes the first requests answer 503 to exercise retries, and
+`delay` keeps requests open long enough to overlap.
+"""
+import hashlib
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stub_cid(content):
+    """CID the stand-in assigns to `content`"""
+    if isinstance(content, str):
+        content = content.encode()
+    return "Qm" + hashlib.sha256(content).hexdigest()[:44]
+
+
+def parse_multipart(content_type, body):
+    """`(filename, content)` of every part of a multipart/form-data body"""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return [
+        (part.get_filename(), part.get_payload(decode=True))
+        for part in message.iter_parts()
+    ]
+
+
+class KuboStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fail_first=0, delay=0.0):
+        super().__init__(("127.0.0.1", 0), KuboStubHandler)
+        self.fail_first = fail_first
+        self.delay = delay
+        self.requests = 0
+        self.files = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.server_port}/api/v0"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class KuboStubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with stub.lock:
+            stub.requests += 1
+            failing = stub.requests <= stub.fail_first
+            stub.active += 1
+            stub.max_active = max(stub.max_active, stub.active)
+        try:
+            time.sleep(stub.delay)
+            if not self.path.startswith("/api/v0/add"):
+                self.send_error(404)
+                return
+            if failing:
+                self.send_error(503)
+                return
+            parts = parse_multipart(self.headers["Content-Type"], body)
+            with stub.lock:
+                stub.files += len(parts)
+            response = "".join(
+                json.dumps({"Name": name, "Hash": stub_cid(content), "Size": str(len(content))})
+                + "\n"
+                for name, content in parts
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+        finally:
+            with stub.lock:
+                stub.active -= 1
+
+    def log_message(self, format, *args):
+        pass
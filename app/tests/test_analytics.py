@@ -0,0 +1,95 @@
+"""Mergeable aggregates and bootstrap intervals of experiment results.
+
+Run from the app directory:
+
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.analytics import aggregate, distribution_stats, merge_aggregates
+
+CONTRACT_NAMES = ["BasicContract", "LightweightContract"]
+
+
+def results(rows, seed=0):
+    """Per-row results of both contracts with a few failed operations"""
+    rng = np.random.default_rng(seed)
+    count = rows * len(CONTRACT_NAMES)
+    return pd.DataFrame(
+        {
+            "contract_name": CONTRACT_NAMES * rows,
+            "index": np.repeat(np.arange(rows), len(CONTRACT_NAMES)),
+            "add_gas_used": rng.normal(100_000, 5_000, count),
+            "delete_gas_used": rng.normal(30_000, 1_000, count),
+            "add_time": rng.exponential(20.0, count),
+            "delete_time": rng.exponential(15.0, count),
+            "add_status": (rng.random(count) > 0.1).astype(int),
+            "delete_status": (rng.random(count) > 0.05).astype(int),
+        }
+    )
+
+
+class MergeAggregatesTest(unittest.TestCase):
+    def test_merged_parts_match_the_whole(self):
+        df = results(500)
+        parts = [df.iloc[:1], df.iloc[1:317], df.iloc[317:318], df.iloc[318:]]
+        merged = merge_aggregates(aggregate(part) for part in parts)
+        whole = aggregate(df)
+        pd.testing.assert_frame_equal(
+            merged.sort_index(axis=1), whole.sort_index(axis=1), check_dtype=False
+        )
+
+    def test_empty_parts_are_skipped(self):
+        df = results(50)
+        merged = merge_aggregates([aggregate(df.iloc[:0]), aggregate(df)])
+        pd.testing.assert_frame_equal(merged, aggregate(df))
+        self.assertTrue(merge_aggregates([]).empty)
+
+
+class BootstrapIntervalTest(unittest.TestCase):
+    def assertCovers(self, stats, name, metric, mean):
+        row = stats.loc[(name, metric)]
+        self.assertLessEqual(row["ci_low"], mean)
+        self.assertGreaterEqual(row["ci_high"], mean)
+        self.assertLess(row["ci_low"], row["ci_high"])
+
+    def test_interval_covers_the_true_mean(self):
+        df = results(2_000)
+        stats = distribution_stats(df, metrics=["add_gas_used"], resamples=200)
+        for name in CONTRACT_NAMES:
+            self.assertCovers(stats, name, "add_gas_used", 100_000)
+
+    def test_subsampled_interval_covers_the_true_mean(self):
+        df = results(5_000)
+        stats = distribution_stats(
+            df, metrics=["add_gas_used"], resamples=200, max_sample=500
+        )
+        full = distribution_stats(df, metrics=["add_gas_used"], resamples=200)
+        for name in CONTRACT_NAMES:
+            self.assertCovers(stats, name, "add_gas_used", 100_000)
+            # Scaled to the standard error of the full mean, not the subsample's
+            row = stats.loc[(name, "add_gas_used")]
+            full_row = full.loc[(name, "add_gas_used")]
+            self.assertAlmostEqual(
+                (row["ci_high"] - row["ci_low"])
+                / (full_row["ci_high"] - full_row["ci_low"]),
+                1.0,
+                delta=0.3,
+            )
+
+    def test_metric_without_successful_rows_has_no_interval(self):
+        df = results(100)
+        df["delete_status"] = 0
+        stats = distribution_stats(df, resamples=50)
+        row = stats.loc[("BasicContract", "delete_gas_used")]
+        self.assertEqual(row["count"], 0)
+        self.assertTrue(np.isnan(row["ci_low"]))
+        self.assertTrue(np.isnan(row["ci_high"]))
+        self.assertFalse(np.isnan(stats.loc[("BasicContract", "add_gas_used"), "ci_low"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
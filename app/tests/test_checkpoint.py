@@ -0,0 +1,93 @@
+"""Checkpoints of resumable runs.
+
+Run from the app directory:
+
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.checkpoint import CheckpointTracker, load_checkpoint, save_checkpoint
+
+CONTRACT_NAMES = ["BasicContract", "LightweightContract"]
+
+
+def write_part(directory, name, rows):
+    table = pa.table(
+        {
+            "contract_name": [contract_name for contract_name, _ in rows],
+            "index": [index for _, index in rows],
+        }
+    )
+    pq.write_table(table, os.path.join(directory, name))
+
+
+class CheckpointTrackerTest(unittest.TestCase):
+    def test_watermark_waits_for_out_of_order_rows(self):
+        tracker = CheckpointTracker(CONTRACT_NAMES)
+        for index in [2, 0, 3]:
+            tracker.mark("BasicContract", index)
+        self.assertEqual(tracker.watermark["BasicContract"], 0)
+        self.assertEqual(tracker.done["BasicContract"], {2, 3})
+        self.assertTrue(tracker.is_done("BasicContract", 2))
+        self.assertFalse(tracker.is_done("BasicContract", 1))
+
+        tracker.mark("BasicContract", 1)
+        self.assertEqual(tracker.watermark["BasicContract"], 3)
+        self.assertEqual(tracker.done["BasicContract"], set())
+        # Contracts are tracked separately
+        self.assertEqual(tracker.watermark["LightweightContract"], -1)
+
+    def test_sharded_watermark_advances_by_step(self):
+        tracker = CheckpointTracker(CONTRACT_NAMES, step=4, first=1)
+        for index in [5, 1, 9]:
+            tracker.mark("LightweightContract", index)
+        self.assertEqual(tracker.watermark["LightweightContract"], 9)
+        self.assertFalse(tracker.is_done("LightweightContract", 13))
+
+
+class CheckpointFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+
+    def test_saved_state_round_trips(self):
+        tracker = CheckpointTracker(CONTRACT_NAMES, step=2)
+        tracker.submitted = 8
+        for index in [0, 4, 6]:
+            tracker.mark("BasicContract", index)
+        save_checkpoint(self.directory, tracker, [])
+
+        loaded = load_checkpoint(self.directory, CONTRACT_NAMES)
+        self.assertEqual(loaded.step, 2)
+        self.assertEqual(loaded.submitted, 8)
+        self.assertEqual(loaded.state(), tracker.state())
+
+    def test_unlisted_parts_are_rolled_forward(self):
+        write_part(self.directory, "part-00000.parquet", [("BasicContract", 0)])
+        tracker = CheckpointTracker(CONTRACT_NAMES)
+        tracker.mark("BasicContract", 0)
+        save_checkpoint(self.directory, tracker, ["part-00000.parquet"])
+        # Written after the checkpoint, as a crash before the next save leaves it
+        write_part(
+            self.directory,
+            "part-00001.parquet",
+            [("BasicContract", 1), ("LightweightContract", 0)],
+        )
+
+        loaded = load_checkpoint(self.directory, CONTRACT_NAMES)
+        self.assertEqual(loaded.watermark["BasicContract"], 1)
+        self.assertEqual(loaded.watermark["LightweightContract"], 0)
+
+    def test_directory_without_checkpoint_is_rejected(self):
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.directory, CONTRACT_NAMES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""IPFSUploader against a local stand-in for the Kubo add endpoint.
+
+Run from the app directory:
+
+    python -m unittest discover tests
+"""
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+import runner
+from kubo_stub import KuboStub, stub_cid
+from utils.cid_cache import CIDCache
+from utils.dataset import row_to_csv
+from utils.ipfs_utils import IPFSUploader
+
+
+def items(count):
+    return [(str(i), f"row {i}\n") for i in range(count)]
+
+
+class IPFSUploaderTest(unittest.TestCase):
+    def test_batches_upload_concurrently_in_order(self):
+        with KuboStub(delay=0.05) as stub:
+            uploader = IPFSUploader(stub.api_url, workers=4, batch_size=5)
+            try:
+                cids = list(uploader.upload_all(items(103)))
+            finally:
+                uploader.close()
+        self.assertEqual(cids, [stub_cid(content) for _, content in items(103)])
+        # 20 full batches and one of 3 rows, several in flight at once
+        self.assertEqual(stub.requests, 21)
+        self.assertEqual(stub.files, 103)
+        self.assertGreater(stub.max_active, 1)
+        self.assertLessEqual(stub.max_active, 4)
+
+    def test_failed_requests_are_retried(self):
+        with KuboStub(fail_first=2) as stub:
+            uploader = IPFSUploader(
+                stub.api_url, workers=1, batch_size=4, retries=3, backoff=0.01
+            )
+            try:
+                cids = list(uploader.upload_all(items(8)))
+            finally:
+                uploader.close()
+        self.assertEqual(cids, [stub_cid(content) for _, content in items(8)])
+        self.assertEqual(stub.requests, 4)
+
+    def test_batch_fails_once_retries_are_exhausted(self):
+        with KuboStub(fail_first=10) as stub:
+            uploader = IPFSUploader(
+                stub.api_url, workers=1, batch_size=4, retries=1, backoff=0.01
+            )
+            try:
+                with self.assertRaises(Exception):
+                    list(uploader.upload_all(items(4)))
+            finally:
+                uploader.close()
+
+    def test_cached_content_is_not_uploaded_again(self):
+        with tempfile.TemporaryDirectory() as directory, KuboStub() as stub:
+            path = os.path.join(directory, "cids.sqlite")
+            for _ in range(2):
+                uploader = IPFSUploader(
+                    stub.api_url, workers=2, batch_size=4, cache=CIDCache(path)
+                )
+                try:
+                    cids = list(uploader.upload_all(items(10)))
+                finally:
+                    uploader.close()
+                self.assertEqual(cids, [stub_cid(content) for _, content in items(10)])
+        self.assertEqual(stub.files, 10)
+
+    def test_attach_cids_keeps_row_order(self):
+        rows = [(i, [f"name {i}", str(i * 7)]) for i in range(50)]
+        with KuboStub(delay=0.01) as stub:
+            uploader = IPFSUploader(stub.api_url, workers=3, batch_size=4)
+            try:
+                attached = list(runner.attach_cids(iter(rows), uploader))
+            finally:
+                uploader.close()
+        self.assertEqual(
+            attached,
+            [(index, fields, stub_cid(row_to_csv(fields))) for index, fields in rows],
+        )
+
+    def test_rows_waiting_for_cids_do_not_block_the_loop(self):
+        rows = [(i, [f"name {i}", str(i * 7)]) for i in range(20)]
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.005)
+
+        async def read_chunks(uploader):
+            ticker = asyncio.ensure_future(tick())
+            try:
+                rows_with_cids = runner.attach_cids(iter(rows), uploader)
+                return [
+                    chunk async for chunk in runner.chunks_in_thread(rows_with_cids, 4)
+                ]
+            finally:
+                ticker.cancel()
+
+        with KuboStub(delay=0.05) as stub:
+            uploader = IPFSUploader(stub.api_url, workers=1, batch_size=4)
+            try:
+                chunks = asyncio.run(read_chunks(uploader))
+            finally:
+                uploader.close()
+        self.assertEqual(
+            [row for chunk in chunks for row in chunk],
+            [(index, fields, stub_cid(row_to_csv(fields))) for index, fields in rows],
+        )
+        # Every upload takes 50 ms, the loop kept running throughout
+        gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+        self.assertLess(max(gaps), 0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Merkle trees and proofs built for MerkleBatchRecord.
+
+Run from the app directory:
+
+    python -m unittest discover tests
+"""
+import unittest
+
+from utils.hashing import record_hash
+from utils.merkle import (
+    build_merkle_batch,
+    leaf_hash,
+    merkle_levels,
+    merkle_proof,
+    merkle_root,
+    verify_proof,
+)
+
+
+def rows(count):
+    return [(record_id, [f"name {record_id}", "x"]) for record_id in range(1, count + 1)]
+
+
+def leaves(batch):
+    return [leaf_hash(record_id, record_hash(fields)) for record_id, fields in batch]
+
+
+class MerkleTest(unittest.TestCase):
+    def test_every_proof_leads_to_the_root(self):
+        # Odd-sized levels carry a node up without a sibling
+        for count in [1, 2, 3, 5, 7, 8, 13]:
+            batch_leaves = leaves(rows(count))
+            levels = merkle_levels(batch_leaves)
+            root = merkle_root(levels)
+            for i, leaf in enumerate(batch_leaves):
+                with self.subTest(count=count, leaf=i):
+                    self.assertTrue(verify_proof(leaf, merkle_proof(levels, i), root))
+
+    def test_proof_rejects_another_leaf(self):
+        batch_leaves = leaves(rows(5))
+        levels = merkle_levels(batch_leaves)
+        proof = merkle_proof(levels, 0)
+        self.assertFalse(verify_proof(batch_leaves[1], proof, merkle_root(levels)))
+
+    def test_carried_up_leaf_has_a_shorter_proof(self):
+        levels = merkle_levels(leaves(rows(5)))
+        self.assertEqual(len(merkle_proof(levels, 0)), 3)
+        self.assertEqual(len(merkle_proof(levels, 4)), 1)
+
+    def test_empty_batch_is_rejected(self):
+        with self.assertRaises(ValueError):
+            merkle_levels([])
+
+    def test_parity_samples_cover_every_proof_shape(self):
+        batch = rows(7)
+        built = build_merkle_batch((1, batch, 2))
+        levels = merkle_levels(leaves(batch))
+        shapes = {
+            (len(merkle_proof(levels, i)), i % 2) for i in range(len(batch))
+        }
+        samples = built["parity_samples"]
+        self.assertEqual(len(samples), len(shapes))
+        self.assertEqual(
+            {(len(proof), (record_id - 1) % 2) for record_id, _, proof in samples},
+            shapes,
+        )
+        for record_id, data_hash, proof in samples:
+            self.assertTrue(
+                verify_proof(leaf_hash(record_id, data_hash), proof, built["root"])
+            )
+        self.assertEqual([s[0] for s in built["samples"]], [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
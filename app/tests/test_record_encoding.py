@@ -0,0 +1,54 @@
+"""Off-chain encodings of the packed-storage contract variants.
+
+Run from the app directory:
+
+    python -m unittest discover tests
+"""
+import hashlib
+import unittest
+
+from utils.record_encoding import (
+    MAX_FIELD_LENGTH,
+    cid_digest,
+    digest_to_cid,
+    pack_fields,
+    unpack_fields,
+)
+from utils.workload import PLACEHOLDER_IPFS_HASH
+
+# The same empty directory as a CIDv0 and a base32 CIDv1
+CID_V0 = "QmUNLLsPACCz1vLxQVkXqqLX5R1X345qqfHbsf67hvA3Nn"
+CID_V1 = "bafybeiczsscdsbs7ffqz55asqdf3smv6klcw3gofszvwlyarci47bgf354"
+
+
+class PackFieldsTest(unittest.TestCase):
+    def test_fields_round_trip(self):
+        fields = ["Dr. Müller", "", "cardiology", "x" * 300]
+        self.assertEqual(unpack_fields(pack_fields(fields)), fields)
+
+    def test_fields_carry_a_two_byte_length(self):
+        self.assertEqual(pack_fields(["ab", "é"]), b"\x00\x02ab\x00\x02\xc3\xa9")
+
+    def test_oversized_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            pack_fields(["x" * (MAX_FIELD_LENGTH + 1)])
+
+
+class CIDDigestTest(unittest.TestCase):
+    def test_cid_v0_round_trips(self):
+        digest = cid_digest(CID_V0)
+        self.assertEqual(len(digest), 32)
+        self.assertEqual(digest_to_cid(digest), CID_V0)
+
+    def test_cid_v1_stores_the_same_digest(self):
+        self.assertEqual(cid_digest(CID_V1), cid_digest(CID_V0))
+
+    def test_placeholder_is_stored_as_its_sha256(self):
+        self.assertEqual(
+            cid_digest(PLACEHOLDER_IPFS_HASH),
+            hashlib.sha256(PLACEHOLDER_IPFS_HASH.encode()).digest(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,313 @@
+"""Mergeable summary statistics for experiment results.
+
+Every metric is summarized per contract as count, mean, sum of squared
+deviations (M2), min and max. These can be computed for each results part on
+its own and merged exactly, so when parts are appended to a run only the new
+ones have to be aggregated.
+
+A metric only counts rows in which its operation succeeded (`add_status` or
+`delete_status` is 1); failed operations are counted in `add_failed` and
+`delete_failed` instead.
+"""
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ["add_gas_used", "delete_gas_used", "add_time", "delete_time"]
+OPERATIONS = ["add", "delete"]
+STATUS_COLUMNS = [f"{operation}_status" for operation in OPERATIONS]
+FAILURE_COLUMNS = [f"{operation}_failed" for operation in OPERATIONS]
+AGGREGATE_STATS = ["count", "mean", "m2", "min", "max"]
+MAX_FLIERS = 1_000
+PERCENTILES = [50, 90, 99]
+CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 1_000
+# Rows per contract that bootstrap resamples are drawn from
+BOOTSTRAP_SAMPLE = 10_000
+
+
+def file_fingerprint(path):
+    """Identify a file's current contents by modification time and size"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def successful_values(df, metrics=METRIC_COLUMNS):
+    """`metrics` of `df` as floats, NaN in rows where the metric's operation
+    failed. Results without status columns (legacy files) count as successful.
+    """
+    values = df[metrics].astype("float64")
+    for metric in metrics:
+        status = f"{metric.split('_', 1)[0]}_status"
+        if status in df:
+            values[metric] = values[metric].where(df[status] == 1)
+    return values
+
+
+def failure_flags(df):
+    """1.0 for every row in which an operation failed, per `<operation>_failed`
+    column, for the operations whose status `df` holds"""
+    return pd.DataFrame(
+        {
+            f"{operation}_failed": (df[f"{operation}_status"] != 1).astype("float64")
+            for operation in OPERATIONS
+            if f"{operation}_status" in df
+        },
+        index=df.index,
+    )
+
+
+def aggregate(df, metrics=METRIC_COLUMNS):
+    """Per-contract aggregates of every metric over the rows in which its
+    operation succeeded, plus the failure flags, in one grouped pass.
+
+    Returns a frame indexed by contract name with `(metric, stat)` columns.
+    """
+    values = pd.concat([successful_values(df, metrics), failure_flags(df)], axis=1)
+    metrics = list(values.columns)
+    grouped = values.groupby(df["contract_name"])
+    stats = grouped.agg(["count", "mean", "var", "min", "max"])
+    for metric in metrics:
+        count = stats[(metric, "count")]
+        stats[(metric, "m2")] = (stats[(metric, "var")] * (count - 1)).fillna(0.0)
+    return stats[[(metric, stat) for metric in metrics for stat in AGGREGATE_STATS]]
+
+
+def merge_aggregates(parts):
+    """Combine aggregates of disjoint sets of rows into the aggregates of their
+    union, using the parallel variance formula for M2"""
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame()
+    if len(parts) == 1:
+        return parts[0]
+    stacked = pd.concat(parts)
+    merged = {}
+    for metric in stacked.columns.get_level_values(0).unique():
+        count = stacked[(metric, "count")]
+        weighted = (stacked[(metric, "mean")] * count).groupby(level=0).sum()
+        total = count.groupby(level=0).sum()
+        mean = (weighted / total).fillna(0.0)
+        spread = count * (stacked[(metric, "mean")] - mean.reindex(stacked.index)) ** 2
+        merged[(metric, "count")] = total
+        merged[(metric, "mean")] = mean
+        merged[(metric, "m2")] = (
+            stacked[(metric, "m2")].groupby(level=0).sum()
+            + spread.fillna(0.0).groupby(level=0).sum()
+        )
+        merged[(metric, "min")] = stacked[(metric, "min")].groupby(level=0).min()
+        merged[(metric, "max")] = stacked[(metric, "max")].groupby(level=0).max()
+    return pd.DataFrame(merged)
+
+
+def aggregate_csv(path, chunksize=1_000_000, metrics=METRIC_COLUMNS):
+    """Aggregate a results CSV chunk by chunk without loading it whole"""
+    columns = ["contract_name"] + metrics + STATUS_COLUMNS
+    chunks = pd.read_csv(
+        path, usecols=lambda column: column in columns, chunksize=chunksize
+    )
+    return merge_aggregates(aggregate(chunk, metrics) for chunk in chunks)
+
+
+def summarize(aggregates):
+    """Per-contract count, mean, standard deviation, min and max of every
+    metric, as `(metric, stat)` columns"""
+    summary = {}
+    for metric in aggregates.columns.get_level_values(0).unique():
+        count = aggregates[(metric, "count")]
+        summary[(metric, "count")] = count
+        summary[(metric, "mean")] = aggregates[(metric, "mean")]
+        summary[(metric, "std")] = np.sqrt(
+            aggregates[(metric, "m2")] / (count - 1).where(count > 1)
+        )
+        summary[(metric, "min")] = aggregates[(metric, "min")]
+        summary[(metric, "max")] = aggregates[(metric, "max")]
+    return pd.DataFrame(summary)
+
+
+def failure_counts(summary):
+    """Failed operations per contract, from a `summarize` frame"""
+    return pd.DataFrame(
+        {
+            column: (summary[(column, "mean")] * summary[(column, "count")])
+            .round()
+            .astype(int)
+            for column in FAILURE_COLUMNS
+            if (column, "mean") in summary
+        }
+    )
+
+
+def improvement(baseline, candidate):
+    """Percentage by which `candidate` is lower than `baseline`"""
+    return (baseline - candidate) / baseline * 100
+
+
+def box_stats(values, label, max_fliers=MAX_FLIERS):
+    """Statistics `Axes.bxp` needs to draw one box with 1.5 IQR whiskers.
+
+    Outliers are thinned to at most `max_fliers` evenly spaced ones so huge
+    runs do not draw millions of markers.
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    fliers = np.sort(values[(values < low) | (values > high)])
+    if len(fliers) > max_fliers:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).astype(int)]
+    return {
+        "label": label,
+        "q1": q1,
+        "med": median,
+        "q3": q3,
+        "whislo": inside.min(),
+        "whishi": inside.max(),
+        "fliers": fliers,
+    }
+
+
+def grouped_box_stats(df, metric, max_fliers=MAX_FLIERS):
+    """Box statistics of `metric` for every contract, in contract name order,
+    over the rows in which its operation succeeded"""
+    values = successful_values(df, [metric])[metric]
+    stats = (
+        box_stats(group, name, max_fliers)
+        for name, group in values.groupby(df["contract_name"])
+    )
+    return [box for box in stats if box is not None]
+
+
+def exclude_warmup(df, rows):
+    """Drop the first `rows` rows (lowest index) of every contract, which carry
+    first-call effects such as cold caches and connection setup"""
+    if rows <= 0:
+        return df
+    order = df.groupby("contract_name")["index"].rank(method="first")
+    return df[order > rows]
+
+
+def bootstrap_means(values, rng, resamples=DEFAULT_RESAMPLES, block=100):
+    """Column means of `resamples` bootstrap resamples of the rows of `values`
+    (which must not contain NaN), drawn `block` resamples at a time to bound
+    memory. All NaN if `values` has no rows."""
+    means = np.full((resamples, values.shape[1]), np.nan)
+    if not len(values):
+        return means
+    for start in range(0, resamples, block):
+        count = min(block, resamples - start)
+        rows = rng.integers(0, len(values), size=(count, len(values)))
+        means[start : start + count] = values[rows].mean(axis=1)
+    return means
+
+
+def _bootstrap_column(values, rng, resamples, max_sample):
+    """Bootstrap distribution of the mean of `values`, ignoring NaN.
+
+    Above `max_sample` values, a random subsample of that size is resampled
+    instead, and the spread of its resampled means around the subsample's
+    mean is shrunk by sqrt(max_sample / len(values)), the ratio of the
+    standard errors of the two means, and centred on the full mean.
+    """
+    values = values[~np.isnan(values)]
+    if len(values) <= max_sample:
+        return bootstrap_means(values[:, None], rng, resamples)[:, 0]
+    sample = values[rng.choice(len(values), max_sample, replace=False)]
+    means = bootstrap_means(sample[:, None], rng, resamples)[:, 0]
+    scale = np.sqrt(max_sample / len(values))
+    return values.mean() + (means - sample.mean()) * scale
+
+
+def _bootstrap_distribution(df, metrics, rng, resamples, max_sample):
+    """`(resamples, metrics)` bootstrap means of every metric of `df` over the
+    rows in which its operation succeeded"""
+    values = successful_values(df, metrics).to_numpy()
+    return np.column_stack(
+        [
+            _bootstrap_column(values[:, i], rng, resamples, max_sample)
+            for i in range(len(metrics))
+        ]
+    )
+
+
+def _interval(samples, confidence):
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(samples, [tail, 100 - tail], axis=0)
+
+
+def distribution_stats(
+    df,
+    metrics=METRIC_COLUMNS,
+    percentiles=PERCENTILES,
+    confidence=CONFIDENCE,
+    resamples=DEFAULT_RESAMPLES,
+    max_sample=BOOTSTRAP_SAMPLE,
+    seed=0,
+):
+    """Per contract and metric: count, mean with a bootstrap confidence
+    interval, standard deviation, percentiles and max, over the rows in which
+    the metric's operation succeeded.
+
+    Percentiles and spread are exact. The interval is a percentile bootstrap.
+    Contracts with more than `max_sample` rows are resampled from a random
+    subsample of that size, with the spread scaled to the standard error of
+    the full mean (see `_bootstrap_column`). Metrics without a successful
+    operation get a NaN interval.
+    """
+    rng = np.random.default_rng(seed)
+    tables = []
+    # A metric whose operation never succeeded only has NaN values
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for name, group in df.groupby("contract_name"):
+            values = successful_values(group, metrics).to_numpy()
+            low, high = _interval(
+                _bootstrap_distribution(group, metrics, rng, resamples, max_sample),
+                confidence,
+            )
+            stats = {
+                "count": np.count_nonzero(~np.isnan(values), axis=0),
+                "mean": np.nanmean(values, axis=0),
+                "ci_low": low,
+                "ci_high": high,
+                "std": np.nanstd(values, axis=0, ddof=1) if len(values) > 1 else np.nan,
+            }
+            for percentile, row in zip(
+                percentiles, np.nanpercentile(values, percentiles, axis=0)
+            ):
+                stats[f"p{percentile}"] = row
+            stats["max"] = np.nanmax(values, axis=0)
+            table = pd.DataFrame(stats, index=metrics)
+            table.index = pd.MultiIndex.from_product(
+                [[name], metrics], names=["contract_name", "metric"]
+            )
+            tables.append(table)
+    return pd.concat(tables) if tables else pd.DataFrame()
+
+
+def improvement_ci(
+    baseline,
+    candidate,
+    metrics=METRIC_COLUMNS,
+    confidence=CONFIDENCE,
+    resamples=DEFAULT_RESAMPLES,
+    max_sample=BOOTSTRAP_SAMPLE,
+    seed=0,
+):
+    """Bootstrap confidence interval of the mean improvement (%) of the
+    `candidate` rows over the `baseline` rows, per metric, over successful
+    operations. Large groups are subsampled as in `distribution_stats`."""
+    rng = np.random.default_rng(seed)
+    baseline_means = _bootstrap_distribution(
+        baseline, metrics, rng, resamples, max_sample
+    )
+    candidate_means = _bootstrap_distribution(
+        candidate, metrics, rng, resamples, max_sample
+    )
+    low, high = _interval(improvement(baseline_means, candidate_means), confidence)
+    return pd.DataFrame({"ci_low": low, "ci_high": high}, index=metrics)
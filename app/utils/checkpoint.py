@@ -0,0 +1,99 @@
+import glob
+import json
+import os
+
+import pyarrow.parquet as pq
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class CheckpointTracker:
+    """Track which rows of a run are fully measured, per contract.
+
+    Rows finish out of order when transactions are pipelined, so for every
+    contract this keeps a watermark (every row up to and including it is
+    done) plus the set of rows already done beyond it. Rows are visited with a
+    fixed `step`, so a sharded run advances its watermark over its own rows.
+
+    `submitted` is the highest row whose transactions may have been sent. It
+    is saved before any row past it is submitted, so after a crash every row
+    that can have left a record on-chain lies at or below it.
+    """
+
+    def __init__(self, contract_names, step=1, first=0, state=None, submitted=None):
+        self.step = step
+        self.submitted = first - step if submitted is None else submitted
+        self.watermark = {name: first - step for name in contract_names}
+        self.done = {name: set() for name in contract_names}
+        for name, contract_state in (state or {}).items():
+            self.watermark[name] = contract_state["watermark"]
+            self.done[name] = set(contract_state["done"])
+
+    def mark(self, contract_name, index):
+        done = self.done[contract_name]
+        done.add(index)
+        watermark = self.watermark[contract_name]
+        while watermark + self.step in done:
+            watermark += self.step
+            done.discard(watermark)
+        self.watermark[contract_name] = watermark
+
+    def is_done(self, contract_name, index):
+        return (
+            index <= self.watermark[contract_name] or index in self.done[contract_name]
+        )
+
+    def state(self):
+        return {
+            name: {"watermark": self.watermark[name], "done": sorted(self.done[name])}
+            for name in self.watermark
+        }
+
+
+def save_checkpoint(directory, tracker, parts):
+    """Atomically write a tracker's state to `<directory>/checkpoint.json`,
+    together with the names of the part files whose rows it covers"""
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {
+                "step": tracker.step,
+                "submitted": tracker.submitted,
+                "parts": sorted(parts),
+                "contracts": tracker.state(),
+            },
+            f,
+        )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(directory, contract_names):
+    """Rebuild the tracker saved in `directory`.
+
+    A part is written before the checkpoint that covers it, so a crash in
+    between leaves a part the checkpoint does not list. Its rows are marked
+    done here, which makes writing a part and saving the checkpoint one
+    atomic step as far as a resumed run is concerned.
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        raise ValueError(f"{directory} was not written with a checkpoint")
+    with open(path) as f:
+        checkpoint = json.load(f)
+    tracker = CheckpointTracker(
+        contract_names,
+        step=checkpoint["step"],
+        state=checkpoint["contracts"],
+        submitted=checkpoint["submitted"],
+    )
+    covered = set(checkpoint["parts"])
+    for part in sorted(glob.glob(os.path.join(directory, "*.parquet"))):
+        if os.path.basename(part) in covered:
+            continue
+        table = pq.read_table(part, columns=["contract_name", "index"])
+        for name, index in zip(
+            table.column("contract_name").to_pylist(), table.column("index").to_pylist()
+        ):
+            tracker.mark(name, index)
+    return tracker
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import sqlite3
+
+DEFAULT_CACHE_PATH = os.path.join("results", "cid_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+
+def content_key(content):
+    """SHA-256 digest identifying a row's uploaded content"""
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).digest()
+
+
+class CIDCache:
+    """Persistent content-hash -> CID map backed by SQLite.
+
+    Entries carry a logical clock that is bumped on every read and write; once
+    more than `max_entries` are stored, the least recently used ones are
+    evicted. `hits` and `misses` count lookups since the cache was opened.
+    Not thread-safe: use it from the thread that created it.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cids "
+            "(key BLOB PRIMARY KEY, cid TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS cids_last_used ON cids (last_used)"
+        )
+        self._clock, self._entries = self._db.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COUNT(*) FROM cids"
+        ).fetchone()
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, contents):
+        """Return the cached CID (or None) for each content, in order"""
+        keys = [content_key(content) for content in contents]
+        found = {}
+        for key in set(keys):
+            row = self._db.execute(
+                "SELECT cid FROM cids WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                found[key] = row[0]
+        if found:
+            self._db.executemany(
+                "UPDATE cids SET last_used = ? WHERE key = ?",
+                [(self._tick(), key) for key in found],
+            )
+            self._db.commit()
+        cids = [found.get(key) for key in keys]
+        hits = sum(cid is not None for cid in cids)
+        self.hits += hits
+        self.misses += len(cids) - hits
+        return cids
+
+    def get(self, content):
+        return self.get_many([content])[0]
+
+    def put_many(self, entries):
+        """Store `(content, cid)` pairs, evicting least recently used entries if
+        the cache grows past `max_entries`"""
+        rows = [(content_key(content), cid, self._tick()) for content, cid in entries]
+        new_keys = {
+            key
+            for key, _, _ in rows
+            if self._db.execute("SELECT 1 FROM cids WHERE key = ?", (key,)).fetchone()
+            is None
+        }
+        self._db.executemany(
+            "INSERT INTO cids (key, cid, last_used) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET cid = excluded.cid, "
+            "last_used = excluded.last_used",
+            rows,
+        )
+        self._entries += len(new_keys)
+        if self._entries > self.max_entries:
+            self._db.execute(
+                "DELETE FROM cids WHERE key IN "
+                "(SELECT key FROM cids ORDER BY last_used LIMIT ?)",
+                (self._entries - self.max_entries,),
+            )
+            self._entries = self.max_entries
+        self._db.commit()
+
+    def put(self, content, cid):
+        self.put_many([(content, cid)])
+
+    def stats(self):
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_entries": self._entries,
+        }
+
+    def close(self):
+        self._db.close()
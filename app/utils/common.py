@@ -0,0 +1,45 @@
+"""Settings shared by the runner and the benchmark scripts."""
+import argparse
+
+from utils.contract_registry import CONTRACT_ARTIFACTS, MERKLE_CONTRACT_NAME
+from utils.dataset import DEFAULT_CHUNK_SIZE
+from utils.tx_engine import DEFAULT_GAS
+
+CONTRACT_NAMES = ["BasicContract", "LightweightContract"]
+# Variants that can be selected explicitly once deployed
+ALL_CONTRACT_NAMES = [
+    name for name in CONTRACT_ARTIFACTS if name != MERKLE_CONTRACT_NAME
+]
+
+# The storage contracts treat record id 0 as "does not exist", so its
+# deleteRecord would revert. Dataset row `index` is stored as record
+# `index + RECORD_ID_OFFSET`.
+RECORD_ID_OFFSET = 1
+
+
+def common_parser(contract_names=CONTRACT_NAMES):
+    """Parent parser with the --contracts (defaulting to `contract_names`,
+    left out if None), --gas and --chunksize arguments"""
+    parser = argparse.ArgumentParser(add_help=False)
+    if contract_names is not None:
+        parser.add_argument(
+            "--contracts",
+            nargs="+",
+            choices=ALL_CONTRACT_NAMES,
+            default=contract_names,
+            help="Contract variants to run against",
+        )
+    parser.add_argument(
+        "--gas",
+        type=int,
+        default=DEFAULT_GAS,
+        help="Gas limit per transaction (large batches may need a node started "
+        "with a higher block gas limit)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows read from the dataset at a time",
+    )
+    return parser
@@ -0,0 +1,175 @@
+"""Truffle artifacts and deployed addresses of the contract variants.
+
+Nothing is read at import: artifacts and the deployment config are loaded on
+first use and cached until the file changes on disk, and a missing file only
+leaves the affected contracts out instead of failing the import.
+"""
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+ARTIFACTS_DIR = Path(os.environ.get("CONTRACTS_BUILD_DIR", "../build/contracts"))
+DEPLOYMENT_CONFIG = Path(os.environ.get("DEPLOYMENT_CONFIG", "../deployment_config.json"))
+
+# Truffle artifact behind every contract variant, keyed by experiment name.
+# EventLogHashContract is EventLogRecord emitting only each record's hash.
+#
+# This mapping is the extension point for new variants: a compiled artifact
+# is only deployed and run once it is registered here, and the runner's
+# add_record_call / add_records_call / record_exists know how to call it.
+# Compiled artifacts that are not registered are listed by
+# `unregistered_artifacts` and otherwise ignored.
+CONTRACT_ARTIFACTS = {
+    "BasicContract": "BasicRecord",
+    "LightweightContract": "LightweightRecord",
+    "PrehashedContract": "PrehashedRecord",
+    "PackedContract": "PackedRecord",
+    "CompactLightweightContract": "CompactLightweightRecord",
+    "EventLogContract": "EventLogRecord",
+    "EventLogHashContract": "EventLogRecord",
+    "MerkleBatchContract": "MerkleBatchRecord",
+}
+# Variants that record into event logs rather than contract storage
+EVENT_LOG_CONTRACT_NAMES = ["EventLogContract", "EventLogHashContract"]
+# Stores Merkle roots of whole batches, so only merkle_batches.py runs it
+MERKLE_CONTRACT_NAME = "MerkleBatchContract"
+
+
+def _file_version(path):
+    """Identify the file's current contents, or None if it does not exist.
+    Files are replaced atomically, so a rewrite always changes the inode,
+    even within the timestamp resolution of the filesystem."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=64)
+def _read_json(path, version):
+    """Parsed JSON file, cached per version"""
+    if version is None:
+        return None
+    with open(path, "r") as json_file:
+        return json.load(json_file)
+
+
+def read_json(path):
+    """Contents of a JSON file, or None if it does not exist"""
+    return _read_json(str(path), _file_version(path))
+
+
+def discover_artifacts(directory=ARTIFACTS_DIR):
+    """Names of the compiled artifacts in a Truffle build directory"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name[: -len(".json")] for name in os.listdir(directory) if name.endswith(".json")
+    )
+
+
+def unregistered_artifacts(directory=ARTIFACTS_DIR):
+    """Compiled artifacts that no variant in `CONTRACT_ARTIFACTS` uses"""
+    registered = set(CONTRACT_ARTIFACTS.values())
+    return [name for name in discover_artifacts(directory) if name not in registered]
+
+
+def load_artifact(name, directory=ARTIFACTS_DIR):
+    """Truffle artifact of contract `name`, or None if it has not been compiled"""
+    return read_json(Path(directory) / f"{name}.json")
+
+
+def get_abi(name, directory=ARTIFACTS_DIR):
+    artifact = load_artifact(name, directory)
+    if artifact is None:
+        print(f"Error: {Path(directory) / f'{name}.json'} not found.")
+        return []
+    return artifact.get("abi", [])
+
+
+def get_bytecode(name, directory=ARTIFACTS_DIR):
+    """Creation bytecode of contract `name`, or None if it has none"""
+    artifact = load_artifact(name, directory) or {}
+    bytecode = artifact.get("bytecode")
+    return bytecode if bytecode and bytecode != "0x" else None
+
+
+def load_deployment_config(path=DEPLOYMENT_CONFIG):
+    """`{artifact_name: address}` of the deployed contracts, empty if the
+    config does not exist yet"""
+    return read_json(path) or {}
+
+
+def deployed_addresses(path=DEPLOYMENT_CONFIG):
+    """`{experiment_name: address}` of every variant with a configured address"""
+    config = load_deployment_config(path)
+    return {
+        name: config[artifact]
+        for name, artifact in CONTRACT_ARTIFACTS.items()
+        if config.get(artifact)
+    }
+
+
+def save_deployment_config(addresses, path=DEPLOYMENT_CONFIG):
+    """Merge `{artifact_name: address}` into the deployment config. The file
+    is replaced atomically, so readers never see it half written."""
+    config = {**load_deployment_config(path), **addresses}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as json_file:
+        json.dump(config, json_file, indent=2)
+    os.replace(tmp_path, path)
+    return config
+
+
+def deploy_contract(w3, artifact_name, account, directory=ARTIFACTS_DIR):
+    """Deploy one compiled contract from `account` and return its address"""
+    bytecode = get_bytecode(artifact_name, directory)
+    if bytecode is None:
+        raise ValueError(f"No bytecode for {artifact_name}, run `truffle compile`")
+    contract = w3.eth.contract(abi=get_abi(artifact_name, directory), bytecode=bytecode)
+    tx_hash = contract.constructor().transact({"from": account})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    if receipt["status"] != 1:
+        raise RuntimeError(f"Deploying {artifact_name} failed")
+    return receipt["contractAddress"]
+
+
+def deploy_contracts(
+    w3,
+    contract_names=None,
+    account=None,
+    redeploy=False,
+    directory=ARTIFACTS_DIR,
+    config_path=DEPLOYMENT_CONFIG,
+):
+    """Deploy the variants `contract_names` (every compiled one by default)
+    and record their addresses in the deployment config.
+
+    A configured address that still holds code on the chain is reused unless
+    `redeploy` is set, so restarting against the same node deploys nothing.
+    Returns `{experiment_name: address}`.
+    """
+    if contract_names is None:
+        compiled = set(discover_artifacts(directory))
+        contract_names = [
+            name for name, artifact in CONTRACT_ARTIFACTS.items() if artifact in compiled
+        ]
+    account = account or w3.eth.accounts[0]
+    config = load_deployment_config(config_path)
+    addresses = {}
+    deployed = {}
+    for name in contract_names:
+        artifact = CONTRACT_ARTIFACTS[name]
+        address = config.get(artifact)
+        # Variants sharing an artifact share its deployment
+        if artifact in deployed:
+            address = deployed[artifact]
+        elif redeploy or not address or not w3.eth.get_code(address):
+            address = deploy_contract(w3, artifact, account, directory)
+            deployed[artifact] = address
+        addresses[name] = address
+    if deployed:
+        save_deployment_config(deployed, config_path)
+    return addresses
@@ -0,0 +1,57 @@
+"""Translate gas into ETH and fiat costs under gas price scenarios."""
+import os
+
+import pandas as pd
+
+# Gas prices in gwei for the default scenarios, and the ETH price they are
+# converted to fiat with (overridable from the environment)
+GAS_PRICE_SCENARIOS = {"low": 1.0, "typical": 10.0, "high": 50.0}
+ETH_PRICE = float(os.environ.get("ETH_PRICE_USD", "3000"))
+GWEI_PER_ETH = 10**9
+
+
+def parse_gas_prices(values):
+    """Parse `name=gwei` strings into a scenario dict"""
+    scenarios = {}
+    for value in values:
+        name, _, price = value.partition("=")
+        if not price:
+            raise ValueError(f"Expected name=gwei, got {value!r}")
+        scenarios[name] = float(price)
+    return scenarios
+
+
+def gas_to_eth(gas, gas_price_gwei):
+    return gas * gas_price_gwei / GWEI_PER_ETH
+
+
+def cost_table(
+    gas_per_record, records, scenarios=GAS_PRICE_SCENARIOS, eth_price=ETH_PRICE
+):
+    """Cost of adding and deleting `records` records per contract and scenario.
+
+    `gas_per_record` maps contract names to `{"add": gas, "delete": gas}`.
+    """
+    rows = []
+    for contract_name, gas in gas_per_record.items():
+        total_gas = (gas["add"] + gas["delete"]) * records
+        for scenario, gas_price in scenarios.items():
+            cost_eth = gas_to_eth(total_gas, gas_price)
+            rows.append(
+                {
+                    "contract_name": contract_name,
+                    "scenario": scenario,
+                    "gas_price_gwei": gas_price,
+                    "records": records,
+                    "add_gas_per_record": gas["add"],
+                    "delete_gas_per_record": gas["delete"],
+                    "total_gas": total_gas,
+                    "add_cost_eth": gas_to_eth(gas["add"] * records, gas_price),
+                    "total_cost_eth": cost_eth,
+                    "total_cost_fiat": cost_eth * eth_price,
+                    "cost_per_record_fiat": cost_eth * eth_price / records
+                    if records
+                    else 0.0,
+                }
+            )
+    return pd.DataFrame(rows)
@@ -0,0 +1,86 @@
+import csv
+import io
+
+import pandas as pd
+
+# Rows parsed per pandas chunk; bounds memory regardless of dataset size.
+DEFAULT_CHUNK_SIZE = 10_000
+PREVIEW_ROWS = 1_000
+
+
+def read_preview(path, nrows=PREVIEW_ROWS):
+    """Read only the first rows of a dataset for display"""
+    return pd.read_csv(path, nrows=nrows)
+
+
+def count_rows(path, block_size=1 << 20):
+    """Count data rows by scanning raw bytes for newlines.
+
+    This never parses the file, so it is cheap even for multi-GB datasets. Quoted
+    fields containing newlines make the count an over-estimate, which is only
+    used for progress reporting.
+    """
+    lines = 0
+    last_byte = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            lines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNK_SIZE, shard=None):
+    """Yield the dataset as DataFrames of at most `chunksize` rows, with every
+    field already parsed as a string.
+
+    `shard=(worker_id, workers)` keeps only rows whose index modulo `workers`
+    equals `worker_id`; other lines are skipped by the tokenizer.
+    """
+    skiprows = None
+    if shard is not None:
+        worker_id, workers = shard
+        skiprows = lambda line: line > 0 and (line - 1) % workers != worker_id
+    return pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunksize,
+        skiprows=skiprows,
+    )
+
+
+def iter_rows(path, chunksize=DEFAULT_CHUNK_SIZE, shard=None):
+    """Yield `(index, fields)` for every row, where `fields` is the list of string
+    values sent to the contracts.
+
+    Fields are kept exactly as they appear in the CSV (empty cells stay empty
+    strings) and are converted in one pass per chunk, so no per-row pandas
+    Series is ever built. With a `shard`, `index` is still the row's position
+    in the whole dataset.
+    """
+    index, step = (0, 1) if shard is None else shard
+    for chunk in iter_chunks(path, chunksize, shard):
+        for fields in chunk.to_numpy().tolist():
+            yield index, fields
+            index += step
+
+
+def iter_batches(rows, batch_size):
+    """Group `(index, fields)` rows into lists of at most `batch_size` rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def row_to_csv(fields):
+    """Serialize one row's fields as a CSV line"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue()
@@ -0,0 +1,44 @@
+from multiprocessing import Pool
+
+from eth_utils import keccak
+
+from utils.dataset import DEFAULT_CHUNK_SIZE, iter_chunks
+
+ZERO_HASH = b"\x00" * 32
+
+
+def record_hash(fields):
+    """Chained keccak256 of a record's fields, identical to the `data_hash`
+    LightweightRecord computes on-chain:
+
+        hash = 0x0
+        for field in fields:
+            hash = keccak256(abi.encodePacked(hash, keccak256(bytes(field))))
+    """
+    data_hash = ZERO_HASH
+    for field in fields:
+        data_hash = keccak(data_hash + keccak(text=field))
+    return data_hash
+
+
+def hash_rows(rows):
+    """Hash a list of field lists"""
+    return [record_hash(fields) for fields in rows]
+
+
+def _hash_chunk(chunk):
+    return hash_rows(chunk.to_numpy().tolist())
+
+
+def hash_dataset(path, processes=None, chunksize=DEFAULT_CHUNK_SIZE):
+    """Yield `(index, data_hash)` for every row of a CSV dataset, in order.
+
+    Chunks are hashed in parallel on `processes` worker processes (all cores by
+    default) while the main process keeps reading ahead.
+    """
+    index = 0
+    with Pool(processes) as pool:
+        for hashes in pool.imap(_hash_chunk, iter_chunks(path, chunksize)):
+            for data_hash in hashes:
+                yield index, data_hash
+                index += 1
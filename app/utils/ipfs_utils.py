@@ -1,40 +1,176 @@
 import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
 
 # IPFS API endpoint (default for local node)
-IPFS_API_URL = "http://localhost:5001/api/v0"
+IPFS_API_URL = os.environ.get("IPFS_API_URL", "http://localhost:5001/api/v0")
+
+DEFAULT_WORKERS = 8
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 30
+
+
+def make_ipfs_session(
+    pool_size=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF
+):
+    """requests session with a keep-alive pool and retry with exponential backoff
+    on connection errors and 429/5xx responses"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 def upload_to_ipfs(name, file):
     try:
-        # Add file to IPFS
+        # Add and pin the file in a single request
         add_endpoint = f"{IPFS_API_URL}/add"
-        
+
         # Create a dictionary with the file to be uploaded
         files = {
             'file': (name, file)
         }
-        
+
         # Make the request to the local IPFS node
-        response = requests.post(add_endpoint, files=files)
-        
+        response = requests.post(add_endpoint, params={"pin": "true"}, files=files)
+
         # Parse the response
         if response.status_code == 200:
             result = json.loads(response.text)
             ipfs_hash = result.get("Hash")
-            print(f"File uploaded to local IPFS node. IPFS Hash (CID): {ipfs_hash}")
-            
-            # Optional: Pin the file to ensure it persists in your local node
-            pin_endpoint = f"{IPFS_API_URL}/pin/add?arg={ipfs_hash}"
-            requests.post(pin_endpoint)
-            print(f"File pinned locally")
-            
+            print(f"File uploaded and pinned on local IPFS node. IPFS Hash (CID): {ipfs_hash}")
             return ipfs_hash
         else:
             print(f"Error uploading to IPFS: Status code {response.status_code}")
             print(response.text)
             return None
-            
+
     except Exception as e:
         print(f"Error uploading to IPFS: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+
+def fetch_from_ipfs(cid, session=None, api_url=IPFS_API_URL, timeout=DEFAULT_TIMEOUT):
+    """Return the content stored under `cid`, read through the node's
+    `/api/v0/cat` endpoint. Raises on HTTP errors."""
+    session = session or requests
+    response = session.post(f"{api_url}/cat", params={"arg": cid}, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+class IPFSUploader:
+    """Bulk uploader for the Kubo `/api/v0/add` endpoint.
+
+    Files are sent `batch_size` at a time as one multipart `add?pin=true`
+    request, on `workers` threads sharing one pooled session. Failed requests
+    are retried with backoff by the session; a batch that still fails raises.
+
+    With a `CIDCache`, content that was uploaded before is answered from the
+    cache and never sent to the node.
+    """
+
+    def __init__(
+        self,
+        api_url=IPFS_API_URL,
+        workers=DEFAULT_WORKERS,
+        batch_size=DEFAULT_BATCH_SIZE,
+        retries=DEFAULT_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        timeout=DEFAULT_TIMEOUT,
+        cache=None,
+    ):
+        self.api_url = api_url
+        self.cache = cache
+        self.workers = workers
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = make_ipfs_session(workers, retries, backoff)
+
+    def add_batch(self, items):
+        """Upload `(name, content)` pairs in one request and return their CIDs in
+        the same order. Names must be unique within the batch."""
+        files = [("file", (name, content)) for name, content in items]
+        response = self.session.post(
+            f"{self.api_url}/add",
+            params={"pin": "true"},
+            files=files,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        # One JSON object per added file, newline delimited
+        cids = {}
+        for line in response.text.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                cids[entry["Name"]] = entry["Hash"]
+        return [cids[name] for name, _ in items]
+
+    def _submit(self, pool, batch):
+        if self.cache is not None:
+            known = self.cache.get_many([content for _, content in batch])
+        else:
+            known = [None] * len(batch)
+        missing = [item for item, cid in zip(batch, known) if cid is None]
+        future = pool.submit(self.add_batch, missing) if missing else None
+        return batch, known, future
+
+    def _collect(self, submitted):
+        batch, known, future = submitted
+        uploaded = iter(future.result() if future is not None else [])
+        cids = []
+        new_entries = []
+        for (_, content), cid in zip(batch, known):
+            if cid is None:
+                cid = next(uploaded)
+                new_entries.append((content, cid))
+            cids.append(cid)
+        if self.cache is not None and new_entries:
+            self.cache.put_many(new_entries)
+        return cids
+
+    def upload_all(self, items):
+        """Yield the CID of every `(name, content)` pair, in input order.
+
+        `items` is consumed lazily, keeping at most two batches per worker in
+        flight, so uploads run ahead of whatever consumes the CIDs without
+        buffering the whole dataset.
+        """
+        with ThreadPoolExecutor(self.workers) as pool:
+            in_flight = deque()
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    in_flight.append(self._submit(pool, batch))
+                    batch = []
+                    if len(in_flight) >= 2 * self.workers:
+                        yield from self._collect(in_flight.popleft())
+            if batch:
+                in_flight.append(self._submit(pool, batch))
+            while in_flight:
+                yield from self._collect(in_flight.popleft())
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,200 @@
+"""Local SQLite index of the records the event-log contracts emit.
+
+`sync_logs` pulls a contract's logs with `eth_getLogs` in block ranges and
+applies them in chain order: RecordAdded and RecordHashAdded store the record,
+RecordDeleted removes it. The last indexed block is saved with every range,
+so a later sync only fetches new blocks.
+
+The sync state also records which chain (chain id and genesis block hash) it
+was built from. A development node that restarts deploys the contracts at
+the same addresses with the same record ids, so an address's entries are
+dropped and indexed again whenever the chain differs, the node is behind the
+last indexed block, or the caller asks for an explicit `from_block`.
+"""
+import json
+import os
+import sqlite3
+
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+
+DEFAULT_INDEX_PATH = os.path.join("results", "event_log_index.sqlite")
+# Blocks per eth_getLogs request; halved for a range the node rejects
+DEFAULT_BLOCK_RANGE = 2_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    address TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    data_hash BLOB NOT NULL,
+    fields TEXT,
+    ipfs_hash TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (address, record_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    address TEXT PRIMARY KEY,
+    chain TEXT NOT NULL,
+    last_block INTEGER NOT NULL
+);
+"""
+
+
+def open_index(path=DEFAULT_INDEX_PATH):
+    """Open (and create if needed) the index database"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def event_topics(contract):
+    """`{topic0: event name}` of every event in the contract's ABI"""
+    return {
+        Web3.to_hex(event_abi_to_log_topic(abi)): abi["name"]
+        for abi in contract.abi
+        if abi["type"] == "event"
+    }
+
+
+def record_topic(record_id):
+    """Topic of an indexed uint256 record id, to filter logs by record"""
+    return Web3.to_hex(record_id.to_bytes(32, "big"))
+
+
+def chain_identity(w3):
+    """Chain id and genesis block hash, which change when a node is reset"""
+    genesis = w3.eth.get_block(0)["hash"]
+    return f"{w3.eth.chain_id}:{Web3.to_hex(genesis)}"
+
+
+def sync_state(db, address):
+    """`(chain, last_block)` the address was indexed up to, or None"""
+    return db.execute(
+        "SELECT chain, last_block FROM sync_state WHERE address = ?", (address,)
+    ).fetchone()
+
+
+def reset_index(db, address):
+    """Drop every indexed record and the sync state of `address`"""
+    db.execute("DELETE FROM records WHERE address = ?", (address,))
+    db.execute("DELETE FROM sync_state WHERE address = ?", (address,))
+    db.commit()
+
+
+def apply_logs(db, contract, logs, topics):
+    """Apply decoded logs of `contract` to the index in chain order"""
+    address = contract.address
+    logs = sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+    for log in logs:
+        name = topics.get(Web3.to_hex(log["topics"][0]))
+        if name is None:
+            continue
+        args = contract.events[name]().process_log(log)["args"]
+        if name == "RecordDeleted":
+            db.execute(
+                "DELETE FROM records WHERE address = ? AND record_id = ?",
+                (address, args["record_id"]),
+            )
+            continue
+        fields = args.get("fields")
+        db.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                address,
+                args["record_id"],
+                bytes(args["data_hash"]),
+                json.dumps(list(fields)) if fields is not None else None,
+                args["ipfs_hash"],
+                log["blockNumber"],
+                log["logIndex"],
+            ),
+        )
+
+
+def sync_logs(
+    w3, contract, db, block_range=DEFAULT_BLOCK_RANGE, from_block=None, to_block=None
+):
+    """Index the contract's logs from the block after the last indexed one
+    up to `to_block` (the latest block by default).
+
+    With an explicit `from_block`, or when the index was built from another
+    chain or runs ahead of the node, the address is indexed again from
+    `from_block` (the genesis block by default). The address counts as
+    indexed up to the block before `from_block` even if `from_block` lies
+    past `to_block`, so the next sync continues from there. Returns the
+    number of blocks scanned, logs applied and eth_getLogs requests sent,
+    and whether the address was reset.
+    """
+    address = contract.address
+    topics = event_topics(contract)
+    chain = chain_identity(w3)
+    head = w3.eth.block_number
+    state = sync_state(db, address)
+    reset = state is not None and (
+        from_block is not None or state[0] != chain or state[1] > head
+    )
+    if reset:
+        reset_index(db, address)
+        state = None
+    if state is None:
+        start = from_block or 0
+        db.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+            (address, chain, start - 1),
+        )
+        db.commit()
+    else:
+        start = state[1] + 1
+    end = head if to_block is None else to_block
+    stats = {
+        "blocks": max(0, end - start + 1),
+        "logs": 0,
+        "requests": 0,
+        "reset": reset,
+    }
+    while start <= end:
+        stop = min(start + block_range - 1, end)
+        stats["requests"] += 1
+        try:
+            logs = w3.eth.get_logs(
+                {"address": address, "fromBlock": start, "toBlock": stop}
+            )
+        except Exception:
+            # Nodes cap the blocks or results per request
+            if block_range == 1:
+                raise
+            block_range = max(1, block_range // 2)
+            continue
+        apply_logs(db, contract, logs, topics)
+        db.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+            (address, chain, stop),
+        )
+        db.commit()
+        stats["logs"] += len(logs)
+        start = stop + 1
+    return stats
+
+
+def lookup_record(db, address, record_id):
+    """Indexed record `record_id` of the contract at `address`, or None"""
+    row = db.execute(
+        "SELECT data_hash, fields, ipfs_hash, block_number FROM records "
+        "WHERE address = ? AND record_id = ?",
+        (address, record_id),
+    ).fetchone()
+    if row is None:
+        return None
+    data_hash, fields, ipfs_hash, block_number = row
+    return {
+        "record_id": record_id,
+        "data_hash": data_hash,
+        "fields": json.loads(fields) if fields is not None else None,
+        "ipfs_hash": ipfs_hash,
+        "block_number": block_number,
+    }
@@ -0,0 +1,253 @@
+"""Profiling of the harness itself: where a run spends its time.
+
+A `RunProfiler` collects, per run:
+
+- stage timers: total time and calls per named stage (reading the dataset and
+  building jobs, each transaction phase, recording results, progress
+  redraws), summed over every occurrence
+- a throughput timeline: rows completed per interval since the start
+- optionally a function-level profile, either deterministic (`cprofile`) or
+  from a sampling thread (`sample`) that is cheap enough for long runs
+
+`save` writes everything to `profile.json` in the run directory (plus
+`profile.prof` for cProfile, readable with `pstats` or snakeviz).
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_FILE = "profile.json"
+CPROFILE_FILE = "profile.prof"
+PROFILERS = ["cprofile", "sample"]
+DEFAULT_TIMELINE_INTERVAL = 1.0
+DEFAULT_SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 30
+
+
+class StageTimer:
+    """Total nanoseconds and calls per stage"""
+
+    def __init__(self):
+        self.totals = Counter()
+        self.calls = Counter()
+
+    def add(self, stage, elapsed_ns, calls=1):
+        self.totals[stage] += elapsed_ns
+        self.calls[stage] += calls
+
+    @contextmanager
+    def stage(self, name):
+        started_at = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter_ns() - started_at)
+
+    def timed_iter(self, items, name):
+        """Yield from `items`, timing how long producing each item takes"""
+        items = iter(items)
+        while True:
+            started_at = time.perf_counter_ns()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                self.add(name, time.perf_counter_ns() - started_at)
+            yield item
+
+    def summary(self):
+        return {
+            stage: {
+                "calls": self.calls[stage],
+                "total_ms": total / 1e6,
+                "mean_ms": total / 1e6 / self.calls[stage] if self.calls[stage] else 0.0,
+            }
+            for stage, total in self.totals.items()
+        }
+
+
+class ThroughputTimeline:
+    """Rows completed per `interval` seconds since the timeline started"""
+
+    def __init__(self, interval=DEFAULT_TIMELINE_INTERVAL):
+        self.interval = interval
+        self.started_at = None
+        self.buckets = Counter()
+
+    def start(self):
+        """Start the timeline, unless it already is"""
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+
+    def mark(self, rows=1):
+        self.start()
+        self.buckets[int((time.monotonic() - self.started_at) / self.interval)] += rows
+
+    def timeline(self):
+        if not self.buckets:
+            return []
+        return [
+            {
+                "elapsed": bucket * self.interval,
+                "rows": self.buckets[bucket],
+                "rows_per_second": self.buckets[bucket] / self.interval,
+            }
+            for bucket in range(max(self.buckets) + 1)
+        ]
+
+
+class SamplingProfiler:
+    """Record the stack of one thread every `interval` seconds from a
+    background thread. Counts how often each function is running (`self`)
+    or on the stack (`total`)."""
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, target):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.self_counts[_frame_key(frame)] += 1
+            seen = set()
+            while frame is not None:
+                key = _frame_key(frame)
+                if key not in seen:
+                    seen.add(key)
+                    self.total_counts[key] += 1
+                frame = frame.f_back
+
+    def top_functions(self, limit=TOP_FUNCTIONS):
+        return [
+            {
+                "function": key,
+                "self_share": self.self_counts[key] / self.samples,
+                "total_share": count / self.samples,
+            }
+            for key, count in self.total_counts.most_common(limit)
+        ]
+
+
+def _frame_key(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+
+class RunProfiler:
+    """Stage timers, throughput timeline and an optional function profiler
+    (`profiler` is one of `PROFILERS` or None) for one run"""
+
+    def __init__(self, profiler=None, interval=DEFAULT_TIMELINE_INTERVAL):
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+        self.profiler = profiler
+        self.stages = StageTimer()
+        self.throughput = ThroughputTimeline(interval)
+        self.rpc = {}
+        self.wall_time = 0.0
+        self._function_profiler = None
+        self._started_at = None
+
+    @contextmanager
+    def profile(self):
+        """Profile the code run inside the block, on the calling thread"""
+        if self.profiler == "cprofile":
+            self._function_profiler = cProfile.Profile()
+            self._function_profiler.enable()
+        elif self.profiler == "sample":
+            self._function_profiler = SamplingProfiler()
+            self._function_profiler.start()
+        # Setup between construction and profiling is not part of the timeline
+        self.throughput.start()
+        self._started_at = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_time += time.perf_counter() - self._started_at
+            if self.profiler == "cprofile":
+                self._function_profiler.disable()
+            elif self.profiler == "sample":
+                self._function_profiler.stop()
+
+    def add_transaction(self, result):
+        """Add the client-side phases of one engine result to the stages"""
+        for phase in ["encode", "queue", "send", "receipt"]:
+            self.stages.add(f"tx_{phase}", result[f"{phase}_ns"])
+
+    def top_functions(self, limit=TOP_FUNCTIONS):
+        if self.profiler == "sample":
+            return self._function_profiler.top_functions(limit)
+        if self.profiler != "cprofile":
+            return []
+        stats = pstats.Stats(self._function_profiler)
+        rows = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append(
+                {
+                    "function": f"{os.path.basename(filename)}:{line}({name})",
+                    "calls": calls,
+                    "self_ms": tottime * 1000,
+                    "total_ms": cumtime * 1000,
+                }
+            )
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit]
+
+    def summary(self):
+        rows = sum(self.throughput.buckets.values())
+        return {
+            "profiler": self.profiler,
+            "wall_time": self.wall_time,
+            "rows": rows,
+            "rows_per_second": rows / self.wall_time if self.wall_time else 0.0,
+            "stages": self.stages.summary(),
+            "rpc": self.rpc,
+            "timeline": self.throughput.timeline(),
+            "top_functions": self.top_functions(),
+        }
+
+    def save(self, directory):
+        """Write the profile to `directory` and return its summary without
+        the timeline and functions, for the run metadata"""
+        summary = self.summary()
+        with open(os.path.join(directory, PROFILE_FILE), "w") as f:
+            json.dump(summary, f, indent=2)
+        if self.profiler == "cprofile":
+            self._function_profiler.dump_stats(os.path.join(directory, CPROFILE_FILE))
+        return {
+            key: summary[key]
+            for key in ["profiler", "wall_time", "rows", "rows_per_second"]
+        }
+
+
+def load_profile(directory):
+    """Profile saved with a run, or None if it was not profiled"""
+    path = os.path.join(directory, PROFILE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
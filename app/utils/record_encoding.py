@@ -0,0 +1,90 @@
+"""Off-chain encodings used by the packed-storage contract variants."""
+import base64
+import hashlib
+
+# Bytes of the big-endian length prefix in front of every packed field
+FIELD_LENGTH_BYTES = 2
+MAX_FIELD_LENGTH = 2 ** (8 * FIELD_LENGTH_BYTES) - 1
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# Multihash header of a sha2-256 digest: function code 0x12, length 32
+SHA2_256_PREFIX = bytes([0x12, 0x20])
+MULTIHASH_LENGTH = len(SHA2_256_PREFIX) + 32
+
+
+def pack_fields(fields):
+    """Pack a record's fields into the `bytes` PackedRecord stores: every
+    UTF-8 encoded field preceded by its length in two big-endian bytes"""
+    packed = bytearray()
+    for field in fields:
+        data = field.encode("utf-8")
+        if len(data) > MAX_FIELD_LENGTH:
+            raise ValueError(
+                f"Field of {len(data)} bytes exceeds {MAX_FIELD_LENGTH} bytes"
+            )
+        packed += len(data).to_bytes(FIELD_LENGTH_BYTES, "big") + data
+    return bytes(packed)
+
+
+def unpack_fields(packed):
+    """Inverse of `pack_fields`"""
+    fields = []
+    offset = 0
+    while offset < len(packed):
+        length = int.from_bytes(packed[offset : offset + FIELD_LENGTH_BYTES], "big")
+        offset += FIELD_LENGTH_BYTES
+        fields.append(packed[offset : offset + length].decode("utf-8"))
+        offset += length
+    return fields
+
+
+def b58decode(text):
+    number = 0
+    for char in text:
+        number = number * 58 + BASE58_ALPHABET.index(char)
+    leading_zeros = len(text) - len(text.lstrip("1"))
+    return b"\x00" * leading_zeros + number.to_bytes(
+        (number.bit_length() + 7) // 8, "big"
+    )
+
+
+def cid_multihash(cid):
+    """The multihash inside a CIDv0 (`Qm...`) or base32 CIDv1 (`b...`), or
+    None for anything else"""
+    try:
+        if cid.startswith("Qm"):
+            return b58decode(cid)
+        if cid.startswith("b"):
+            encoded = cid[1:].upper()
+            data = base64.b32decode(encoded + "=" * (-len(encoded) % 8))
+            # The version and codec varints precede the multihash
+            return data[-MULTIHASH_LENGTH:]
+    except ValueError:
+        pass
+    return None
+
+
+def cid_digest(cid):
+    """32-byte sha2-256 digest a CID is stored as by CompactLightweightRecord.
+
+    Anything that does not decode to a sha2-256 multihash, such as the
+    experiment's placeholder CID, is stored as its own sha256, so every record
+    still writes a non-zero digest."""
+    multihash = cid_multihash(cid)
+    if (
+        multihash is not None
+        and len(multihash) == MULTIHASH_LENGTH
+        and multihash.startswith(SHA2_256_PREFIX)
+    ):
+        return multihash[len(SHA2_256_PREFIX) :]
+    return hashlib.sha256(cid.encode()).digest()
+
+
+def digest_to_cid(digest):
+    """CIDv0 of a sha2-256 digest, to fetch a compact record's content"""
+    number = int.from_bytes(SHA2_256_PREFIX + digest, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    return encoded
@@ -0,0 +1,242 @@
+import glob
+import json
+import os
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.checkpoint import save_checkpoint
+
+RUNS_DIR = os.path.join("results", "runs")
+DEFAULT_FLUSH_ROWS = 5_000
+DEFAULT_RESERVE_ROWS = 1_000
+METADATA_FILE = "meta.json"
+
+
+def new_run_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def run_dir(run_id, root=RUNS_DIR):
+    return os.path.join(root, f"run_id={run_id}")
+
+
+def read_metadata(run_id, root=RUNS_DIR):
+    with open(os.path.join(run_dir(run_id, root), METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def write_metadata(run_id, metadata, root=RUNS_DIR):
+    """Atomically replace a run's metadata file"""
+    path = os.path.join(run_dir(run_id, root), METADATA_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metadata, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def update_metadata(run_id, root=RUNS_DIR, **values):
+    metadata = read_metadata(run_id, root)
+    metadata.update(values)
+    write_metadata(run_id, metadata, root)
+
+
+class ResultsWriter:
+    """Stream result rows of one run to Parquet files under
+    `results/runs/run_id=<id>/`.
+
+    Rows are buffered and written as a new `<prefix>-NNNNN.parquet` part every
+    `flush_rows` rows, so at most one batch is held in memory and everything
+    up to the last flush survives a crash. Parts are written to a temporary
+    file and renamed, so readers never see a half-written part. `constants`
+    are added as columns to every row.
+
+    With a `checkpoint` tracker, the rows of each part are marked done once
+    the part is written and the checkpoint is saved right after, so it never
+    covers rows that are not on disk. `reserve(index)` must be called before
+    a row's transactions are submitted; it saves the checkpoint whenever the
+    row passes the submitted mark, moving the mark `reserve_rows` rows ahead.
+    `resume=True` reopens an existing run and continues its part numbering.
+    """
+
+    def __init__(
+        self,
+        run_id=None,
+        metadata=None,
+        root=RUNS_DIR,
+        flush_rows=DEFAULT_FLUSH_ROWS,
+        part_prefix="part",
+        constants=None,
+        checkpoint=None,
+        resume=False,
+        reserve_rows=DEFAULT_RESERVE_ROWS,
+    ):
+        self.run_id = run_id or new_run_id()
+        self.root = root
+        self.dir = run_dir(self.run_id, root)
+        self.flush_rows = flush_rows
+        self.part_prefix = part_prefix
+        self.constants = constants or {}
+        self.checkpoint = checkpoint
+        self.reserve_rows = reserve_rows
+        # Only the writer that created (or resumed) the run updates its metadata
+        self.owns_metadata = metadata is not None or resume
+        self.rows_written = 0
+        self._buffer = []
+        os.makedirs(self.dir, exist_ok=True)
+        self._part = len(
+            glob.glob(os.path.join(self.dir, f"{part_prefix}-*.parquet"))
+        )
+        if metadata is not None:
+            write_metadata(
+                self.run_id,
+                {
+                    "run_id": self.run_id,
+                    "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "status": "running",
+                    **metadata,
+                },
+                root,
+            )
+        elif resume:
+            update_metadata(
+                self.run_id,
+                root,
+                status="running",
+                resumed_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            self.rows_written = count_run_rows(self.run_id, root)
+        if self.checkpoint is not None:
+            self.save_checkpoint()
+
+    def save_checkpoint(self):
+        parts = [os.path.basename(part) for part in part_files(self.run_id, self.root)]
+        save_checkpoint(self.dir, self.checkpoint, parts)
+
+    def reserve(self, index):
+        """Save the checkpoint before row `index` is submitted if it lies past
+        the submitted mark"""
+        if self.checkpoint is None or index <= self.checkpoint.submitted:
+            return
+        self.checkpoint.submitted = index + self.reserve_rows * self.checkpoint.step
+        self.save_checkpoint()
+
+    def append(self, row):
+        self._buffer.append({**row, **self.constants})
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        file_name = f"{self.part_prefix}-{self._part:05d}.parquet"
+        path = os.path.join(self.dir, file_name)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(pa.Table.from_pylist(self._buffer), tmp_path)
+        os.replace(tmp_path, path)
+        if self.checkpoint is not None:
+            for row in self._buffer:
+                self.checkpoint.mark(row["contract_name"], row["index"])
+            self.save_checkpoint()
+        self._part += 1
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self, **metadata):
+        """Flush remaining rows and, if this writer owns the run's metadata,
+        mark the run finished with its row count and any extra `metadata`"""
+        self.flush()
+        if self.owns_metadata:
+            values = {
+                "status": "finished",
+                "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "rows": self.rows_written,
+                **metadata,
+            }
+            update_metadata(self.run_id, self.root, **values)
+
+    def abort(self):
+        """Flush what was measured so far and mark the run as interrupted"""
+        self.flush()
+        if self.owns_metadata:
+            update_metadata(
+                self.run_id, self.root, status="interrupted", rows=self.rows_written
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def list_runs(root=RUNS_DIR):
+    """Metadata of every stored run, newest first"""
+    runs = []
+    for path in glob.glob(os.path.join(root, "run_id=*", METADATA_FILE)):
+        with open(path) as f:
+            runs.append(json.load(f))
+    return sorted(runs, key=lambda run: run.get("created_at", ""), reverse=True)
+
+
+def part_files(run_id, root=RUNS_DIR):
+    return sorted(glob.glob(os.path.join(run_dir(run_id, root), "*.parquet")))
+
+
+def count_run_rows(run_id, root=RUNS_DIR):
+    """Number of stored rows of a run, read from the Parquet footers only"""
+    return sum(
+        pq.ParquetFile(part).metadata.num_rows for part in part_files(run_id, root)
+    )
+
+
+def load_run(run_id, columns=None, root=RUNS_DIR):
+    """Load a run's rows, reading only `columns` if given"""
+    parts = part_files(run_id, root)
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    tables = [pq.read_table(part, columns=columns) for part in parts]
+    return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+
+def read_run_rows(run_id, offset, limit, columns=None, root=RUNS_DIR):
+    """Read `limit` rows of a run starting at row `offset`, opening only the
+    parts that hold them"""
+    tables = []
+    for part in part_files(run_id, root):
+        parquet_file = pq.ParquetFile(part)
+        num_rows = parquet_file.metadata.num_rows
+        if offset >= num_rows:
+            offset -= num_rows
+            continue
+        table = parquet_file.read(columns=columns).slice(offset, limit)
+        tables.append(table)
+        limit -= table.num_rows
+        offset = 0
+        if limit <= 0:
+            break
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+
+def export_run_csv(run_id, path, root=RUNS_DIR):
+    """Write a run's rows to one CSV file, a part at a time"""
+    columns = None
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="") as f:
+        for part in part_files(run_id, root):
+            df = pq.read_table(part).to_pandas()
+            if columns is None:
+                columns = list(df.columns)
+                df.to_csv(f, index=False)
+            else:
+                df.reindex(columns=columns).to_csv(f, index=False, header=False)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,81 @@
+"""Storage effects of single transactions, from the node's debug tracer and
+`eth_getStorageAt`."""
+import os
+
+# Gas refunded per storage slot cleared from non-zero to zero, and the divisor
+# capping the total refund at a share of the gas used (EIP-3529, London and
+# later; Istanbul-era chains such as ganache-cli v6 refund 15000 capped at 1/2)
+SSTORE_CLEAR_REFUND = 4_800
+MAX_REFUND_QUOTIENT = 5
+
+
+async def trace_transaction(async_w3, tx_hash):
+    """Opcode-level trace (`structLogs`) of a mined transaction"""
+    response = await async_w3.provider.make_request(
+        "debug_traceTransaction",
+        [tx_hash, {"disableMemory": True, "disableStorage": True}],
+    )
+    if "error" in response:
+        raise RuntimeError(f"debug_traceTransaction failed: {response['error']}")
+    return response["result"]["structLogs"]
+
+
+def sstore_writes(struct_logs):
+    """Yield `(slot, value)` for every SSTORE in execution order. The tracer
+    lists the stack bottom first, so the key is the last entry."""
+    for step in struct_logs:
+        if step["op"] == "SSTORE":
+            stack = step["stack"]
+            yield int(stack[-1], 16), int(stack[-2], 16)
+
+
+async def read_slots(async_w3, address, slots, block_number):
+    """`{slot: value}` of contract storage as of `block_number`"""
+    values = {}
+    for slot in slots:
+        value = await async_w3.eth.get_storage_at(address, slot, block_number)
+        values[slot] = int.from_bytes(value, "big")
+    return values
+
+
+async def storage_effect(
+    async_w3,
+    address,
+    result,
+    clear_refund=SSTORE_CLEAR_REFUND,
+    refund_quotient=MAX_REFUND_QUOTIENT,
+):
+    """Storage written by one transaction engine `result`.
+
+    Slot values before the transaction are read at the previous block, so the
+    transaction should be alone in its block (true for a single sender waiting
+    for each receipt on an automining node). Returns SSTORE and slot counts,
+    the slots left non-zero, and the refund earned by clearing slots.
+    """
+    writes = list(sstore_writes(await trace_transaction(async_w3, result["tx_hash"])))
+    slots = {slot for slot, _ in writes}
+    block_number = result["block_number"]
+    before = await read_slots(async_w3, address, slots, block_number - 1)
+    after = await read_slots(async_w3, address, slots, block_number)
+    cleared = sum(before[slot] != 0 and after[slot] == 0 for slot in slots)
+    # gas_used is net of the refund, which is capped at gas before refund / quotient
+    refund = min(cleared * clear_refund, result["gas_used"] // (refund_quotient - 1))
+    return {
+        "sstores": len(writes),
+        "slots_written": len(slots),
+        "slots_allocated": sum(before[slot] == 0 and after[slot] != 0 for slot in slots),
+        "slots_cleared": cleared,
+        "slots_nonzero": sum(after[slot] != 0 for slot in slots),
+        "refund_estimate": refund,
+    }
+
+
+def directory_size(path):
+    """Total size in bytes of the files under `path`"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if os.path.isfile(file_path):
+                total += os.path.getsize(file_path)
+    return total
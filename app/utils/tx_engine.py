@@ -0,0 +1,278 @@
+import asyncio
+import time
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+# Gas limit sent with every transaction. Passing it explicitly stops web3 from
+# calling eth_estimateGas, which would cost an extra round-trip and would revert
+# for a deleteRecord whose addRecord is still in flight.
+DEFAULT_GAS = 6_000_000
+DEFAULT_WINDOW = 32
+
+
+class PipelinedTxEngine:
+    """Submit contract transactions through AsyncWeb3 with a bounded window of
+    in-flight transactions.
+
+    Nonces are handed out locally so a transaction never waits for the previous
+    one to be mined before it is sent. Submission happens in nonce order (so an
+    addRecord always reaches the node before the deleteRecord for the same id),
+    while receipts for everything in the window are awaited concurrently.
+
+    With `receipt_batch_size`, one poller fetches the receipts of all pending
+    transactions in JSON-RPC batch requests of up to that many receipts,
+    instead of every transaction polling on its own. `rpc_stats` counts the
+    requests sent either way.
+    """
+
+    def __init__(
+        self,
+        w3,
+        account,
+        window=DEFAULT_WINDOW,
+        gas=DEFAULT_GAS,
+        poll_latency=0.05,
+        receipt_timeout=120,
+        receipt_batch_size=None,
+    ):
+        self.w3 = w3
+        self.account = account
+        self.window = window
+        self.gas = gas
+        self.poll_latency = poll_latency
+        self.receipt_timeout = receipt_timeout
+        self.receipt_batch_size = receipt_batch_size
+        self.rpc_stats = {
+            "send_requests": 0,
+            "receipt_requests": 0,
+            "receipts": 0,
+            "failed": 0,
+        }
+        self._nonce = None
+        self._last_block = 0
+        self._send_lock = asyncio.Lock()
+        self._pending_receipts = {}
+        self._receipt_poller = None
+
+    async def _send(self, tx):
+        async with self._send_lock:
+            if self._nonce is None:
+                self._nonce = await self.w3.eth.get_transaction_count(
+                    self.account, "pending"
+                )
+                self._last_block = await self.w3.eth.block_number
+            seen_block = self._last_block
+            tx["nonce"] = self._nonce
+            queued_at = time.perf_counter_ns()
+            try:
+                tx_hash = await self.w3.eth.send_transaction(tx)
+            except Exception:
+                # The node may or may not have used the nonce (ganache-cli 6
+                # mines a reverting transaction and still returns an error),
+                # so ask it again before the next send
+                self._nonce = None
+                raise
+            sent_at = time.perf_counter_ns()
+            self._nonce += 1
+            self.rpc_stats["send_requests"] += 1
+        return tx_hash, seen_block, queued_at, sent_at
+
+    async def _poll_receipt(self, tx_hash):
+        while True:
+            self.rpc_stats["receipt_requests"] += 1
+            try:
+                receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                await asyncio.sleep(self.poll_latency)
+                continue
+            self.rpc_stats["receipts"] += 1
+            return receipt
+
+    def _resolve_receipt(self, tx_hash, receipt=None, error=None):
+        future = self._pending_receipts.pop(tx_hash, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(receipt)
+
+    async def _fetch_receipt_batch(self, batch):
+        """Request the receipts of `batch` in one JSON-RPC batch and resolve the
+        mined ones. Returns how many were mined."""
+        self.rpc_stats["receipt_requests"] += 1
+        responses = await self.w3.provider.make_batch_request(
+            [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in batch]
+        )
+        if not isinstance(responses, list):
+            raise RuntimeError(f"Receipt batch failed: {responses.get('error')}")
+        found = 0
+        for tx_hash, response in zip(batch, responses):
+            if "error" in response:
+                error = RuntimeError(f"Receipt request failed: {response['error']}")
+                self._resolve_receipt(tx_hash, error=error)
+            elif response.get("result") is not None:
+                receipt = response["result"]
+                self._resolve_receipt(
+                    tx_hash,
+                    {
+                        "blockNumber": int(receipt["blockNumber"], 16),
+                        "gasUsed": int(receipt["gasUsed"], 16),
+                        "status": int(receipt["status"], 16),
+                    },
+                )
+                found += 1
+        self.rpc_stats["receipts"] += found
+        return found
+
+    async def _poll_receipt_batches(self):
+        """Fetch receipts of all pending transactions, `receipt_batch_size` per
+        request, until none are pending"""
+        while self._pending_receipts:
+            pending = list(self._pending_receipts)
+            found = 0
+            for start in range(0, len(pending), self.receipt_batch_size):
+                batch = pending[start : start + self.receipt_batch_size]
+                try:
+                    found += await self._fetch_receipt_batch(batch)
+                except Exception as e:
+                    for tx_hash in batch:
+                        self._resolve_receipt(tx_hash, error=e)
+            if not found:
+                await asyncio.sleep(self.poll_latency)
+        self._receipt_poller = None
+
+    async def _wait_for_receipt(self, tx_hash):
+        if not self.receipt_batch_size:
+            return await asyncio.wait_for(
+                self._poll_receipt(tx_hash), self.receipt_timeout
+            )
+        tx_hash = Web3.to_hex(tx_hash)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_receipts[tx_hash] = future
+        if self._receipt_poller is None:
+            self._receipt_poller = asyncio.create_task(self._poll_receipt_batches())
+        try:
+            return await asyncio.wait_for(future, self.receipt_timeout)
+        finally:
+            self._pending_receipts.pop(tx_hash, None)
+
+    async def submit(self, fn, tag):
+        """Send one contract call and wait for its receipt.
+
+        `fn` is a bound async contract function (e.g.
+        `contract.functions.addRecord(1, fields)`), `tag` is a dict that is
+        copied into the returned result.
+
+        Each phase is timed separately with `perf_counter_ns`:
+
+        - `encode_ns`: ABI-encoding the call data on the client
+        - `queue_ns`: waiting for earlier transactions to be handed to the node
+        - `send_ns`: the eth_sendTransaction round-trip
+        - `receipt_ns`: from the node accepting the transaction to its receipt
+        - `latency_ns`: `send_ns + receipt_ns`, submission to mined receipt
+
+        `confirmation_blocks` is how many blocks past the newest block this
+        engine had seen at submission the transaction was mined in.
+        """
+        started_at = time.perf_counter_ns()
+        tx = {
+            "from": self.account,
+            "to": fn.address,
+            "data": fn._encode_transaction_data(),
+            "gas": self.gas,
+        }
+        encoded_at = time.perf_counter_ns()
+        tx_hash, seen_block, queued_at, sent_at = await self._send(tx)
+        receipt = await self._wait_for_receipt(tx_hash)
+        mined_at = time.perf_counter_ns()
+
+        block_number = receipt["blockNumber"]
+        self._last_block = max(self._last_block, block_number)
+        return {
+            **tag,
+            "tx_hash": Web3.to_hex(tx_hash),
+            "gas_used": receipt["gasUsed"],
+            "status": receipt["status"],
+            "block_number": block_number,
+            "confirmation_blocks": block_number - seen_block,
+            "encode_ns": encoded_at - started_at,
+            "queue_ns": queued_at - encoded_at,
+            "send_ns": sent_at - queued_at,
+            "receipt_ns": mined_at - sent_at,
+            "latency_ns": mined_at - queued_at,
+        }
+
+    def failed_result(self, tag, error, elapsed_ns):
+        """Result of a job whose transaction could not be sent or whose receipt
+        never arrived. It has the same keys as a mined result, with status 0,
+        no gas used and the time until the failure as its latency."""
+        self.rpc_stats["failed"] += 1
+        return {
+            **tag,
+            "tx_hash": None,
+            "gas_used": 0,
+            "status": 0,
+            "block_number": None,
+            "confirmation_blocks": None,
+            "encode_ns": 0,
+            "queue_ns": 0,
+            "send_ns": 0,
+            "receipt_ns": 0,
+            "latency_ns": elapsed_ns,
+            "error": f"{type(error).__name__}: {error}",
+        }
+
+    async def run(self, jobs, on_result):
+        """Push `(fn, tag)` jobs through the window, calling `on_result` with each
+        result as its receipt arrives. Jobs are pulled lazily, so `jobs` may be a
+        generator over an arbitrarily large dataset, or an async iterable for
+        sources that would otherwise block the event loop.
+
+        A job that fails does not stop the run: a mined revert is reported with
+        its receipt's status 0, and an RPC error (e.g. the VM error a node
+        returns for a reverting eth_sendTransaction) as a `failed_result`.
+        Callers decide whether to stop by raising from `on_result`; the first
+        exception it raises ends the run once the jobs in flight are done.
+        """
+        slots = asyncio.Semaphore(self.window)
+        tasks = set()
+        errors = []
+
+        async def worker(fn, tag):
+            started_at = time.perf_counter_ns()
+            try:
+                try:
+                    result = await self.submit(fn, tag)
+                except Exception as e:
+                    result = self.failed_result(
+                        tag, e, time.perf_counter_ns() - started_at
+                    )
+                on_result(result)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                slots.release()
+
+        async def start(fn, tag):
+            await slots.acquire()
+            task = asyncio.create_task(worker(fn, tag))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if hasattr(jobs, "__aiter__"):
+            async for fn, tag in jobs:
+                if errors:
+                    break
+                await start(fn, tag)
+        else:
+            for fn, tag in jobs:
+                if errors:
+                    break
+                await start(fn, tag)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        if errors:
+            raise errors[0]
@@ -0,0 +1,114 @@
+"""Synthetic records for the scaling-curve sweep, and its summary.
+
+Nothing here talks to a node, so the Streamlit pages can summarize a saved
+sweep without importing the runner.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Lowercase ASCII letters, so every generated character is one byte
+ALPHABET_START = ord("a")
+ALPHABET_SIZE = 26
+SCALING_SWEEP_OUTPUT = os.path.join("results", "scaling_sweep.csv")
+
+# Stored as the IPFS hash when rows are not uploaded to IPFS
+PLACEHOLDER_IPFS_HASH = "gg"
+
+
+def check_record_shape(field_count, field_length):
+    """Raise unless records of this shape have at least one non-empty field"""
+    if field_count <= 0 or field_length <= 0:
+        raise ValueError(
+            f"Records need a positive field count and length, got {field_count} "
+            f"fields of {field_length} characters"
+        )
+
+
+def synthetic_rows(record_count, field_count, field_length, seed=0, first=1):
+    """Yield `(index, fields)` for `record_count` records of `field_count`
+    random strings of `field_length` characters each, numbered from `first`.
+
+    Every field is different, so neither IPFS nor CID caching can collapse
+    rows, and the same seed always produces the same records.
+    """
+    check_record_shape(field_count, field_length)
+    rng = np.random.default_rng(seed)
+    width = field_count * field_length
+    for index in range(first, first + record_count):
+        row = (
+            rng.integers(0, ALPHABET_SIZE, width, dtype=np.uint8) + ALPHABET_START
+        ).tobytes().decode("ascii")
+        fields = [
+            row[start : start + field_length] for start in range(0, width, field_length)
+        ]
+        yield index, fields
+
+
+def string_slots(length):
+    """Storage slots a Solidity string of `length` bytes occupies: strings up
+    to 31 bytes are packed into their slot, longer ones add 32-byte words"""
+    if length < 32:
+        return 1
+    return 1 + -(-length // 32)
+
+
+def estimated_storage_slots(contract_name, field_count, field_length, ipfs_hash_length):
+    """Storage slots one record occupies, from each contract's Record layout"""
+    if contract_name == "BasicContract":
+        # record_id, the fields array length, then every string
+        return 2 + field_count * string_slots(field_length)
+    if contract_name == "PackedContract":
+        # One bytes value holding every field behind a two-byte length
+        return string_slots(field_count * (2 + field_length))
+    if contract_name == "CompactLightweightContract":
+        # data_hash and the CID digest
+        return 2
+    if contract_name in ("EventLogContract", "EventLogHashContract"):
+        return 0
+    # record_id, data_hash and the IPFS hash string
+    return 2 + string_slots(ipfs_hash_length)
+
+
+def summarize_scaling_sweep(sweep_data, record_counts=None):
+    """Per-record and total gas, median latency and estimated storage for
+    every contract, record shape and record count.
+
+    Record counts default to every power of ten up to the rows measured per
+    shape; each count uses the first records of its shape's run.
+    """
+    df = pd.DataFrame(sweep_data)
+    keys = ["contract_name", "field_count", "field_length"]
+    if record_counts is None:
+        measured = df.groupby(keys)["index"].count().min()
+        record_counts = [10**i for i in range(len(str(measured))) if 10**i < measured]
+        record_counts.append(measured)
+
+    summaries = []
+    for record_count in record_counts:
+        prefix = df[df["index"] <= record_count].groupby(keys)
+        summary = prefix.agg(
+            records=("index", "count"),
+            add_gas_per_record=("add_gas_used", "mean"),
+            delete_gas_per_record=("delete_gas_used", "mean"),
+            add_time_p50=("add_time", "median"),
+            delete_time_p50=("delete_time", "median"),
+            total_add_gas=("add_gas_used", "sum"),
+        ).reset_index()
+        summary["record_count"] = record_count
+        summaries.append(summary)
+    summary = pd.concat(summaries, ignore_index=True)
+    summary["storage_slots_per_record"] = [
+        estimated_storage_slots(
+            row.contract_name,
+            row.field_count,
+            row.field_length,
+            len(PLACEHOLDER_IPFS_HASH),
+        )
+        for row in summary.itertuples()
+    ]
+    summary["total_storage_bytes"] = (
+        summary["storage_slots_per_record"] * 32 * summary["records"]
+    )
+    return summary
@@ -0,0 +1,216 @@
+"""Off-chain hashing and bulk verification of stored record hashes.
+
+Hashes a whole dataset locally with the same chained keccak256 LightweightRecord
+uses on-chain, then checks the `data_hash` stored for every row against it with
+batched JSON-RPC `eth_call`s to `getRecord`:
+
+    python verify_records.py --dataset datasets/doctors.csv --populate
+
+`--populate` first stores every row (without deleting it again), since the
+regular experiment removes each record right after adding it.
+"""
+import argparse
+import asyncio
+import time
+from itertools import islice
+
+import runner
+from connection import close_async_w3, connect_async_w3, get_async_contracts
+from utils.common import RECORD_ID_OFFSET, common_parser
+from utils.dataset import DEFAULT_CHUNK_SIZE, iter_batches, iter_rows
+from utils.hashing import ZERO_HASH, hash_dataset
+from utils.tx_engine import DEFAULT_GAS, DEFAULT_WINDOW
+
+# Contracts that store a `data_hash` in their Record struct
+HASHED_CONTRACT_NAMES = [
+    "LightweightContract",
+    "PrehashedContract",
+    "CompactLightweightContract",
+]
+DEFAULT_CALL_BATCH_SIZE = 100
+DEFAULT_CALL_CONCURRENCY = 8
+
+
+def populate_records(
+    dataset_path,
+    contract_name,
+    concurrency=DEFAULT_WINDOW,
+    gas=DEFAULT_GAS,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    max_rows=None,
+    ipfs_uploader=None,
+):
+    """Add every row of the dataset (or its first `max_rows`) to
+    `contract_name` and keep it stored, with real CIDs if an `ipfs_uploader`
+    is given. Returns the number of rows stored and of failed transactions."""
+    stored = 0
+    failed = 0
+
+    def on_result(result):
+        nonlocal stored, failed
+        if result["status"] == 1:
+            stored += 1
+        else:
+            failed += 1
+
+    def build(contracts):
+        contract = contracts[contract_name]
+        rows = islice(iter_rows(dataset_path, chunksize), max_rows)
+        if ipfs_uploader is not None:
+            rows = runner.attach_cids(rows, ipfs_uploader)
+        else:
+            rows = ((index, fields, runner.PLACEHOLDER_IPFS_HASH) for index, fields in rows)
+        for index, fields, ipfs_hash in rows:
+            record_id = index + RECORD_ID_OFFSET
+            add_fn = runner.add_record_call(
+                contract_name, contract, record_id, fields, ipfs_hash
+            )
+            yield add_fn, {"contract_name": contract_name, "index": index}
+
+    asyncio.run(runner.run_jobs(build, [contract_name], concurrency, gas, on_result))
+    return stored, failed
+
+
+async def fetch_stored_hashes(contract_name, record_ids, batch_size, concurrency):
+    """Return `{record_id: data_hash}` read with batched getRecord calls, with up
+    to `concurrency` batch requests in flight"""
+    async_w3 = await connect_async_w3()
+    contract = get_async_contracts(async_w3)[contract_name]
+    slots = asyncio.Semaphore(concurrency)
+    stored = {}
+
+    async def fetch_batch(batch_ids):
+        async with slots:
+            async with async_w3.batch_requests() as batch:
+                for record_id in batch_ids:
+                    batch.add(contract.functions.getRecord(record_id))
+                records = await batch.async_execute()
+        # data_hash is the second to last member of every hashed Record
+        for record_id, record in zip(batch_ids, records):
+            stored[record_id] = record[-2]
+
+    try:
+        await asyncio.gather(
+            *(
+                fetch_batch([record_id for record_id, _ in batch])
+                for batch in iter_batches(((i, None) for i in record_ids), batch_size)
+            )
+        )
+    finally:
+        await close_async_w3(async_w3)
+    return stored
+
+
+def verify_dataset(
+    dataset_path,
+    contract_name="LightweightContract",
+    processes=None,
+    batch_size=DEFAULT_CALL_BATCH_SIZE,
+    concurrency=DEFAULT_CALL_CONCURRENCY,
+    chunksize=DEFAULT_CHUNK_SIZE,
+):
+    """Check the hash stored on-chain for every row against the dataset.
+
+    Hashing and on-chain lookup are timed as separate phases so their
+    throughput can be compared. Returns a summary dict and the indices of rows
+    whose stored hash does not match.
+    """
+    started_at = time.perf_counter()
+    local_hashes = dict(hash_dataset(dataset_path, processes, chunksize))
+    hashed_at = time.perf_counter()
+    stored = asyncio.run(
+        fetch_stored_hashes(
+            contract_name,
+            [index + RECORD_ID_OFFSET for index in local_hashes],
+            batch_size,
+            concurrency,
+        )
+    )
+    stored = {
+        record_id - RECORD_ID_OFFSET: data_hash
+        for record_id, data_hash in stored.items()
+    }
+    verified_at = time.perf_counter()
+
+    missing = [i for i, data_hash in stored.items() if data_hash == ZERO_HASH]
+    mismatched = [
+        i
+        for i, data_hash in stored.items()
+        if data_hash != ZERO_HASH and data_hash != local_hashes[i]
+    ]
+    rows = len(local_hashes)
+    hash_time = hashed_at - started_at
+    verify_time = verified_at - hashed_at
+    summary = {
+        "contract_name": contract_name,
+        "rows": rows,
+        "matched": rows - len(missing) - len(mismatched),
+        "mismatched": len(mismatched),
+        "missing": len(missing),
+        "hash_time": hash_time,
+        "hash_rows_per_second": rows / hash_time if hash_time else 0.0,
+        "verify_time": verify_time,
+        "verify_rows_per_second": rows / verify_time if verify_time else 0.0,
+    }
+    return summary, mismatched
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Verify stored record hashes against a dataset",
+        parents=[common_parser(contract_names=None)],
+    )
+    parser.add_argument("--dataset", required=True, help="Path to the CSV dataset")
+    parser.add_argument(
+        "--contract",
+        choices=HASHED_CONTRACT_NAMES,
+        default="LightweightContract",
+        help="Contract whose stored hashes are checked",
+    )
+    parser.add_argument(
+        "--populate",
+        action="store_true",
+        help="Store every row in the contract before verifying",
+    )
+    parser.add_argument(
+        "--processes", type=int, help="Hashing processes (default: all cores)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_CALL_BATCH_SIZE,
+        help="getRecord calls per JSON-RPC batch request",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CALL_CONCURRENCY,
+        help="Batch requests kept in flight",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.populate:
+        stored, failed = populate_records(
+            args.dataset, args.contract, gas=args.gas, chunksize=args.chunksize
+        )
+        print(f"Stored {stored} rows in {args.contract} ({failed} failed transactions)")
+
+    summary, mismatched = verify_dataset(
+        args.dataset,
+        args.contract,
+        processes=args.processes,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        chunksize=args.chunksize,
+    )
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    if mismatched:
+        print(f"First mismatched rows: {mismatched[:20]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,16 @@ contract BasicRecord {
         records[_record_id] = Record(_record_id, _fields);
     }
 
+    function addRecords(
+        uint256[] memory _record_ids,
+        string[][] memory _fields
+    ) public {
+        require(_record_ids.length == _fields.length, "Length mismatch");
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecord(_record_ids[i], _fields[i]);
+        }
+    }
+
     function getRecord(uint256 _record_id) public view returns (Record memory) {
         return records[_record_id];
     }
@@ -34,4 +44,10 @@ contract BasicRecord {
         recordCount--;
         delete records[_record_id];
     }
+
+    function deleteRecords(uint256[] memory _record_ids) public {
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            deleteRecord(_record_ids[i]);
+        }
+    }
 }
\ No newline at end of file
@@ -0,0 +1,85 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.28;
+
+// Variant of LightweightRecord that keeps a record in two storage slots: the
+// chained keccak256 of its fields and the 32-byte sha2-256 digest of its CID's
+// multihash. The record id is only used as the mapping key.
+contract CompactLightweightRecord {
+    address public immutable admin;
+
+    constructor() {
+        admin = msg.sender;
+    }
+
+    struct Record {
+        bytes32 data_hash;
+        bytes32 cid_digest;
+    }
+
+
+    mapping(uint256 => Record) public records;
+
+    uint256 public recordCount;
+
+    function addRecord(
+        uint256 _record_id,
+        string[] memory _fields,
+        bytes32 _cid_digest
+    ) public {
+        recordCount++;
+        records[_record_id] = Record(hashFields(_fields), _cid_digest);
+    }
+
+    function addRecords(
+        uint256[] memory _record_ids,
+        string[][] memory _fields,
+        bytes32[] memory _cid_digests
+    ) public {
+        require(
+            _record_ids.length == _fields.length && _record_ids.length == _cid_digests.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecord(_record_ids[i], _fields[i], _cid_digests[i]);
+        }
+    }
+
+    function getRecord(uint256 _record_id) public view returns (Record memory) {
+        return records[_record_id];
+    }
+
+    function getRecordIPFSHash(uint256 _record_id) public view returns (bytes32) {
+        require(recordExists(_record_id), "Record does not exist");
+        return records[_record_id].cid_digest;
+    }
+
+
+    function verifyRecord(uint256 _record_id, string[] memory _fields) public view returns (bool) {
+        require(recordExists(_record_id), "Record does not exist");
+        return records[_record_id].data_hash == hashFields(_fields);
+    }
+
+
+    function deleteRecord(uint256 _record_id) public {
+        require(recordExists(_record_id), "Record does not exist");
+        recordCount--;
+        delete records[_record_id];
+    }
+
+    function deleteRecords(uint256[] memory _record_ids) public {
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            deleteRecord(_record_ids[i]);
+        }
+    }
+
+
+    function hashFields(string[] memory _fields) internal pure returns (bytes32 _data_hash) {
+        for (uint256 i = 0; i < _fields.length; i++) {
+            _data_hash = keccak256(abi.encodePacked(_data_hash, keccak256(bytes(_fields[i]))));
+        }
+    }
+
+    function recordExists(uint256 _record_id) internal view returns (bool) {
+        return records[_record_id].data_hash != 0x0;
+    }
+}
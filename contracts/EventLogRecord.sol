@@ -0,0 +1,89 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.28;
+
+// Keeps nothing in contract storage: every record is emitted as a RecordAdded
+// event (or only its hash, as a RecordHashAdded event) and read back from the
+// chain's logs, and deleting a record only emits a RecordDeleted event that
+// readers apply on top.
+contract EventLogRecord {
+    address public immutable admin;
+
+    constructor() {
+        admin = msg.sender;
+    }
+
+    event RecordAdded(
+        uint256 indexed record_id,
+        bytes32 data_hash,
+        string[] fields,
+        string ipfs_hash
+    );
+
+    event RecordHashAdded(
+        uint256 indexed record_id,
+        bytes32 data_hash,
+        string ipfs_hash
+    );
+
+    event RecordDeleted(uint256 indexed record_id);
+
+    function addRecord(
+        uint256 _record_id,
+        string[] memory _fields,
+        string memory _ipfs_hash
+    ) public {
+        bytes32 _data_hash = 0x0;
+        for (uint256 i = 0; i < _fields.length; i++) {
+            _data_hash = keccak256(abi.encodePacked(_data_hash, keccak256(bytes(_fields[i]))));
+        }
+
+        emit RecordAdded(_record_id, _data_hash, _fields, _ipfs_hash);
+    }
+
+    function addRecords(
+        uint256[] memory _record_ids,
+        string[][] memory _fields,
+        string[] memory _ipfs_hashes
+    ) public {
+        require(
+            _record_ids.length == _fields.length && _record_ids.length == _ipfs_hashes.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecord(_record_ids[i], _fields[i], _ipfs_hashes[i]);
+        }
+    }
+
+    function addRecordHash(
+        uint256 _record_id,
+        bytes32 _data_hash,
+        string memory _ipfs_hash
+    ) public {
+        emit RecordHashAdded(_record_id, _data_hash, _ipfs_hash);
+    }
+
+    function addRecordHashes(
+        uint256[] memory _record_ids,
+        bytes32[] memory _data_hashes,
+        string[] memory _ipfs_hashes
+    ) public {
+        require(
+            _record_ids.length == _data_hashes.length && _record_ids.length == _ipfs_hashes.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecordHash(_record_ids[i], _data_hashes[i], _ipfs_hashes[i]);
+        }
+    }
+
+
+    function deleteRecord(uint256 _record_id) public {
+        emit RecordDeleted(_record_id);
+    }
+
+    function deleteRecords(uint256[] memory _record_ids) public {
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            deleteRecord(_record_ids[i]);
+        }
+    }
+}
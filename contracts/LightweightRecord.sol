@@ -33,6 +33,20 @@ contract LightweightRecord {
         records[_record_id] = Record(_record_id, _data_hash, _ipfs_hash);
     }
 
+    function addRecords(
+        uint256[] memory _record_ids,
+        string[][] memory _fields,
+        string[] memory _ipfs_hashes
+    ) public {
+        require(
+            _record_ids.length == _fields.length && _record_ids.length == _ipfs_hashes.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecord(_record_ids[i], _fields[i], _ipfs_hashes[i]);
+        }
+    }
+
     function getRecord(uint256 _record_id) public view returns (Record memory) {
         return records[_record_id];
     }
@@ -59,6 +73,12 @@ contract LightweightRecord {
         delete records[_record_id];
     }
 
+    function deleteRecords(uint256[] memory _record_ids) public {
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            deleteRecord(_record_ids[i]);
+        }
+    }
+
 
     function recordExists(uint256 _record_id) internal view returns (bool) {
         return records[_record_id].record_id != 0;
@@ -0,0 +1,73 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.28;
+
+// Stores one Merkle root per batch of records instead of a hash per record.
+// Leaves are keccak256(keccak256(abi.encode(record_id, data_hash))) with the
+// chained field hash LightweightRecord computes, and inner nodes hash their
+// children in sorted order, so a row is checked with its sibling hashes only.
+contract MerkleBatchRecord {
+    address public immutable admin;
+
+    constructor() {
+        admin = msg.sender;
+    }
+
+
+    mapping(uint256 => bytes32) public batchRoots;
+
+    uint256 public batchCount;
+
+    function addBatch(uint256 _batch_id, bytes32 _root) public {
+        require(_root != 0x0, "Empty root");
+        batchCount++;
+        batchRoots[_batch_id] = _root;
+    }
+
+    function getBatchRoot(uint256 _batch_id) public view returns (bytes32) {
+        return batchRoots[_batch_id];
+    }
+
+
+    function verifyRecord(
+        uint256 _batch_id,
+        uint256 _record_id,
+        string[] memory _fields,
+        bytes32[] memory _proof
+    ) public view returns (bool) {
+        bytes32 _data_hash = 0x0;
+        for (uint256 i = 0; i < _fields.length; i++) {
+            _data_hash = keccak256(abi.encodePacked(_data_hash, keccak256(bytes(_fields[i]))));
+        }
+        return verifyRecordHash(_batch_id, _record_id, _data_hash, _proof);
+    }
+
+    function verifyRecordHash(
+        uint256 _batch_id,
+        uint256 _record_id,
+        bytes32 _data_hash,
+        bytes32[] memory _proof
+    ) public view returns (bool) {
+        require(batchExists(_batch_id), "Batch does not exist");
+        bytes32 computed = keccak256(bytes.concat(keccak256(abi.encode(_record_id, _data_hash))));
+        for (uint256 i = 0; i < _proof.length; i++) {
+            computed = hashPair(computed, _proof[i]);
+        }
+        return computed == batchRoots[_batch_id];
+    }
+
+
+    function deleteBatch(uint256 _batch_id) public {
+        require(batchExists(_batch_id), "Batch does not exist");
+        batchCount--;
+        delete batchRoots[_batch_id];
+    }
+
+
+    function hashPair(bytes32 a, bytes32 b) internal pure returns (bytes32) {
+        return a < b ? keccak256(abi.encodePacked(a, b)) : keccak256(abi.encodePacked(b, a));
+    }
+
+    function batchExists(uint256 _batch_id) internal view returns (bool) {
+        return batchRoots[_batch_id] != 0x0;
+    }
+}
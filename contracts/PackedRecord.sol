@@ -0,0 +1,74 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.28;
+
+// Variant of BasicRecord that stores a record's fields as a single `bytes`
+// value, packed off-chain with every field prefixed by its length as two
+// big-endian bytes, instead of a record id plus a string[].
+contract PackedRecord {
+    address public immutable admin;
+
+    constructor() {
+        admin = msg.sender;
+    }
+
+
+    mapping(uint256 => bytes) public records;
+
+    uint256 public recordCount;
+
+    function addRecord(uint256 _record_id, bytes memory _packed_fields) public {
+        require(_packed_fields.length != 0, "Empty record");
+        recordCount++;
+        records[_record_id] = _packed_fields;
+    }
+
+    function addRecords(uint256[] memory _record_ids, bytes[] memory _packed_fields) public {
+        require(_record_ids.length == _packed_fields.length, "Length mismatch");
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecord(_record_ids[i], _packed_fields[i]);
+        }
+    }
+
+    function getRecord(uint256 _record_id) public view returns (bytes memory) {
+        return records[_record_id];
+    }
+
+    function getField(uint256 _record_id, uint256 _index) public view returns (string memory) {
+        require(recordExists(_record_id), "Record does not exist");
+        bytes memory packed = records[_record_id];
+        uint256 offset = 0;
+        for (uint256 i = 0; i < _index; i++) {
+            offset += 2 + fieldLength(packed, offset);
+        }
+        uint256 length = fieldLength(packed, offset);
+        require(offset + 2 + length <= packed.length, "Field out of range");
+        bytes memory field = new bytes(length);
+        for (uint256 j = 0; j < length; j++) {
+            field[j] = packed[offset + 2 + j];
+        }
+        return string(field);
+    }
+
+
+    function deleteRecord(uint256 _record_id) public {
+        require(recordExists(_record_id), "Record does not exist");
+        recordCount--;
+        delete records[_record_id];
+    }
+
+    function deleteRecords(uint256[] memory _record_ids) public {
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            deleteRecord(_record_ids[i]);
+        }
+    }
+
+
+    function fieldLength(bytes memory _packed, uint256 _offset) internal pure returns (uint256) {
+        require(_offset + 2 <= _packed.length, "Field out of range");
+        return (uint256(uint8(_packed[_offset])) << 8) | uint256(uint8(_packed[_offset + 1]));
+    }
+
+    function recordExists(uint256 _record_id) internal view returns (bool) {
+        return records[_record_id].length != 0;
+    }
+}
@@ -0,0 +1,79 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.28;
+
+// Variant of LightweightRecord that receives the chained keccak256 of the
+// record's fields precomputed off-chain instead of hashing them itself.
+contract PrehashedRecord {
+    address public immutable admin;
+
+    constructor() {
+        admin = msg.sender;
+    }
+
+    struct Record {
+        uint256 record_id;
+        bytes32 data_hash;
+        string ipfs_hash;
+    }
+
+
+    mapping(uint256 => Record) public records;
+
+    uint256 public recordCount;
+
+    function addRecord(
+        uint256 _record_id,
+        bytes32 _data_hash,
+        string memory _ipfs_hash
+    ) public {
+        recordCount++;
+        records[_record_id] = Record(_record_id, _data_hash, _ipfs_hash);
+    }
+
+    function addRecords(
+        uint256[] memory _record_ids,
+        bytes32[] memory _data_hashes,
+        string[] memory _ipfs_hashes
+    ) public {
+        require(
+            _record_ids.length == _data_hashes.length && _record_ids.length == _ipfs_hashes.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            addRecord(_record_ids[i], _data_hashes[i], _ipfs_hashes[i]);
+        }
+    }
+
+    function getRecord(uint256 _record_id) public view returns (Record memory) {
+        return records[_record_id];
+    }
+
+    function getRecordIPFSHash(uint256 _record_id) public view returns (Record memory) {
+        require(recordExists(_record_id), "Record does not exist");
+        return records[_record_id];
+    }
+
+
+    function verifyRecord(uint256 _record_id, bytes32 _data_hash) public view returns (bool) {
+        require(recordExists(_record_id), "Record does not exist");
+        return records[_record_id].data_hash == _data_hash;
+    }
+
+
+    function deleteRecord(uint256 _record_id) public {
+        require(recordExists(_record_id), "Record does not exist");
+        recordCount--;
+        delete records[_record_id];
+    }
+
+    function deleteRecords(uint256[] memory _record_ids) public {
+        for (uint256 i = 0; i < _record_ids.length; i++) {
+            deleteRecord(_record_ids[i]);
+        }
+    }
+
+
+    function recordExists(uint256 _record_id) internal view returns (bool) {
+        return records[_record_id].record_id != 0;
+    }
+}